@@ -0,0 +1,197 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+
+"""
+Script to benchmark the download engine end to end
+
+Runs the DownloadManager, the Workers and the YoutubeDLDownloaders
+headlessly (see the headless module) against the fake youtube-dl of
+the devscripts directory. Each combination of the items & workers runs
+in its own process on a temporary config & save directory and reports:
+
+    items/s    : Finished items per second of wall time
+    dispatch   : Time from a worker finishing an item until the next
+                 queued item gets active (p50, p95 & max in ms)
+    cpu/item   : CPU time per item of the engine & of the youtube-dl
+                 processes (ms)
+    peak rss   : Peak resident memory of the engine (MiB)
+
+Usage   : ./benchmark.py [--items N ...] [--workers N ...] [--lines N] [--delay SEC]
+Example : ./benchmark.py --items 1000 10000 --workers 1 4 16 64
+Example : ./benchmark.py --items 200 --workers 4 --extract 0.5 --prefetch 8
+
+"""
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+
+
+PACKAGE = "youtube_dl_gui"
+
+FAKE_YOUTUBEDL = os.path.join("devscripts", "fake-youtube-dl.py")
+
+
+def manage_directory():
+    """Allow script calls from the 'devscripts' dir and the package dir."""
+    if os.path.basename(os.getcwd()) == "devscripts":
+        os.chdir("..")
+
+    sys.path.insert(0, os.getcwd())
+
+
+def parse():
+    parser = argparse.ArgumentParser(description="Benchmark the youtube-dl-gui download engine")
+    parser.add_argument("--items", type=int, nargs="+", default=[1000], help="number of the queued urls")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16], help="number of the workers")
+    parser.add_argument("--lines", type=int, default=10, help="progress lines per url")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds between two progress lines")
+    parser.add_argument("--errors", type=float, default=0.0, help="fraction of the urls that fail")
+    parser.add_argument("--extract", type=float, default=0.0, help="seconds the extraction of a url takes")
+    parser.add_argument("--prefetch", type=int, default=0, help="number of the metadata prefetch workers")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON lines")
+    parser.add_argument("--run", type=int, nargs=3, metavar=("ITEMS", "WORKERS", "PREFETCH"), help=argparse.SUPPRESS)
+
+    return parser.parse_args()
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+def dispatch_latencies(items, workers):
+    """Returns the dispatch latencies of the given items.
+
+    With all the workers busy the k-th activation (k >= workers) waits
+    for the (k - workers)-th item to finish.
+
+    """
+    actives = sorted(item.timings["active"] for item in items if "active" in item.timings)
+    finishes = sorted(item.timings["finished"] for item in items if "finished" in item.timings)
+
+    latencies = []
+
+    for index in range(workers, len(actives)):
+        finish_index = index - workers
+
+        if finish_index < len(finishes):
+            latencies.append(max(0.0, actives[index] - finishes[finish_index]))
+
+    return latencies
+
+
+def run(items_number, workers_number, prefetch_workers):
+    """Run the benchmark in this process and return the results dictionary."""
+    from youtube_dl_gui.headless import HeadlessApp
+    from youtube_dl_gui.optionsmanager import OptionsManager
+    from youtube_dl_gui.utils import YOUTUBEDL_BIN
+
+    temp_dir = tempfile.mkdtemp(prefix="ytdlg-bench-")
+
+    try:
+        bin_dir = os.path.join(temp_dir, "bin")
+        os.mkdir(bin_dir)
+        shutil.copy(FAKE_YOUTUBEDL, os.path.join(bin_dir, YOUTUBEDL_BIN))
+
+        opt_manager = OptionsManager(os.path.join(temp_dir, "config"))
+        opt_manager.options["youtubedl_path"] = bin_dir
+        opt_manager.options["disable_update"] = True
+        opt_manager.options["save_path"] = temp_dir
+        opt_manager.options["workers_number"] = workers_number
+        opt_manager.options["prefetch_workers"] = prefetch_workers
+        opt_manager.options["skip_downloaded"] = False
+        opt_manager.options["retry_attempts"] = 0
+
+        with open(os.devnull, "wb") as devnull:
+            app = HeadlessApp(opt_manager, output=devnull)
+            app.add_urls(["http://bench/{0}".format(index) for index in range(items_number)])
+
+            start_time = time.time()
+            app.run()
+            wall_time = time.time() - start_time
+
+        items = app._download_list.get_items()
+    finally:
+        shutil.rmtree(temp_dir)
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss_unit = 1 if sys.platform == "darwin" else 1024
+
+    latencies = dispatch_latencies(items, workers_number)
+
+    return {
+        "items": items_number,
+        "workers": workers_number,
+        "completed": len([item for item in items if item.stage == "Completed"]),
+        "wall": wall_time,
+        "items_per_sec": items_number / wall_time,
+        "dispatch_p50": percentile(latencies, 50) * 1000,
+        "dispatch_p95": percentile(latencies, 95) * 1000,
+        "dispatch_max": max(latencies or [0.0]) * 1000,
+        "cpu_per_item": (usage.ru_utime + usage.ru_stime) / items_number * 1000,
+        "child_cpu_per_item": (children.ru_utime + children.ru_stime) / items_number * 1000,
+        "peak_rss": usage.ru_maxrss * rss_unit / 1048576.0
+    }
+
+
+def run_process(args, items_number, workers_number):
+    """Run the benchmark in a new process for clean CPU & memory numbers."""
+    env = dict(os.environ)
+    env["YTDLG_FAKE_LINES"] = str(args.lines)
+    env["YTDLG_FAKE_DELAY"] = str(args.delay)
+    env["YTDLG_FAKE_ERRORS"] = str(args.errors)
+    env["YTDLG_FAKE_EXTRACT"] = str(args.extract)
+
+    cmd = [sys.executable, __file__, "--run", str(items_number), str(workers_number), str(args.prefetch)]
+
+    return json.loads(subprocess.check_output(cmd, env=env).splitlines()[-1])
+
+
+def main(args):
+    manage_directory()
+
+    if args.run:
+        print(json.dumps(run(*args.run)))
+        return
+
+    header = "{0:>7} {1:>7} {2:>9} {3:>8} {4:>9} {5:>8} {6:>8} {7:>8} {8:>8} {9:>10} {10:>8}".format(
+        "items", "workers", "completed", "wall(s)", "items/s", "disp p50", "disp p95", "disp max",
+        "cpu/item", "child/item", "rss(MiB)")
+
+    if not args.json:
+        print(header)
+
+    for items_number in args.items:
+        for workers_number in args.workers:
+            result = run_process(args, items_number, workers_number)
+
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print("{items:7d} {workers:7d} {completed:9d} {wall:8.2f} {items_per_sec:9.1f} "
+                      "{dispatch_p50:8.2f} {dispatch_p95:8.2f} {dispatch_max:8.2f} "
+                      "{cpu_per_item:8.2f} {child_cpu_per_item:10.2f} {peak_rss:8.1f}".format(**result))
+
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    try:
+        main(parse())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Fake youtube-dl for the benchmarks
+
+Prints the same '--newline' progress lines as youtube-dl without touching
+the network or the disk. It takes the youtube-dl command line the GUI
+builds, only the '-o' template and the url (last argument) are used.
+Works with Python 2 & 3 since the downloader runs it with 'python'.
+
+Environment:
+    YTDLG_FAKE_LINES  : Number of progress lines per url (default 10)
+    YTDLG_FAKE_DELAY  : Seconds to sleep between two progress lines (default 0)
+    YTDLG_FAKE_SIZE   : Reported file size in MiB (default 10)
+    YTDLG_FAKE_ERRORS : Fraction of the urls that fail (default 0)
+    YTDLG_FAKE_ENTRIES: Number of entries of the urls that contain
+                        'playlist' with '--flat-playlist -J' (default 10)
+    YTDLG_FAKE_EXTRACT: Seconds the extraction takes, skipped with
+                        '--load-info-json' (default 0)
+    YTDLG_FAKE_MEDIA_URL: Direct media url of the videos with '-J', for
+                        the segmented downloads (default none)
+
+'--get-filename' prints the destination only. A destination that exists
+is reported as already downloaded.
+
+Usage   : ./fake-youtube-dl.py [youtube-dl options] <url>
+Example : YTDLG_FAKE_DELAY=0.1 ./fake-youtube-dl.py -o '/tmp/%(title)s.%(ext)s' http://bench/1
+
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+
+
+def getenv(name, default, type_func):
+    return type_func(os.environ.get(name, default))
+
+
+def get_template(argv):
+    if "-o" in argv[:-1]:
+        return argv[argv.index("-o") + 1]
+
+    return "%(title)s.%(ext)s"
+
+
+def dump_json(url, entries):
+    """Print the '--flat-playlist -J' output of the given url."""
+    if "playlist" in url:
+        info = {"_type": "playlist", "id": url, "entries": [
+            {"_type": "url", "url": "{0}/{1}".format(url, index)} for index in range(entries)]}
+    else:
+        info = {"_type": "video", "id": url, "webpage_url": url, "title": url.rsplit("/", 1)[-1],
+                "ext": "mp4", "filesize": 10485760, "formats": [{"format_id": "18"}, {"format_id": "22"}]}
+
+        if os.environ.get("YTDLG_FAKE_MEDIA_URL"):
+            info.update(url=os.environ["YTDLG_FAKE_MEDIA_URL"], protocol="http")
+
+    output(json.dumps(info))
+
+
+def output(line):
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+def main(argv):
+    if not argv:
+        sys.stderr.write("Usage: fake-youtube-dl.py [OPTIONS] URL\n")
+        return 2
+
+    lines = getenv("YTDLG_FAKE_LINES", 10, int)
+    delay = getenv("YTDLG_FAKE_DELAY", 0, float)
+    size = getenv("YTDLG_FAKE_SIZE", 10, float)
+    errors = getenv("YTDLG_FAKE_ERRORS", 0, float)
+
+    url = argv[-1]
+
+    if "--load-info-json" not in argv:
+        time.sleep(getenv("YTDLG_FAKE_EXTRACT", 0, float))
+
+    if "-J" in argv:
+        dump_json(url, getenv("YTDLG_FAKE_ENTRIES", 10, int))
+        return 0
+
+    video_id = "{0:08x}".format(zlib.crc32(url.encode("utf-8")) & 0xffffffff)
+    destination = get_template(argv).replace("%(title)s", video_id).replace("%(ext)s", "mp4")
+
+    if "--get-filename" in argv:
+        output(destination)
+        return 0
+
+    output("[generic] {0}: Requesting header".format(video_id))
+
+    if os.path.exists(destination):
+        output("[download] {0} has already been downloaded".format(destination))
+        return 0
+
+    # Same urls fail on every run
+    if (zlib.adler32(url.encode("utf-8")) & 0xffff) < errors * 0x10000:
+        sys.stderr.write("ERROR: Unable to download webpage: fake error\n")
+        return 1
+
+    output("[download] Destination: {0}".format(destination))
+
+    for index in range(1, lines):
+        if delay:
+            time.sleep(delay)
+
+        percent = 100.0 * index / lines
+        eta = int(delay * (lines - index))
+        speed = size / lines / delay if delay else size
+
+        output("[download] {0:5.1f}% of {1:.2f}MiB at {2:6.2f}MiB/s ETA {3:02d}:{4:02d}".format(
+            percent, size, speed, eta // 60, eta % 60))
+
+    if delay:
+        time.sleep(delay)
+
+    output("[download] 100% of {0:.2f}MiB in 00:{1:02d}".format(size, int(delay * lines) % 60))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
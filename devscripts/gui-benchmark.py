@@ -0,0 +1,252 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+
+"""
+Script to benchmark the MainFrame worker event handling
+
+Creates a MainFrame on a temporary config with the given number of rows
+and feeds it synthetic worker messages. Each row count runs in its own
+process and reports:
+
+    handler    : Time of _download_worker_handler() per message called
+                 directly on the GUI thread (p50, p95 & max in ms)
+    msgs/s     : Messages the handler processes per second
+    latency    : Time from the events.send_event() call on a background
+                 thread until the new text is on the row (p50, p95 &
+                 max in ms) with the messages sent at the given rate
+
+Needs wx and a display, use a virtual one on headless machines.
+
+Usage   : ./gui-benchmark.py [--rows N ...] [--messages N] [--rate MSGS_PER_SEC]
+Example : xvfb-run ./gui-benchmark.py --rows 100 10000 100000 --rate 500
+
+"""
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import gettext
+import argparse
+import tempfile
+import threading
+import subprocess
+
+
+PACKAGE = "youtube_dl_gui"
+
+# Upper bound for the messages of the latency run to reach the rows
+LATENCY_TIMEOUT = 60.0
+
+
+def manage_directory():
+    """Allow script calls from the 'devscripts' dir and the package dir."""
+    if os.path.basename(os.getcwd()) == "devscripts":
+        os.chdir("..")
+
+    sys.path.insert(0, os.getcwd())
+
+
+def parse():
+    parser = argparse.ArgumentParser(description="Benchmark the youtube-dl-gui worker event handling")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 10000, 100000], help="number of the rows")
+    parser.add_argument("--messages", type=int, default=5000, help="number of the messages per run")
+    parser.add_argument("--rate", type=float, default=500.0, help="messages per second of the latency run")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON lines")
+    parser.add_argument("--run", type=int, metavar="ROWS", help=argparse.SUPPRESS)
+
+    return parser.parse_args()
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+class Message(object):
+
+    """Stand-in of the wxPublisher message the handlers get."""
+
+    def __init__(self, data):
+        self.data = data
+
+
+def worker_data(object_id, counter):
+    """Returns the data of a progress message with a unique percent text."""
+    return {
+        "index": object_id,
+        "status": "Downloading",
+        "percent": "{0}.0%".format(counter),
+        "speed": "1.00MiB/s",
+        "eta": "00:10"
+    }
+
+
+def measure_handler(frame, object_ids, messages):
+    """Call the handler directly and return the duration of each call."""
+    durations = []
+
+    for counter in xrange(messages):
+        msg = Message(("send", worker_data(random.choice(object_ids), counter)))
+
+        start_time = time.time()
+        frame._download_worker_handler(msg)
+        durations.append(time.time() - start_time)
+
+    return durations
+
+
+def measure_latency(app, frame, object_ids, messages, rate):
+    """Send the messages from a background thread and return the time
+    each one took to reach its row."""
+    from youtube_dl_gui.events import send_event
+    from youtube_dl_gui.downloadmanager import WORKER_PUB_TOPIC
+
+    status_list = frame._status_list
+    percent_column = status_list.columns["percent"][0]
+
+    sent = {}
+    latencies = []
+    done = threading.Event()
+
+    update_from_item = status_list._update_from_item
+
+    def _update_from_item(row, download_item):
+        update_from_item(row, download_item)
+
+        text = status_list.GetItem(row, percent_column).GetText()
+
+        if text in sent:
+            latencies.append(time.time() - sent.pop(text))
+
+            if len(latencies) == messages:
+                done.set()
+
+    status_list._update_from_item = _update_from_item
+
+    def _producer():
+        interval = 1.0 / rate
+        start_time = time.time()
+
+        # Offset the counters to not match the texts of measure_handler()
+        for counter in xrange(messages, messages * 2):
+            data = worker_data(random.choice(object_ids), counter)
+
+            sent[data["percent"]] = time.time()
+            send_event(WORKER_PUB_TOPIC, ("send", data))
+
+            delay = start_time + (counter - messages + 1) * interval - time.time()
+
+            if delay > 0:
+                time.sleep(delay)
+
+        done.wait(LATENCY_TIMEOUT)
+
+        import wx
+        wx.CallAfter(frame.close)
+
+    producer = threading.Thread(target=_producer)
+    producer.start()
+
+    app.MainLoop()
+    producer.join()
+
+    # Messages that did not reach their row before the timeout
+    return latencies, messages - len(latencies)
+
+
+def run(rows, messages, rate):
+    """Run the benchmark in this process and return the results dictionary."""
+    import wx
+
+    gettext.install(PACKAGE, unicode=True)
+
+    from youtube_dl_gui.mainframe import MainFrame
+    from youtube_dl_gui.optionsmanager import OptionsManager
+    from youtube_dl_gui.downloadmanager import DownloadItem
+
+    random.seed(rows)
+
+    temp_dir = tempfile.mkdtemp(prefix="ytdlg-guibench-")
+
+    try:
+        opt_manager = OptionsManager(temp_dir)
+        opt_manager.options["disable_update"] = True
+        opt_manager.options["api_port"] = 0
+
+        app = wx.App()
+        frame = MainFrame(opt_manager, None)
+
+        download_items = [DownloadItem("http://bench/{0}".format(index), []) for index in xrange(rows)]
+        download_items = frame._download_list.insert_many(download_items)
+
+        start_time = time.time()
+        frame._status_list.bind_items(download_items)
+        bind_time = time.time() - start_time
+
+        frame.Show()
+
+        object_ids = [download_item.object_id for download_item in download_items]
+
+        durations = measure_handler(frame, object_ids, messages)
+        latencies, lost = measure_latency(app, frame, object_ids, messages, rate)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return {
+        "rows": rows,
+        "bind": bind_time,
+        "handler_p50": percentile(durations, 50) * 1000,
+        "handler_p95": percentile(durations, 95) * 1000,
+        "handler_max": max(durations) * 1000,
+        "msgs_per_sec": messages / sum(durations),
+        "latency_p50": percentile(latencies, 50) * 1000,
+        "latency_p95": percentile(latencies, 95) * 1000,
+        "latency_max": max(latencies or [0.0]) * 1000,
+        "lost": lost
+    }
+
+
+def run_process(args, rows):
+    """Run the benchmark in a new process, wx supports one App per process."""
+    cmd = [sys.executable, __file__, "--run", str(rows), "--messages", str(args.messages), "--rate", str(args.rate)]
+
+    return json.loads(subprocess.check_output(cmd).splitlines()[-1])
+
+
+def main(args):
+    manage_directory()
+
+    if args.run:
+        print(json.dumps(run(args.run, args.messages, args.rate)))
+        return
+
+    if not args.json:
+        print("{0:>7} {1:>8} {2:>8} {3:>8} {4:>8} {5:>9} {6:>8} {7:>8} {8:>8} {9:>6}".format(
+            "rows", "bind(s)", "hdl p50", "hdl p95", "hdl max", "msgs/s", "lat p50", "lat p95", "lat max", "lost"))
+
+    for rows in args.rows:
+        result = run_process(args, rows)
+
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print("{rows:7d} {bind:8.2f} {handler_p50:8.3f} {handler_p95:8.3f} {handler_max:8.3f} "
+                  "{msgs_per_sec:9.0f} {latency_p50:8.2f} {latency_p95:8.2f} {latency_max:8.2f} "
+                  "{lost:6d}".format(**result))
+
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    try:
+        main(parse())
+    except KeyboardInterrupt:
+        pass
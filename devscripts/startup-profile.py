@@ -0,0 +1,114 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+
+"""
+Script to profile the youtube-dl-gui startup imports
+
+Python 2 has no '-X importtime' so we wrap the __import__ builtin and
+report the time spent on each module import (self & cumulative).
+
+Usage   : ./startup-profile.py [module ...] [--top N]
+Example : ./startup-profile.py youtube_dl_gui youtube_dl_gui.mainframe
+
+"""
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import time
+import argparse
+import __builtin__
+
+
+PACKAGE = "youtube_dl_gui"
+
+DEFAULT_MODULES = [PACKAGE, PACKAGE + ".mainframe"]
+
+
+class ImportProfiler(object):
+
+    """Records the import time of each module."""
+
+    def __init__(self):
+        self.records = []
+        self._stack = []
+        self._original_import = __builtin__.__import__
+
+    def __enter__(self):
+        __builtin__.__import__ = self._import
+        return self
+
+    def __exit__(self, *args):
+        __builtin__.__import__ = self._original_import
+
+    def _import(self, name, globals=None, locals=None, fromlist=None, level=-1):
+        # Only the first import of a module costs something
+        if name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        record = [name, len(self._stack), 0.0, 0.0]  # name, depth, self, cumulative
+        self.records.append(record)
+        self._stack.append(record)
+
+        start_time = time.time()
+
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            record[3] = time.time() - start_time
+            record[2] += record[3]
+
+            self._stack.pop()
+
+            if self._stack:
+                self._stack[-1][2] -= record[3]
+
+
+def manage_directory():
+    """Allow script calls from the 'devscripts' dir and the package dir."""
+    if os.path.basename(os.getcwd()) == "devscripts":
+        os.chdir("..")
+
+    sys.path.insert(0, os.getcwd())
+
+
+def parse():
+    parser = argparse.ArgumentParser(description="Profile the youtube-dl-gui startup imports")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="modules to import")
+    parser.add_argument("--top", type=int, default=20, help="number of the slowest imports to show")
+    parser.add_argument("--tree", action="store_true", help="show all the imports as a tree")
+
+    return parser.parse_args()
+
+
+def main(args):
+    manage_directory()
+
+    with ImportProfiler() as profiler:
+        start_time = time.time()
+
+        for module in args.modules:
+            __import__(module)
+
+        total_time = time.time() - start_time
+
+    if args.tree:
+        for name, depth, self_time, cumulative in profiler.records:
+            print("{0:10.2f} {1:10.2f} | {2}{3}".format(self_time * 1000, cumulative * 1000, "  " * depth, name))
+    else:
+        print("{0:>10} {1:>10} | {2}".format("self(ms)", "cumul(ms)", "module"))
+
+        records = sorted(profiler.records, key=lambda record: record[2], reverse=True)
+
+        for name, _, self_time, cumulative in records[:args.top]:
+            print("{0:10.2f} {1:10.2f} | {2}".format(self_time * 1000, cumulative * 1000, name))
+
+    print("\nTotal: {0:.2f}ms ({1} modules)".format(total_time * 1000, len(profiler.records)))
+
+
+if __name__ == "__main__":
+    try:
+        main(parse())
+    except KeyboardInterrupt:
+        pass
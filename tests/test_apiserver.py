@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains test cases for the apiserver module."""
+
+from __future__ import unicode_literals
+
+import sys
+import json
+import socket
+import urllib2
+import os.path
+import unittest
+import threading
+
+PATH = os.path.realpath(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
+
+try:
+    from youtube_dl_gui.apiserver import ApiServer
+    from youtube_dl_gui.downloadmanager import DownloadList, DownloadItem
+except ImportError as error:
+    print error
+    sys.exit(1)
+
+
+class FakeController(object):
+
+    """Front-end that changes the DownloadList like the MainFrame does."""
+
+    def __init__(self, download_list):
+        self.download_list = download_list
+        self.download_manager = None
+
+    def api_add_urls(self, urls):
+        return self.download_list.insert_many([DownloadItem(url, ["-f", "best"]) for url in urls])
+
+    def api_pause(self, object_ids):
+        return self._change_stage(object_ids, "Queued", "Paused")
+
+    def api_resume(self, object_ids):
+        return self._change_stage(object_ids, "Paused", "Queued")
+
+    def api_remove(self, object_ids):
+        return [object_id for object_id in object_ids
+                if self.download_list.has_item(object_id) and self.download_list.remove(object_id)]
+
+    def api_start(self):
+        self.download_manager = object()
+
+    def api_stop(self):
+        self.download_manager = None
+
+    def _change_stage(self, object_ids, old_stage, new_stage):
+        changed = []
+
+        for object_id in object_ids:
+            if self.download_list.get_item(object_id).stage == old_stage:
+                self.download_list.change_stage(object_id, new_stage)
+                changed.append(object_id)
+
+        return changed
+
+
+class TestApiServer(unittest.TestCase):
+
+    """Test case for the ApiServer class."""
+
+    def setUp(self):
+        self.download_list = DownloadList()
+        self.controller = FakeController(self.download_list)
+
+        self.server = ApiServer(self.controller, self.download_list, 0, lambda func: func())
+        self.server.STREAM_INTERVAL = 0.01
+        self.base_url = "http://127.0.0.1:{0}".format(self.server.port)
+
+    def tearDown(self):
+        self.server.close()
+
+    def request(self, path, data=None, content_type="application/json", host=None):
+        request = urllib2.Request(self.base_url + path)
+
+        if host is not None:
+            request.add_unredirected_header("Host", host)
+
+        if data is not None:
+            request.add_data(json.dumps(data))
+            request.add_header("Content-Type", content_type)
+
+        try:
+            response = urllib2.urlopen(request, timeout=5)
+        except urllib2.HTTPError as error:
+            return error.code, json.loads(error.read())
+
+        return response.getcode(), json.loads(response.read())
+
+    def add_urls(self, *urls):
+        return [item["id"] for item in self.request("/api/items", {"urls": list(urls)})[1]["added"]]
+
+    def test_add_urls(self):
+        code, data = self.request("/api/items", {"urls": ["url1", " ", "url2", "url1"]})
+
+        self.assertEqual(code, 200)
+        self.assertEqual([item["url"] for item in data["added"]], ["url1", "url2"])
+        self.assertEqual(len(self.download_list), 2)
+
+        code, data = self.request("/api/items")
+
+        self.assertEqual([item["url"] for item in data["items"]], ["url1", "url2"])
+        self.assertEqual(data["items"][0]["id"], unicode(self.download_list.get_items()[0].object_id))
+        self.assertEqual(data["items"][0]["progress_stats"]["status"], "Queued")
+        self.assertEqual(data["order"], [item["id"] for item in data["items"]])
+
+    def test_add_urls_invalid(self):
+        self.assertEqual(self.request("/api/items", {"urls": "url1"})[0], 400)
+        self.assertEqual(self.request("/api/items", {"urls": []})[0], 400)
+        self.assertEqual(self.request("/api/items", {"urls": ["url1"]}, "text/plain")[0], 415)
+
+    def test_pause_resume(self):
+        ids = self.add_urls("url1", "url2")
+
+        self.assertEqual(self.request("/api/items/pause", {"ids": ids[:1]}), (200, {"changed": ids[:1]}))
+        self.assertEqual(self.download_list.get_items()[0].stage, "Paused")
+
+        self.assertEqual(self.request("/api/items/resume", {"ids": ids}), (200, {"changed": ids[:1]}))
+        self.assertEqual(self.download_list.get_items()[0].stage, "Queued")
+
+    def test_remove(self):
+        ids = self.add_urls("url1", "url2")
+
+        self.assertEqual(self.request("/api/items/remove", {"ids": ids[1:]}), (200, {"changed": ids[1:]}))
+        self.assertEqual(len(self.download_list), 1)
+
+        self.assertEqual(self.request("/api/items/remove", {"ids": ["abc"]})[0], 400)
+
+    def test_start_stop(self):
+        code, data = self.request("/api/start", {})
+
+        self.assertEqual(code, 200)
+        self.assertTrue(data["running"])
+
+        code, data = self.request("/api/stop", {})
+        self.assertFalse(data["running"])
+
+    def test_status(self):
+        ids = self.add_urls("url1", "url2")
+        self.request("/api/items/pause", {"ids": ids[:1]})
+
+        code, data = self.request("/api/status")
+
+        self.assertEqual(data["items"], 2)
+        self.assertEqual(data["stages"], {"Queued": 1, "Paused": 1})
+        self.assertFalse(data["running"])
+
+    def test_not_found(self):
+        self.assertEqual(self.request("/api/unknown")[0], 404)
+
+    def test_host(self):
+        self.assertEqual(self.request("/api/status", host="localhost:%d" % self.server.port)[0], 200)
+
+        # DNS rebinding
+        self.assertEqual(self.request("/api/status", host="evil.example:%d" % self.server.port)[0], 403)
+        self.assertEqual(self.request("/api/items", {"urls": ["url1"]}, host="evil.example")[0], 403)
+        self.assertEqual(len(self.download_list), 0)
+
+    def test_long_poll(self):
+        ids = self.add_urls("url1", "url2")
+        version = self.request("/api/items")[1]["version"]
+
+        object_id = int(ids[1])
+
+        def update():
+            for percent in ("10.0%", "20.0%", "30.0%"):
+                self.download_list.update_stats(object_id, {"percent": percent})
+
+        timer = threading.Timer(0.1, update)
+        timer.start()
+
+        code, data = self.request("/api/items?since={0}&wait=5".format(version))
+        timer.join()
+
+        self.assertEqual([item["id"] for item in data["items"]], ids[1:])
+        self.assertNotIn("order", data)
+
+        # All the updates are coalesced into the current state
+        data = self.request("/api/items?since={0}".format(version))[1]
+        self.assertEqual(data["items"][0]["progress_stats"]["percent"], "30.0%")
+
+        self.assertEqual(self.request("/api/items?since=abc")[0], 400)
+
+    def test_metrics(self):
+        self.add_urls("url1")
+
+        response = urllib2.urlopen(self.base_url + "/metrics", timeout=5)
+        body = response.read().decode("utf-8")
+
+        self.assertTrue(response.info()["Content-Type"].startswith("text/plain"))
+        self.assertIn("# TYPE youtubedlg_items gauge\n", body)
+        self.assertIn("youtubedlg_items{stage=\"Queued\"} 1\n", body)
+
+    def read_event(self, stream):
+        """Returns the fields of the next server-sent event of the stream."""
+        fields = {}
+
+        for line in iter(stream.readline, b"\n"):
+            key, value = line.rstrip(b"\n").split(b": ", 1)
+            fields[key] = value
+
+        return fields
+
+    def test_events(self):
+        ids = self.add_urls("url1")
+
+        sock = socket.create_connection(("127.0.0.1", self.server.port), 5)
+        sock.sendall(b"GET /api/events HTTP/1.0\r\nHost: 127.0.0.1:%d\r\n\r\n" % self.server.port)
+        stream = sock.makefile("rb")
+
+        headers = list(iter(stream.readline, b"\r\n"))
+        self.assertIn(b"Content-Type: text/event-stream\r\n", headers)
+
+        event = self.read_event(stream)
+        self.assertEqual(event[b"event"], b"changes")
+
+        data = json.loads(event[b"data"])
+        self.assertEqual([item["id"] for item in data["items"]], ids)
+        self.assertEqual(int(event[b"id"]), data["version"])
+
+        self.download_list.update_stats(int(ids[0]), {"percent": "50.0%"})
+
+        data = json.loads(self.read_event(stream)[b"data"])
+
+        self.assertEqual(data["items"][0]["progress_stats"]["percent"], "50.0%")
+        self.assertEqual(data["removed"], [])
+
+        stream.close()
+        sock.close()
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -6,14 +6,17 @@
 from __future__ import unicode_literals
 
 import sys
+import shutil
 import os.path
+import tempfile
 import unittest
 
 PATH = os.path.realpath(os.path.abspath(__file__))
 sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
 
 try:
-    from youtube_dl_gui.downloadmanager import DownloadItem
+    import mock
+    from youtube_dl_gui.downloadmanager import DownloadItem, sum_durations
 except ImportError as error:
     print error
     sys.exit(1)
@@ -52,6 +55,15 @@ class TestItemInit(unittest.TestCase):
              "playlist_index": ""}
         )
 
+    def test_init_options_key(self):
+        options = ("-f", "flv")
+
+        ditem = DownloadItem("url", options, "key")
+
+        self.assertEqual(ditem.options, options)
+        self.assertEqual(ditem.object_id, hash("urlkey"))
+        self.assertEqual(ditem, DownloadItem("url", ("-f", "mp4"), "key"))
+
 
 class TestGetFiles(unittest.TestCase):
 
@@ -73,6 +85,56 @@ class TestGetFiles(unittest.TestCase):
         self.assertEqual(self.ditem.get_files(), [])
 
 
+class TestPartFiles(unittest.TestCase):
+
+    """Test case for the DownloadItem '.part' files tracking."""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.part_file = os.path.join(self.path, "video.f137.mp4.part")
+
+        self.ditem = DownloadItem("url", ["-f", "flv"])
+        self.ditem.update_stats({"path": self.path, "filename": "video.f137", "extension": ".mp4",
+                                 "status": "Downloading"})
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_get_part_files(self):
+        self.assertEqual(self.ditem.part_files, [self.part_file])
+        self.assertEqual(self.ditem.get_part_files(), [])
+
+        open(self.part_file, "w").close()
+        self.assertEqual(self.ditem.get_part_files(), [self.part_file])
+
+    def test_reset_keeps_part_files(self):
+        open(self.part_file, "w").close()
+
+        self.ditem.stage = "Error"
+        self.ditem.reset()
+
+        self.assertEqual(self.ditem.filenames, [])
+        self.assertEqual(self.ditem.part_files, [self.part_file])
+
+        os.remove(self.part_file)
+        self.ditem.reset()
+
+        self.assertEqual(self.ditem.part_files, [])
+
+    def test_set_state_verifies_part_files(self):
+        missing_file = os.path.join(self.path, "video.f140.m4a.part")
+        open(self.part_file, "w").close()
+
+        state = self.ditem.get_state()
+        state["part_files"].append(missing_file)
+
+        new_item = DownloadItem("url", ["-f", "flv"])
+        new_item.set_state(state)
+
+        self.assertEqual(new_item.stage, "Queued")
+        self.assertEqual(new_item.part_files, [self.part_file])
+
+
 class TestItemComparison(unittest.TestCase):
 
     """Test case for DownloadItem __eq__ method."""
@@ -432,6 +494,166 @@ class TestDownloadItemPrivate(unittest.TestCase):
         )
 
 
+class TestTimings(unittest.TestCase):
+
+    """Test case for the DownloadItem timings."""
+
+    def setUp(self):
+        with mock.patch("youtube_dl_gui.downloadmanager.time.time", return_value=100.0):
+            self.ditem = DownloadItem("url", ["-f", "flv"])
+
+    def test_timings_init(self):
+        self.assertEqual(self.ditem.timings, {"queued": 100.0})
+
+    def test_timings_active(self):
+        self.ditem.timings["spawned"] = 90.0
+
+        with mock.patch("youtube_dl_gui.downloadmanager.time.time", return_value=110.0):
+            self.ditem.stage = "Active"
+
+        self.assertEqual(self.ditem.timings, {"queued": 100.0, "active": 110.0})
+
+    def test_timings_update_stats(self):
+        self.ditem.update_stats({"timings": {"spawned": 111.0}})
+        self.ditem.update_stats({"status": "Downloading", "timings": {"download": 115.0}})
+
+        self.assertEqual(self.ditem.timings, {"queued": 100.0, "spawned": 111.0, "download": 115.0})
+
+    def test_get_durations(self):
+        self.ditem.timings.update({
+            "active": 110.0,
+            "spawned": 111.0,
+            "download": 115.0,
+            "downloaded": 125.0,
+            "post_processing": 126.0,
+            "finished": 130.0
+        })
+
+        self.assertEqual(self.ditem.get_durations(),
+                         {"spawn": 1.0, "extraction": 4.0, "download": 10.0, "post_processing": 4.0})
+
+    def test_get_durations_partial(self):
+        self.ditem.timings.update({"active": 110.0, "spawned": 111.0, "download": 115.0})
+
+        self.assertEqual(self.ditem.get_durations(), {"spawn": 1.0, "extraction": 4.0})
+
+        # No '[download]' line, e.g. an already downloaded video
+        self.ditem.timings = {"active": 110.0, "spawned": 111.0, "finished": 113.0}
+
+        self.assertEqual(self.ditem.get_durations(), {"spawn": 1.0, "extraction": 2.0})
+
+    def test_state_timings(self):
+        self.ditem.timings["active"] = 110.0
+
+        new_item = DownloadItem("url", ["-f", "flv"])
+        new_item.set_state(self.ditem.get_state())
+
+        self.assertEqual(new_item.timings, {"queued": 100.0, "active": 110.0})
+
+    def test_sum_durations(self):
+        self.ditem.timings.update({"active": 110.0, "spawned": 111.0})
+
+        other_item = DownloadItem("url2", ["-f", "flv"])
+        other_item.timings = {"active": 110.0, "spawned": 113.0, "download": 114.0}
+
+        self.assertEqual(sum_durations([self.ditem, other_item]), {"spawn": 4.0, "extraction": 1.0})
+
+
+class TestSetInfo(unittest.TestCase):
+
+    """Test case for the DownloadItem set_info method."""
+
+    def setUp(self):
+        self.ditem = DownloadItem("url", ["-f", "flv"])
+        self.info = {
+            "info_file": "/tmp/1.info.json",
+            "formats": ["18", "22"],
+            "filename": "title",
+            "extension": ".mp4",
+            "filesize": "10.00MiB",
+            "size": 10485760,
+            "duration": 60
+        }
+
+    def test_set_info_queued(self):
+        self.ditem.set_info(self.info)
+
+        self.assertEqual(self.ditem.info_file, "/tmp/1.info.json")
+        self.assertEqual(self.ditem.formats, ["18", "22"])
+        self.assertEqual(self.ditem.progress_stats["filename"], "title")
+        self.assertEqual(self.ditem.progress_stats["extension"], ".mp4")
+        self.assertEqual(self.ditem.progress_stats["filesize"], "10.00MiB")
+        self.assertEqual(self.ditem.expected_size, 10485760)
+        self.assertEqual(self.ditem.duration, 60)
+
+        # Only the progress stats are set, youtube-dl reports the files
+        self.assertEqual(self.ditem.filenames, [])
+
+    def test_set_info_active(self):
+        self.ditem.stage = "Active"
+        self.ditem.set_info(self.info)
+
+        self.assertEqual(self.ditem.info_file, "/tmp/1.info.json")
+        self.assertEqual(self.ditem.progress_stats["filename"], "url")
+
+    def test_set_info_reset(self):
+        self.ditem.set_info(self.info)
+        self.ditem.reset()
+
+        self.assertEqual(self.ditem.info_file, "")
+        self.assertEqual(self.ditem.formats, [])
+        self.assertEqual(self.ditem.expected_size, 0)
+        self.assertEqual(self.ditem.duration, 0)
+
+
+class TestRetry(unittest.TestCase):
+
+    """Test case for the DownloadItem retry stats."""
+
+    def setUp(self):
+        self.ditem = DownloadItem("url", ["-f", "flv"])
+        self.ditem.stage = "Active"
+        self.ditem.update_stats({"filename": "somefilename", "extension": ".mp4", "status": "Downloading"})
+
+    def test_update_stats_retry(self):
+        self.ditem.update_stats({"status": "Retrying", "speed": "", "eta": "",
+                                 "retry": {"attempts": 1, "not_before": 1000.0}})
+
+        self.assertEqual(self.ditem.stage, "Queued")
+        self.assertEqual(self.ditem.progress_stats["status"], "Retrying")
+        self.assertEqual(self.ditem.attempts, 1)
+        self.assertEqual(self.ditem.not_before, 1000.0)
+        self.assertEqual(self.ditem.filenames, [])
+        self.assertEqual(self.ditem.extensions, [])
+
+    def test_reset_retry(self):
+        self.ditem.update_stats({"status": "Retrying", "retry": {"attempts": 1, "not_before": 1000.0}})
+        self.ditem.reset()
+
+        self.assertEqual(self.ditem.attempts, 0)
+        self.assertEqual(self.ditem.not_before, 0.0)
+
+
+class TestSuspended(unittest.TestCase):
+
+    """Test case for the DownloadItem suspended property."""
+
+    def setUp(self):
+        self.ditem = DownloadItem("url", ["-f", "flv"])
+
+    def test_suspended(self):
+        self.ditem.update_stats({"status": "Downloading"})
+        self.assertFalse(self.ditem.suspended)
+
+        self.ditem.update_stats({"status": "Paused", "speed": "", "eta": ""})
+        self.assertEqual(self.ditem.stage, "Active")
+        self.assertTrue(self.ditem.suspended)
+
+    def test_suspended_queued_paused(self):
+        self.ditem.stage = "Paused"
+        self.assertFalse(self.ditem.suspended)
+
+
 class TestReset(unittest.TestCase):
 
     """Test case for the DownloadItem reset method."""
@@ -6,15 +6,18 @@
 from __future__ import unicode_literals
 
 import sys
+import time
 import os.path
 import unittest
+import threading
 
 PATH = os.path.realpath(os.path.abspath(__file__))
 sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
 
 try:
     import mock
-    from youtube_dl_gui.downloadmanager import DownloadList, synchronized
+    from youtube_dl_gui.downloadmanager import DownloadList, DownloadItem, synchronized
+    from youtube_dl_gui.scheduler import SmallestFirstPolicy
 except ImportError as error:
     print error
     sys.exit(1)
@@ -56,6 +59,116 @@ class TestInsert(unittest.TestCase):
         self.assertEqual(dlist._items_dict, {0: mock_ditem})
 
 
+class TestInsertMany(unittest.TestCase):
+
+    """Test case for the DownloadList insert_many method."""
+
+    def test_insert_many(self):
+        mocks = [mock.Mock(object_id=0), mock.Mock(object_id=1)]
+
+        dlist = DownloadList()
+
+        self.assertEqual(dlist.insert_many(mocks), mocks)
+        self.assertEqual(dlist._items_list, [0, 1])
+        self.assertEqual(dlist._items_dict, {0: mocks[0], 1: mocks[1]})
+
+    def test_insert_many_skips_duplicates(self):
+        existing = mock.Mock(object_id=0)
+        mocks = [mock.Mock(object_id=0), mock.Mock(object_id=1), mock.Mock(object_id=1)]
+
+        dlist = DownloadList([existing])
+
+        self.assertEqual(dlist.insert_many(mocks), [mocks[1]])
+        self.assertEqual(dlist._items_list, [0, 1])
+        self.assertEqual(dlist._items_dict, {0: existing, 1: mocks[1]})
+
+
+class TestExpandItem(unittest.TestCase):
+
+    """Test case for the DownloadList expand_item method."""
+
+    def setUp(self):
+        self.playlist = DownloadItem("playlist", ["-f", "best"])
+        self.playlist.path = "/home/user/Downloads"
+        self.playlist.stage = "Active"
+
+        self.dlist = DownloadList([self.playlist])
+
+    def test_expand_item(self):
+        entries = self.dlist.expand_item(self.playlist.object_id, ["url1", "url2", "url1"])
+
+        self.assertEqual([entry.url for entry in entries], ["url1", "url2"])
+        self.assertEqual(self.dlist.get_items(), [self.playlist] + entries)
+
+        for entry in entries:
+            self.assertEqual(entry.stage, "Queued")
+            self.assertEqual(entry.options, self.playlist.options)
+            self.assertEqual(entry.path, self.playlist.path)
+            self.assertEqual(entry.parent_id, self.playlist.object_id)
+
+        self.assertEqual(self.playlist.stage, "Completed")
+        self.assertEqual(self.playlist.progress_stats["status"], "Expanded")
+
+    def test_expand_item_again(self):
+        self.dlist.expand_item(self.playlist.object_id, ["url1", "url2"])
+
+        # Only the new entries of the playlist get added
+        entries = self.dlist.expand_item(self.playlist.object_id, ["url1", "url2", "url3"])
+
+        self.assertEqual([entry.url for entry in entries], ["url3"])
+        self.assertEqual(len(self.dlist), 4)
+
+
+class TestGetQueued(unittest.TestCase):
+
+    """Test case for the DownloadList get_queued method."""
+
+    def test_get_queued(self):
+        stages = ["Completed", "Queued", "Active", "Queued", "Paused", "Queued"]
+        mocks = [mock.Mock(object_id=index, stage=stage, priority=1, not_before=0)
+                 for index, stage in enumerate(stages)]
+
+        dlist = DownloadList(mocks)
+
+        self.assertEqual(dlist.get_queued(2), [mocks[1], mocks[3]])
+        self.assertEqual(dlist.get_queued(10), [mocks[1], mocks[3], mocks[5]])
+
+    def test_get_queued_dispatch_order(self):
+        mocks = [mock.Mock(object_id=index, stage="Queued", priority=1, not_before=0) for index in range(100)]
+        dlist = DownloadList(mocks)
+
+        dlist.set_priority(99, 2)
+        dlist.move_to_top(50)
+        dlist.change_stage(0, "Active")
+        dlist.change_stage(1, "Paused")
+        dlist.change_stage(1, "Queued")  # Leaves a stale heap entry
+        mocks[2].not_before = time.time() + 60  # Waits for a retry
+
+        self.assertEqual(dlist.get_queued(4), [mocks[99], mocks[50], mocks[1], mocks[3]])
+
+        # Same order as the workers get the items
+        for item in dlist.get_queued(100):
+            self.assertEqual(dlist.fetch_next(), item)
+            dlist.change_stage(item.object_id, "Active")
+
+
+class TestSetInfo(unittest.TestCase):
+
+    """Test case for the DownloadList set_info method."""
+
+    def test_set_info(self):
+        mock_ditem = mock.Mock(object_id=0)
+        dlist = DownloadList([mock_ditem])
+        version = dlist.get_changes()[0]
+
+        self.assertEqual(dlist.set_info(0, {"info_file": "file"}), mock_ditem)
+        mock_ditem.set_info.assert_called_once_with({"info_file": "file"})
+        self.assertEqual(dlist.get_changes(version)[1], [mock_ditem])
+
+    def test_set_info_removed(self):
+        self.assertIsNone(DownloadList().set_info(0, {"info_file": "file"}))
+
+
 class TestRemove(unittest.TestCase):
 
     """Test case for the DownloadList remove method."""
@@ -88,7 +201,7 @@ class TestFetchNext(unittest.TestCase):
     def test_fetch_next(self):
         items_count = 3
 
-        mocks = [mock.Mock(object_id=i, stage="Queued") for i in range(items_count)]
+        mocks = [mock.Mock(object_id=i, stage="Queued", not_before=0, priority=1) for i in range(items_count)]
 
         dlist = DownloadList(mocks)
 
@@ -103,20 +216,99 @@ class TestFetchNext(unittest.TestCase):
 
         self.assertIsNone(dlist.fetch_next())
 
-        mocks[1].stage = "Queued"  # Re-queue item
+        dlist.change_stage(1, "Queued")  # Re-queue item
         self.assertEqual(dlist.fetch_next(), mocks[1])
 
     def test_fetch_next_empty_list(self):
         dlist = DownloadList()
         self.assertIsNone(dlist.fetch_next())
 
+    def test_fetch_next_moved(self):
+        mocks = [mock.Mock(object_id=i, stage="Queued", not_before=0, priority=1) for i in range(3)]
+
+        dlist = DownloadList(mocks)
+        dlist.move_down(0)
+        dlist.move_up(2)
+
+        self.assertEqual(dlist.get_items(), [mocks[1], mocks[2], mocks[0]])
+        self.assertEqual(dlist.fetch_next(), mocks[1])
+
+        dlist.remove(1)
+        self.assertEqual(dlist.fetch_next(), mocks[2])
+
+    def test_fetch_next_policy(self):
+        items = [DownloadItem("url{0}".format(i), []) for i in range(4)]
+
+        dlist = DownloadList(items, policy=SmallestFirstPolicy())
+
+        dlist.set_info(items[1].object_id, {"info_file": "file1", "size": 3000})
+        dlist.set_info(items[2].object_id, {"info_file": "file2", "size": 1000})
+        dlist.set_info(items[3].object_id, {"info_file": "file3", "duration": 10})
+
+        order = []
+        item = dlist.fetch_next()
+
+        while item is not None:
+            order.append(item)
+            dlist.change_stage(item.object_id, "Active")
+            item = dlist.fetch_next()
+
+        # Known sizes first, then the durations, then the queue order
+        self.assertEqual(order, [items[2], items[1], items[3], items[0]])
+
+        dlist.change_stage(items[1].object_id, "Completed")
+        dlist.reset_item(items[1].object_id)
+        self.assertEqual(dlist.fetch_next(), items[1])
+
+    def test_set_policy(self):
+        items = [DownloadItem("url{0}".format(i), []) for i in range(2)]
+
+        dlist = DownloadList(items)
+        dlist.set_info(items[1].object_id, {"info_file": "file1", "size": 1000})
+
+        self.assertEqual(dlist.fetch_next(), items[0])
+
+        dlist.set_policy(SmallestFirstPolicy())
+        self.assertEqual(dlist.fetch_next(), items[1])
+
+    @mock.patch("youtube_dl_gui.downloadmanager.time.time")
+    def test_fetch_next_retry(self, mock_time):
+        mock_time.return_value = 100.0
+
+        items = [DownloadItem("url{0}".format(i), []) for i in range(2)]
+        dlist = DownloadList(items)
+
+        dlist.change_stage(items[0].object_id, "Active")
+        dlist.update_stats(items[0].object_id, {"status": "Retrying", "retry": {"attempts": 1, "not_before": 110.0}})
+
+        self.assertEqual(items[0].stage, "Queued")
+        self.assertEqual(dlist.fetch_next(), items[1])
+
+        dlist.change_stage(items[1].object_id, "Active")
+        self.assertIsNone(dlist.fetch_next())
+
+        mock_time.return_value = 110.0
+        self.assertEqual(dlist.fetch_next(), items[0])
+
+    def test_heap_compaction(self):
+        mocks = [mock.Mock(object_id=i, stage="Queued", not_before=0, priority=1) for i in range(2)]
+
+        dlist = DownloadList(mocks)
+
+        for _ in range(100):
+            dlist.move_down(0)
+            dlist.move_up(0)
+
+        self.assertTrue(len(dlist._heap) <= 2 * len(dlist._scheduled) + 64)
+        self.assertEqual(dlist.fetch_next(), mocks[0])
+
 
 class TestMoveUp(unittest.TestCase):
 
     """Test case for the DownloadList move_up method."""
 
     def setUp(self):
-        mocks = [mock.Mock(object_id=i, stage="Queued") for i in range(3)]
+        mocks = [mock.Mock(object_id=i, stage="Queued", priority=1) for i in range(3)]
         self.dlist = DownloadList(mocks)
 
     def test_move_up(self):
@@ -136,7 +328,7 @@ class TestMoveDown(unittest.TestCase):
     """Test case for the DownloadList move_down method."""
 
     def setUp(self):
-        mocks = [mock.Mock(object_id=i, stage="Queued") for i in range(3)]
+        mocks = [mock.Mock(object_id=i, stage="Queued", priority=1) for i in range(3)]
         self.dlist = DownloadList(mocks)
 
     def test_move_down(self):
@@ -151,6 +343,98 @@ class TestMoveDown(unittest.TestCase):
         self.assertRaises(ValueError, self.dlist.move_down, 666)
 
 
+class TestMoveToTop(unittest.TestCase):
+
+    """Test case for the DownloadList move_to_top & move_to_bottom methods."""
+
+    def setUp(self):
+        self.mocks = [mock.Mock(object_id=i, stage="Queued", not_before=0, priority=1) for i in range(4)]
+        self.dlist = DownloadList(self.mocks)
+
+    def test_move_to_top(self):
+        self.assertTrue(self.dlist.move_to_top(2))
+        self.assertTrue(self.dlist.move_to_top(3))
+        self.assertEqual(self.dlist._get_order(), [3, 2, 0, 1])
+
+        self.assertFalse(self.dlist.move_to_top(3))
+
+        order = []
+        item = self.dlist.fetch_next()
+
+        while item is not None:
+            order.append(item.object_id)
+            self.dlist.change_stage(item.object_id, "Active")
+            item = self.dlist.fetch_next()
+
+        self.assertEqual(order, [3, 2, 0, 1])
+
+    def test_move_to_bottom(self):
+        self.assertTrue(self.dlist.move_to_bottom(0))
+        self.assertEqual(self.dlist._get_order(), [1, 2, 3, 0])
+
+        self.assertFalse(self.dlist.move_to_bottom(0))
+
+        self.dlist.move_up(0)
+        self.assertEqual(self.dlist._get_order(), [1, 2, 0, 3])
+        self.assertEqual(self.dlist.fetch_next(), self.mocks[1])
+
+    def test_move_journal(self):
+        journal = mock.Mock()
+        journal.needs_compaction.return_value = False
+
+        dlist = DownloadList(self.mocks, journal)
+        dlist.move_to_top(2)
+        dlist.move_to_bottom(2)
+
+        journal.move_to_top.assert_called_once_with(2)
+        journal.move_to_bottom.assert_called_once_with(2)
+
+    def test_move_many(self):
+        mocks = [mock.Mock(object_id=i, stage="Queued", not_before=0, priority=1) for i in range(1000)]
+        dlist = DownloadList(mocks)
+
+        for object_id in range(0, 1000, 2):
+            dlist.move_to_top(object_id)
+
+        self.assertEqual(dlist._items_list[:2], [0, 1])  # Not sorted yet
+        self.assertEqual(dlist.index(998), 0)
+        self.assertEqual(dlist._get_order(), list(range(998, -1, -2)) + list(range(1, 1000, 2)))
+        self.assertEqual(dlist.fetch_next(), mocks[998])
+
+    def test_move_to_top_not_exist(self):
+        self.assertRaises(ValueError, self.dlist.move_to_top, 666)
+        self.assertRaises(ValueError, self.dlist.move_to_bottom, 666)
+
+
+class TestSetPriority(unittest.TestCase):
+
+    """Test case for the DownloadList set_priority method."""
+
+    def setUp(self):
+        self.items = [DownloadItem("url{0}".format(i), []) for i in range(3)]
+        self.dlist = DownloadList(self.items, policy=SmallestFirstPolicy())
+
+    def test_set_priority(self):
+        self.dlist.set_info(self.items[0].object_id, {"info_file": "file0", "size": 1000})
+        self.dlist.set_priority(self.items[2].object_id, 2)
+        self.dlist.set_priority(self.items[0].object_id, 0)
+
+        order = []
+        item = self.dlist.fetch_next()
+
+        while item is not None:
+            order.append(item)
+            self.dlist.change_stage(item.object_id, "Active")
+            item = self.dlist.fetch_next()
+
+        # The priorities come before the policy
+        self.assertEqual(order, [self.items[2], self.items[1], self.items[0]])
+
+    def test_set_priority_invalid(self):
+        self.assertRaises(ValueError, self.dlist.set_priority, self.items[0].object_id, 3)
+        self.assertRaises(ValueError, self.dlist.set_priority, self.items[0].object_id, -1)
+
+
 class TestGetItem(unittest.TestCase):
 
     """Test case for the DownloadList get_item method."""
@@ -195,6 +479,31 @@ class TestHasItem(unittest.TestCase):
         self.assertFalse(self.dlist.has_item(1000))
 
 
+class TestHasPending(unittest.TestCase):
+
+    """Test case for the DownloadList has_pending method."""
+
+    def test_has_pending(self):
+        mocks = [mock.Mock(object_id=0, stage="Completed"), mock.Mock(object_id=1, stage="Queued", not_before=0, priority=1)]
+        dlist = DownloadList(mocks)
+
+        self.assertFalse(dlist.has_pending())
+
+        dlist.change_stage(0, "Active")
+        self.assertTrue(dlist.has_pending())
+
+        dlist.change_stage(0, "Completed")
+        self.assertFalse(dlist.has_pending())
+
+    def test_has_pending_retry(self):
+        dlist = DownloadList([mock.Mock(object_id=0, stage="Queued", not_before=time.time() + 60, priority=1)])
+        self.assertTrue(dlist.has_pending())
+        self.assertIsNone(dlist.fetch_next())
+
+        dlist.change_stage(0, "Paused")
+        self.assertFalse(dlist.has_pending())
+
+
 class TestGetItems(unittest.TestCase):
 
     """Test case for the DownloadList get_items method."""
@@ -227,7 +536,7 @@ class TestChangeStage(unittest.TestCase):
     """Test case for the DownloadList change_stage method."""
 
     def setUp(self):
-        self.mocks = [mock.Mock(object_id=i, stage="Queued") for i in range(3)]
+        self.mocks = [mock.Mock(object_id=i, stage="Queued", priority=1) for i in range(3)]
         self.dlist = DownloadList(self.mocks)
 
     def test_change_stage(self):
@@ -253,6 +562,84 @@ class TestIndex(unittest.TestCase):
         self.assertEqual(self.dlist.index(3), -1)
 
 
+class TestGetChanges(unittest.TestCase):
+
+    """Test case for the DownloadList get_changes method."""
+
+    def setUp(self):
+        self.mocks = [mock.Mock(object_id=i, stage="Queued", part_files=[], priority=1) for i in range(3)]
+        self.dlist = DownloadList(self.mocks)
+
+    def test_get_changes_all(self):
+        version, items, removed, order = self.dlist.get_changes()
+
+        self.assertEqual(items, self.mocks)
+        self.assertEqual(removed, [])
+        self.assertEqual(order, [0, 1, 2])
+
+    def test_get_changes_coalesced(self):
+        version = self.dlist.get_changes()[0]
+
+        for _ in range(5):
+            self.dlist.update_stats(1, {})
+
+        new_version, items, removed, order = self.dlist.get_changes(version)
+
+        self.assertEqual(new_version, version + 5)
+        self.assertEqual(items, [self.mocks[1]])
+        self.assertEqual(removed, [])
+        self.assertIsNone(order)
+
+    def test_get_changes_order(self):
+        version = self.dlist.get_changes()[0]
+
+        self.dlist.remove(0)
+        self.dlist.move_down(1)
+
+        new_version, items, removed, order = self.dlist.get_changes(version)
+
+        self.assertEqual(items, [])
+        self.assertEqual(removed, [0])
+        self.assertEqual(order, [2, 1])
+
+    def test_get_changes_pruned(self):
+        self.dlist.MAX_REMOVED = 2
+        version = self.dlist.get_changes()[0]
+
+        self.dlist.remove(0)
+        removed_version = self.dlist.get_changes()[0]
+
+        self.dlist.remove(1)
+        self.dlist.remove(2)
+
+        self.assertEqual(len(self.dlist._removed), 2)
+        self.assertEqual(self.dlist.get_changes(removed_version)[2], [1, 2])
+
+        # The removal of the item 0 is gone
+        new_version, items, removed, order = self.dlist.get_changes(version)
+
+        self.assertEqual(items, [])
+        self.assertEqual(removed, [])
+        self.assertEqual(order, [])
+
+    def test_get_changes_no_changes(self):
+        version = self.dlist.get_changes()[0]
+
+        self.assertEqual(self.dlist.get_changes(version), (version, [], [], None))
+        self.assertEqual(self.dlist.get_changes(version, 0.01), (version, [], [], None))
+
+    def test_get_changes_wait(self):
+        version = self.dlist.get_changes()[0]
+
+        timer = threading.Timer(0.05, self.dlist.change_stage, (2, "Paused"))
+        timer.start()
+
+        new_version, items, removed, order = self.dlist.get_changes(version, 5.0)
+        timer.join()
+
+        self.assertEqual(items, [self.mocks[2]])
+
+
 class TestSynchronizeDecorator(unittest.TestCase):
 
     def test_synchronize(self):
@@ -267,6 +654,13 @@ class TestSynchronizeDecorator(unittest.TestCase):
         mock_lock.acquire.assert_called_once()
         mock_lock.release.assert_called_once()
 
+    def test_synchronize_raise(self):
+        lock = threading.Lock()
+        decorated_func = synchronized(lock)(mock.Mock(side_effect=ValueError))
+
+        self.assertRaises(ValueError, decorated_func)
+        self.assertTrue(lock.acquire(False))
+
 
 def main():
     unittest.main()
@@ -0,0 +1,692 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains test cases for the DownloadManager object."""
+
+from __future__ import unicode_literals
+
+import os
+import sys
+import json
+import time
+import shutil
+import os.path
+import tempfile
+import unittest
+
+PATH = os.path.realpath(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
+
+try:
+    import mock
+
+    from youtube_dl_gui.downloadmanager import DownloadItem, DownloadList, DownloadManager, Prefetcher, RetryPolicy, Worker
+    from youtube_dl_gui.downloaders import YoutubeDLDownloader, SegmentedDownloader
+except ImportError as error:
+    print error
+    sys.exit(1)
+
+
+class TestYoutubedlAvailable(unittest.TestCase):
+
+    """Test case for the DownloadManager background update."""
+
+    def setUp(self):
+        # Skip the thread & workers creation
+        self.dmanager = DownloadManager.__new__(DownloadManager)
+        self.dmanager.parent = mock.Mock(update_thread=None)
+        self.dmanager.opt_manager = mock.Mock(options={'youtubedl_path': '/tmp'}, config_path='/tmp')
+        self.dmanager._update_thread = None
+        self.dmanager._youtubedl_found = False
+
+    @mock.patch('youtube_dl_gui.downloadmanager.os_path_exists', mock.Mock(return_value=False))
+    @mock.patch('youtube_dl_gui.downloadmanager.UpdateThread')
+    def test_check_youtubedl_does_not_join(self, mock_update_thread):
+        self.dmanager._check_youtubedl()
+
+        update_thread = mock_update_thread.return_value
+        self.assertFalse(update_thread.join.called)
+        self.assertEqual(self.dmanager.parent.update_thread, update_thread)
+
+    @mock.patch('youtube_dl_gui.downloadmanager.os_path_exists', mock.Mock(return_value=True))
+    @mock.patch('youtube_dl_gui.downloadmanager.UpdateThread')
+    def test_check_youtubedl_binary_exists(self, mock_update_thread):
+        self.dmanager._check_youtubedl()
+
+        self.assertFalse(mock_update_thread.called)
+        self.assertIsNone(self.dmanager._update_thread)
+        self.assertTrue(self.dmanager._youtubedl_available())
+
+    @mock.patch('youtube_dl_gui.downloadmanager.os_path_exists', mock.Mock(return_value=False))
+    def test_check_youtubedl_reuses_running_update(self):
+        running_thread = mock.Mock()
+        running_thread.is_alive.return_value = True
+        self.dmanager.parent.update_thread = running_thread
+
+        self.dmanager._check_youtubedl()
+
+        self.assertEqual(self.dmanager._update_thread, running_thread)
+
+    @mock.patch('youtube_dl_gui.downloadmanager.os_path_exists')
+    def test_available_binary_exists(self, mock_exists):
+        mock_exists.return_value = True
+        self.dmanager._update_thread = mock.Mock()
+        self.dmanager._update_thread.is_alive.return_value = True
+
+        self.assertTrue(self.dmanager._youtubedl_available())
+
+    @mock.patch('youtube_dl_gui.downloadmanager.os_path_exists')
+    def test_available_waits_for_update(self, mock_exists):
+        mock_exists.return_value = False
+        self.dmanager._update_thread = mock.Mock()
+        self.dmanager._update_thread.is_alive.return_value = True
+
+        self.assertFalse(self.dmanager._youtubedl_available())
+
+        # Failed update, let the workers report the error
+        self.dmanager._update_thread.is_alive.return_value = False
+        self.assertTrue(self.dmanager._youtubedl_available())
+
+    def test_release_update_thread(self):
+        update_thread = mock.Mock()
+        update_thread.is_alive.return_value = False
+        self.dmanager.parent.update_thread = self.dmanager._update_thread = update_thread
+
+        self.dmanager._release_update_thread()
+
+        self.assertIsNone(self.dmanager.parent.update_thread)
+        self.assertIsNone(self.dmanager._update_thread)
+
+
+class TestSkipDownloaded(unittest.TestCase):
+
+    """Test case for the DownloadManager history look up."""
+
+    def setUp(self):
+        self.dmanager = DownloadManager.__new__(DownloadManager)
+        self.dmanager.opt_manager = mock.Mock(options={'skip_downloaded': True})
+        self.dmanager.download_list = mock.Mock()
+        self.dmanager.history = mock.Mock()
+        self.dmanager.archive = None
+        self.dmanager._successful = 0
+
+        self.item = mock.Mock(url='url', object_id=1, options=('--newline',))
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_skip_downloaded(self, mock_send_event):
+        self.dmanager.history.lookup.return_value = {'url': {'status': 'Already Downloaded'}}
+
+        self.assertTrue(self.dmanager._skip_downloaded(self.item))
+
+        self.dmanager.download_list.change_stage.assert_called_once_with(1, 'Active')
+        mock_send_event.assert_called_once_with('dlworker', ('send', {'status': 'Already Downloaded', 'index': 1}))
+        self.assertEqual(self.dmanager.successful, 1)
+
+    def test_skip_downloaded_unknown(self):
+        self.dmanager.history.lookup.return_value = {}
+
+        self.assertFalse(self.dmanager._skip_downloaded(self.item))
+        self.assertFalse(self.dmanager.download_list.change_stage.called)
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_skip_archived(self, mock_send_event):
+        self.dmanager.history.lookup.return_value = {}
+        self.dmanager.archive = mock.Mock()
+        self.dmanager.archive.has_item.return_value = True
+
+        # Only the items that use the archive get skipped
+        self.assertFalse(self.dmanager._skip_downloaded(self.item))
+
+        self.item.options = ('--newline', '--download-archive', '/tmp/archive.txt')
+        self.assertTrue(self.dmanager._skip_downloaded(self.item))
+
+    def test_skip_downloaded_disabled(self):
+        self.dmanager.opt_manager.options['skip_downloaded'] = False
+
+        self.assertFalse(self.dmanager._skip_downloaded(self.item))
+        self.assertFalse(self.dmanager.history.lookup.called)
+
+
+class TestNeedsExpansion(unittest.TestCase):
+
+    """Test case for the DownloadManager playlist expansion check."""
+
+    def setUp(self):
+        self.dmanager = DownloadManager.__new__(DownloadManager)
+        self.dmanager.opt_manager = mock.Mock(options={'expand_playlists': True})
+
+    def item(self, url, parent_id=None, info_file=""):
+        return mock.Mock(url=url, parent_id=parent_id, info_file=info_file)
+
+    def test_needs_expansion(self):
+        self.assertTrue(self.dmanager._needs_expansion(self.item('https://www.youtube.com/playlist?list=PL0123')))
+        self.assertTrue(self.dmanager._needs_expansion(self.item('https://vimeo.com/channels/staffpicks')))
+
+    def test_needs_expansion_video(self):
+        self.assertFalse(self.dmanager._needs_expansion(self.item('https://youtu.be/dQw4w9WgXcQ')))
+        self.assertTrue(self.dmanager._needs_expansion(
+            self.item('https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL0123')))
+
+    def test_needs_expansion_entry(self):
+        self.assertFalse(self.dmanager._needs_expansion(self.item('https://vimeo.com/channels/staffpicks', 1)))
+
+    def test_needs_expansion_prefetched(self):
+        item = self.item('https://vimeo.com/channels/staffpicks', info_file='/tmp/1.info.json')
+
+        self.assertFalse(self.dmanager._needs_expansion(item))
+
+    def test_needs_expansion_disabled(self):
+        self.dmanager.opt_manager.options['expand_playlists'] = False
+
+        self.assertFalse(self.dmanager._needs_expansion(self.item('https://www.youtube.com/playlist?list=PL0123')))
+
+
+class TestPrefetch(unittest.TestCase):
+
+    """Test case for the DownloadManager prefetch dispatching."""
+
+    def setUp(self):
+        self.dmanager = DownloadManager.__new__(DownloadManager)
+        self.dmanager.opt_manager = mock.Mock(options={'expand_playlists': False})
+        self.dmanager.download_list = mock.Mock()
+        self.dmanager._prefetched = set()
+        self.dmanager._prefetchers = [mock.Mock(), mock.Mock()]
+
+        self.items = [mock.Mock(url='url{0}'.format(index), object_id=index, options=('--newline',), parent_id=None,
+                                get_part_files=mock.Mock(return_value=[])) for index in range(3)]
+        self.dmanager.download_list.get_queued.return_value = self.items
+
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_prefetch(self):
+        self.dmanager._prefetchers[0].available.return_value = False
+
+        self.dmanager._prefetch()
+
+        self.dmanager._prefetchers[1].prefetch.assert_called_once_with('url0', ('--newline',), 0, False)
+        self.assertEqual(self.dmanager._prefetched, set([0]))
+
+        # The items are prefetched only once
+        self.dmanager._prefetchers[0].available.return_value = True
+        self.dmanager._prefetch()
+
+        self.assertEqual(self.dmanager._prefetched, set([0, 1, 2]))
+
+    def test_prefetch_busy(self):
+        for prefetcher in self.dmanager._prefetchers:
+            prefetcher.available.return_value = False
+
+        self.dmanager._prefetch()
+
+        self.assertFalse(self.dmanager.download_list.get_queued.called)
+
+    def test_download_options(self):
+        item = self.items[0]
+        item.info_file = os.path.join(self.temp_dir, '0.info.json')
+
+        # Cache of an older run
+        self.assertEqual(self.dmanager._download_options(item), ('--newline',))
+
+        open(item.info_file, 'w').close()
+
+        self.assertEqual(self.dmanager._download_options(item), ('--newline', '--load-info-json', item.info_file))
+
+        # Stale cache, the media urls have expired
+        stale_time = time.time() - DownloadManager.INFO_TTL - 1
+        os.utime(item.info_file, (stale_time, stale_time))
+
+        self.assertEqual(self.dmanager._download_options(item), ('--newline',))
+
+    def test_download_options_no_info(self):
+        self.items[0].info_file = ''
+
+        self.assertEqual(self.dmanager._download_options(self.items[0]), ('--newline',))
+
+    def test_download_options_resume(self):
+        self.items[0].info_file = ''
+        self.items[0].get_part_files.return_value = ['/tmp/video.mp4.part']
+
+        self.assertEqual(self.dmanager._download_options(self.items[0]), ('--newline', '--continue'))
+
+
+class TestPrefetcher(unittest.TestCase):
+
+    """Test case for the Prefetcher object."""
+
+    def setUp(self):
+        # Skip the thread creation
+        self.prefetcher = Prefetcher.__new__(Prefetcher)
+        self.prefetcher.cache_dir = tempfile.mkdtemp()
+        self.prefetcher._downloader = mock.Mock()
+        self.prefetcher._running = True
+
+    def tearDown(self):
+        shutil.rmtree(self.prefetcher.cache_dir)
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_prefetch_video(self, mock_send_event):
+        info_json = unicode(json.dumps({'title': 'title', 'ext': 'mp4', 'filesize_approx': 1048576, 'duration': 60,
+                                        'formats': [{'format_id': '18'}, {'format_id': '22'}]}))
+        self.prefetcher._downloader.extract_info.return_value = info_json
+
+        self.prefetcher._prefetch('url', ('--newline',), 1, True)
+
+        info_file = os.path.join(self.prefetcher.cache_dir, '1.info.json')
+
+        mock_send_event.assert_called_once_with('dlworker', ('info', {
+            'index': 1,
+            'info_file': info_file,
+            'formats': ['18', '22'],
+            'filename': 'title',
+            'extension': '.mp4',
+            'filesize': '1.00MiB',
+            'size': 1048576,
+            'duration': 60
+        }))
+
+        with open(info_file) as input_file:
+            self.assertEqual(input_file.read(), info_json)
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_prefetch_playlist(self, mock_send_event):
+        self.prefetcher._downloader.extract_info.return_value = json.dumps(
+            {'_type': 'playlist', 'entries': [{'url': 'url1'}, {'url': 'url2'}]})
+
+        self.prefetcher._prefetch('url', ('--newline',), 1, True)
+
+        mock_send_event.assert_called_once_with('dlworker', ('playlist', {'index': 1, 'entries': ['url1', 'url2']}))
+        self.assertEqual(os.listdir(self.prefetcher.cache_dir), [])
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_prefetch_error(self, mock_send_event):
+        self.prefetcher._downloader.extract_info.return_value = None
+
+        self.prefetcher._prefetch('url', ('--newline',), 1, False)
+
+        self.assertFalse(mock_send_event.called)
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    """Test case for the RetryPolicy object."""
+
+    def setUp(self):
+        self.policy = RetryPolicy(3)
+
+    def test_is_retryable(self):
+        self.assertTrue(self.policy.is_retryable("ERROR: Unable to download webpage: <urlopen error timed out>"))
+        self.assertTrue(self.policy.is_retryable("ERROR: unable to download video data: HTTP Error 503: Service Unavailable"))
+        self.assertTrue(self.policy.is_retryable("ERROR: HTTP Error 429: Too Many Requests"))
+        self.assertFalse(self.policy.is_retryable("ERROR: Unsupported URL: http://example.com"))
+        self.assertFalse(self.policy.is_retryable("ERROR: This video is unavailable."))
+        self.assertFalse(self.policy.is_retryable(""))
+
+    @mock.patch('youtube_dl_gui.downloadmanager.random.random')
+    def test_get_delay(self, mock_random):
+        error = "ERROR: HTTP Error 500: Internal Server Error"
+
+        mock_random.return_value = 0.0
+        self.assertEqual([self.policy.get_delay(attempts, error) for attempts in range(4)], [5.0, 10.0, 20.0, None])
+
+        mock_random.return_value = 1.0
+        self.assertEqual(self.policy.get_delay(0, error), 2.5)
+
+    def test_get_delay_max(self):
+        policy = RetryPolicy(100)
+        self.assertTrue(policy.get_delay(20, "urlopen error") <= RetryPolicy.MAX_DELAY)
+
+    def test_get_delay_not_retryable(self):
+        self.assertIsNone(self.policy.get_delay(0, "ERROR: Unsupported URL: http://example.com"))
+
+
+class TestWorkerRetry(unittest.TestCase):
+
+    """Test case for the retries of the Worker object."""
+
+    def setUp(self):
+        # Skip the thread creation
+        self.worker = Worker.__new__(Worker)
+        self.worker.retry_policy = RetryPolicy(2)
+        self.worker.log_manager = None
+        self.worker._downloader = mock.Mock(last_error="ERROR: HTTP Error 503: Service Unavailable")
+        self.worker._data = {'index': 1, 'url': 'url'}
+        self.worker._attempts = 0
+        self.worker._segmented_file = None
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_retry(self, mock_send_event):
+        self.worker._data_hook({'status': 'Error', 'speed': '', 'eta': ''})
+
+        signal, data = mock_send_event.call_args[0][1]
+
+        self.assertEqual(signal, 'send')
+        self.assertEqual(data['status'], 'Retrying')
+        self.assertEqual(data['retry']['attempts'], 1)
+        self.assertTrue(data['retry']['not_before'] > time.time())
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_retry_exhausted(self, mock_send_event):
+        self.worker._attempts = 2
+        self.worker._data_hook({'status': 'Error', 'speed': '', 'eta': ''})
+
+        mock_send_event.assert_called_once_with('dlworker', ('send', {'index': 1, 'status': 'Error', 'speed': '', 'eta': ''}))
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_retry_disabled(self, mock_send_event):
+        self.worker.retry_policy = None
+        self.worker._data_hook({'status': 'Error'})
+
+        mock_send_event.assert_called_once_with('dlworker', ('send', {'index': 1, 'status': 'Error'}))
+
+
+class TestWorkerPause(unittest.TestCase):
+
+    """Test case for the pause of the Worker object."""
+
+    def setUp(self):
+        # Skip the thread creation
+        self.worker = Worker.__new__(Worker)
+        self.worker.retry_policy = None
+        self.worker.log_manager = None
+        self.worker._downloader = mock.Mock(paused=False)
+        self.worker._segmented = mock.Mock(paused=False)
+        self.worker._segmented.pause.return_value = False
+        self.worker._data = {'index': 1, 'url': 'url'}
+        self.worker._last_status = 'Pre Processing'
+        self.worker._segmented_file = None
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_pause_resume(self, mock_send_event):
+        self.worker._data_hook({'status': 'Downloading', 'percent': '10.0%'})
+        self.assertEqual(self.worker._last_status, 'Downloading')
+
+        self.worker._downloader.pause.return_value = True
+        self.assertTrue(self.worker.pause_download())
+        mock_send_event.assert_called_with('dlworker', ('send', {'index': 1, 'status': 'Paused', 'speed': '', 'eta': ''}))
+
+        self.worker._downloader.resume.return_value = True
+        self.assertTrue(self.worker.resume_download())
+        mock_send_event.assert_called_with('dlworker', ('send', {'index': 1, 'status': 'Downloading'}))
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_pause_failed(self, mock_send_event):
+        self.worker._downloader.pause.return_value = False
+
+        self.assertFalse(self.worker.pause_download())
+        self.assertFalse(mock_send_event.called)
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_pause_segmented(self, mock_send_event):
+        # No youtube-dl process during a segmented download
+        self.worker._downloader.pause.return_value = False
+        self.worker._downloader.resume.return_value = False
+        self.worker._segmented.pause.return_value = True
+
+        self.assertTrue(self.worker.pause_download())
+        mock_send_event.assert_called_with('dlworker', ('send', {'index': 1, 'status': 'Paused', 'speed': '', 'eta': ''}))
+
+        self.worker._segmented.paused = True
+        self.assertTrue(self.worker.paused)
+
+        self.worker._segmented.resume.return_value = True
+        self.assertTrue(self.worker.resume_download())
+        mock_send_event.assert_called_with('dlworker', ('send', {'index': 1, 'status': 'Pre Processing'}))
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_data_while_paused(self, mock_send_event):
+        self.worker._downloader.paused = True
+        self.worker._data_hook({'status': 'Downloading', 'percent': '20.0%'})
+
+        self.assertEqual(self.worker._last_status, 'Downloading')
+        mock_send_event.assert_called_once_with('dlworker', ('send', {'index': 1, 'status': 'Paused', 'percent': '20.0%'}))
+
+
+class TestWorkerSegmented(unittest.TestCase):
+
+    """Test case for the segmented downloads of the Worker object."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.info_file = os.path.join(self.temp_dir, "1.info.json")
+        self.filename = os.path.join(self.temp_dir, "video.mp4")
+
+        self.write_info({"_type": "video", "url": "http://cdn/video.mp4", "protocol": "http", "filesize": 8388608})
+
+        # Skip the thread creation
+        self.worker = Worker.__new__(Worker)
+        self.worker.opt_manager = mock.Mock(options={'download_connections': 4})
+        self.worker.retry_policy = None
+        self.worker.log_manager = None
+        self.worker._downloader = mock.Mock(paused=False)
+        self.worker._downloader.get_filename.return_value = self.filename
+        self.worker._downloader.download.return_value = YoutubeDLDownloader.ALREADY
+        self.worker._segmented = mock.Mock()
+        self.worker._segmented.download.return_value = SegmentedDownloader.OK
+        self.worker._data = {'index': 1, 'url': 'url'}
+        self.worker._segmented_file = None
+        self.worker._stopping = False
+
+        self.options = ('-f', '18', '--load-info-json', self.info_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_info(self, info):
+        with open(self.info_file, "w") as info_file:
+            json.dump(info, info_file)
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_segmented(self, mock_send_event):
+        self.assertEqual(self.worker._download('url', self.options), YoutubeDLDownloader.ALREADY)
+
+        self.worker._segmented.download.assert_called_once_with('http://cdn/video.mp4', self.filename, 4, {})
+        self.worker._downloader.download.assert_called_once_with('url', self.options)
+
+        signal, data = mock_send_event.call_args[0][1]
+        self.assertEqual(data['filename'], 'video')
+        self.assertEqual(data['extension'], '.mp4')
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_post_process_pass(self, mock_send_event):
+        self.worker._segmented_file = self.filename
+        self.worker._data_hook({'status': 'Already Downloaded', 'path': self.temp_dir,
+                                'filename': 'video', 'extension': '.mp4'})
+
+        mock_send_event.assert_called_once_with('dlworker', ('send', {'index': 1, 'status': 'Finished'}))
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_fallback(self, mock_send_event):
+        self.worker._segmented.download.return_value = SegmentedDownloader.ERROR
+        self.worker._downloader.download.return_value = YoutubeDLDownloader.OK
+
+        self.assertEqual(self.worker._download('url', self.options), YoutubeDLDownloader.OK)
+        self.worker._downloader.download.assert_called_once_with('url', self.options)
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_not_direct_media(self, mock_send_event):
+        self.write_info({"_type": "video", "url": "http://cdn/index.m3u8", "protocol": "m3u8_native"})
+
+        self.worker._download('url', self.options)
+
+        self.assertFalse(self.worker._segmented.download.called)
+        self.worker._downloader.download.assert_called_once_with('url', self.options)
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_unknown_filesize(self, mock_send_event):
+        self.write_info({"_type": "video", "url": "http://cdn/video.mp4", "protocol": "http"})
+
+        self.worker._download('url', self.options)
+
+        self.assertFalse(self.worker._downloader.get_filename.called)
+        self.assertFalse(self.worker._segmented.download.called)
+        self.worker._downloader.download.assert_called_once_with('url', self.options)
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_info_filename(self, mock_send_event):
+        self.write_info({"_type": "video", "url": "http://cdn/video.mp4", "protocol": "https",
+                         "filesize": 8388608, "_filename": self.filename})
+
+        self.worker._download('url', self.options)
+
+        self.assertFalse(self.worker._downloader.get_filename.called)
+        self.worker._segmented.download.assert_called_once_with('http://cdn/video.mp4', self.filename, 4, {})
+
+    def test_not_prefetched(self):
+        self.worker._download('url', ('-f', '18'))
+
+        self.assertFalse(self.worker._downloader.extract_info.called)
+        self.assertFalse(self.worker._downloader.get_filename.called)
+        self.worker._downloader.download.assert_called_once_with('url', ('-f', '18'))
+
+    @mock.patch('youtube_dl_gui.downloadmanager.send_event')
+    def test_stopped(self, mock_send_event):
+        def stop(*args):
+            self.worker._stopping = True
+            return SegmentedDownloader.STOPPED
+
+        self.worker._segmented.download.side_effect = stop
+
+        self.assertEqual(self.worker._download('url', self.options), YoutubeDLDownloader.STOPPED)
+        self.assertFalse(self.worker._downloader.download.called)
+        mock_send_event.assert_called_with('dlworker', ('send', {'index': 1, 'status': 'Stopped', 'speed': '', 'eta': ''}))
+
+    def test_disabled(self):
+        self.worker.opt_manager.options['download_connections'] = 1
+
+        self.worker._download('url', ('-f', '18'))
+
+        self.assertFalse(self.worker._downloader.extract_info.called)
+        self.worker._downloader.download.assert_called_once_with('url', ('-f', '18'))
+
+
+class TestGetWorker(unittest.TestCase):
+
+    """Test case for the DownloadManager _get_worker method."""
+
+    def setUp(self):
+        # Skip the thread creation
+        self.manager = DownloadManager.__new__(DownloadManager)
+        self.manager.opt_manager = mock.Mock(options={'workers_number': 2, 'pause_frees_worker': True})
+        self.manager._workers = [mock.Mock(paused=True), mock.Mock(paused=False)]
+        self.manager._preempted = []
+
+        for worker in self.manager._workers:
+            worker.available.return_value = False
+
+        self.manager._create_worker = mock.Mock()
+
+    def test_available(self):
+        self.manager._workers[1].available.return_value = True
+        self.assertEqual(self.manager._get_worker(), self.manager._workers[1])
+
+    def test_pause_frees_worker(self):
+        worker = self.manager._get_worker()
+
+        self.assertEqual(worker, self.manager._create_worker.return_value)
+        self.assertEqual(len(self.manager._workers), 3)
+
+        # Two running workers now
+        worker.paused = False
+        worker.available.return_value = False
+        self.assertIsNone(self.manager._get_worker())
+
+    def test_pause_keeps_worker(self):
+        self.manager.opt_manager.options['pause_frees_worker'] = False
+
+        self.assertIsNone(self.manager._get_worker())
+        self.assertEqual(len(self.manager._workers), 2)
+
+        # The preempted downloads always free their worker
+        self.manager._preempted.append(self.manager._workers[0])
+        self.assertEqual(self.manager._get_worker(), self.manager._create_worker.return_value)
+
+
+class TestPreemption(unittest.TestCase):
+
+    """Test case for the DownloadManager preemption."""
+
+    def setUp(self):
+        # Skip the thread creation
+        self.manager = DownloadManager.__new__(DownloadManager)
+        self.manager.opt_manager = mock.Mock(options={'workers_number': 2, 'pause_frees_worker': False,
+                                                      'preempt_downloads': True})
+
+        self.items = [DownloadItem("url{0}".format(i), []) for i in range(4)]
+        self.manager.download_list = DownloadList(self.items)
+
+        for item, priority in zip(self.items, (1, 0, 2, 2)):
+            self.manager.download_list.set_priority(item.object_id, priority)
+
+        self.manager._workers = [self._worker(self.items[0]), self._worker(self.items[1])]
+        self.manager._preempted = []
+
+    def _worker(self, item):
+        worker = mock.Mock(paused=False, object_id=item.object_id)
+        worker.available.return_value = False
+
+        def pause_download():
+            worker.paused = True
+            return True
+
+        def resume_download():
+            worker.paused = False
+            return True
+
+        worker.pause_download.side_effect = pause_download
+        worker.resume_download.side_effect = resume_download
+
+        return worker
+
+    def test_preempt_lowest(self):
+        self.assertTrue(self.manager._preempt(self.items[2]))
+
+        self.assertEqual(self.manager._preempted, [self.manager._workers[1]])
+        self.assertFalse(self.manager._workers[0].pause_download.called)
+        self.assertEqual(self.manager._used_slots(), 1)
+
+    def test_preempt_equal_priority(self):
+        self.assertFalse(self.manager._preempt(self.items[1]))
+        self.assertEqual(self.manager._preempted, [])
+
+    def test_preempt_disabled(self):
+        self.manager.opt_manager.options['preempt_downloads'] = False
+
+        self.assertFalse(self.manager._preempt(self.items[2]))
+
+    def test_resume_preempted(self):
+        self.manager._preempt(self.items[2])
+        self.manager._workers.append(self._worker(self.items[2]))
+
+        # No free slot
+        self.manager._resume_preempted(None)
+        self.assertTrue(self.manager._workers[1].paused)
+
+        self.manager._workers[2].available.return_value = True
+
+        # A queued item of a higher priority takes the free slot
+        self.manager._resume_preempted(self.items[3])
+        self.assertTrue(self.manager._workers[1].paused)
+
+        self.manager._resume_preempted(None)
+        self.assertFalse(self.manager._workers[1].paused)
+        self.assertEqual(self.manager._preempted, [])
+
+    def test_resumed_by_user(self):
+        self.manager._preempt(self.items[2])
+        self.manager._workers[1].paused = False
+
+        self.manager._resume_preempted(None)
+
+        self.assertEqual(self.manager._preempted, [])
+        self.assertFalse(self.manager._workers[1].resume_download.called)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
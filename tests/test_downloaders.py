@@ -0,0 +1,462 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains test cases for the downloaders module."""
+
+from __future__ import unicode_literals
+
+import sys
+import json
+import shutil
+import signal
+import os.path
+import time
+import tempfile
+import unittest
+import threading
+import subprocess
+import SocketServer
+import BaseHTTPServer
+
+PATH = os.path.realpath(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
+
+try:
+    import mock
+
+    from youtube_dl_gui.downloaders import (
+        YoutubeDLDownloader,
+        SegmentedDownloader,
+        direct_media,
+        extract_data,
+        parse_playlist
+    )
+except ImportError as error:
+    print error
+    sys.exit(1)
+
+
+class TestParsePlaylist(unittest.TestCase):
+
+    """Test case for the parse_playlist function."""
+
+    def test_parse_playlist(self):
+        data = json.dumps({
+            "_type": "playlist",
+            "entries": [
+                {"_type": "url", "url": "dQw4w9WgXcQ", "ie_key": "Youtube"},
+                {"_type": "url", "url": ""},
+                {"webpage_url": "https://vimeo.com/1"},
+                None
+            ]
+        })
+
+        self.assertEqual(parse_playlist(data), ["dQw4w9WgXcQ", "https://vimeo.com/1"])
+
+    def test_parse_playlist_empty(self):
+        self.assertEqual(parse_playlist('{"_type": "playlist", "entries": null}'), [])
+
+    def test_parse_playlist_video(self):
+        self.assertIsNone(parse_playlist('{"id": "dQw4w9WgXcQ", "title": "video"}'))
+
+    def test_parse_playlist_invalid(self):
+        self.assertIsNone(parse_playlist(""))
+        self.assertIsNone(parse_playlist("[1, 2]"))
+
+
+
+class TestExtractData(unittest.TestCase):
+
+    """Test case for the extract_data function."""
+
+    VERBOSE_OUTPUT = [
+        "[debug] System config: []",
+        "[debug] User config: []",
+        "[debug] Custom config: []",
+        "[debug] Command-line args: [u'--newline', u'--verbose', u'https://www.youtube.com/watch?v=BaW_jenozKc']",
+        "[debug] Encodings: locale UTF-8, fs UTF-8, out UTF-8, pref UTF-8",
+        "[debug] youtube-dl version 2021.12.17",
+        "[debug] Python version 2.7.18 (CPython) - Linux-5.4.0-x86_64-with-debian-bullseye-sid",
+        "[debug] exe versions: ffmpeg 4.2.7, ffprobe 4.2.7",
+        "[debug] Proxy map: {}",
+        "[youtube] BaW_jenozKc: Downloading webpage",
+        "[youtube] BaW_jenozKc: Downloading player 3c4c8d69",
+        "[debug] Default format spec: bestvideo+bestaudio/best",
+        "[info] Writing video description metadata as JSON to: /home/user/test video-BaW_jenozKc.info.json",
+        "[debug] Invoking downloader on u'https://r4---sn-4g5e6nsz.googlevideo.com/videoplayback'",
+        "[download] Destination: /home/user/test video-BaW_jenozKc.f137.mp4",
+        "[download] 100% of 2.11MiB in 00:00",
+        "[download] Destination: /home/user/test video-BaW_jenozKc.f140.m4a",
+        "[download] 100% of 154.06KiB in 00:00",
+        "[ffmpeg] Merging formats into \"/home/user/test video-BaW_jenozKc.mp4\"",
+        "[debug] ffmpeg command line: ffmpeg -y -loglevel 'repeat+info' -i 'file:test video-BaW_jenozKc.f137.mp4'",
+        "Deleting original file /home/user/test video-BaW_jenozKc.f137.mp4 (pass -k to keep)",
+        "[ExtractAudio] Destination: /home/user/test video-BaW_jenozKc.mp3",
+        "[Merger] Merging formats into: /home/user/test video-BaW_jenozKc.mkv"
+    ]
+
+    def test_extractor_video_id(self):
+        data = extract_data("[youtube] BaW_jenozKc: Downloading webpage")
+
+        self.assertEqual(data["extractor"], "youtube")
+        self.assertEqual(data["video_id"], "BaW_jenozKc")
+
+    def test_verbose_output(self):
+        ids = set()
+
+        for line in self.VERBOSE_OUTPUT:
+            data = extract_data(line)
+
+            if "extractor" in data:
+                ids.add((data["extractor"], data["video_id"]))
+
+        self.assertEqual(ids, set([("youtube", "BaW_jenozKc")]))
+
+    def test_ignore_sentences(self):
+        data = extract_data("[generic] Falling back on generic information extractor.")
+        self.assertNotIn("extractor", data)
+
+        data = extract_data("[youtube:tab]  Downloading: page 1")
+        self.assertNotIn("extractor", data)
+
+
+class TestStop(unittest.TestCase):
+
+    """Test case for the YoutubeDLDownloader stop method."""
+
+    def setUp(self):
+        # Skip the PipeReader thread
+        self.downloader = YoutubeDLDownloader.__new__(YoutubeDLDownloader)
+        self.downloader._return_code = YoutubeDLDownloader.OK
+        self.downloader.paused = False
+        self.downloader._killer = None
+        self.downloader._proc = mock.Mock(pid=1234)
+        self.downloader._proc.poll.return_value = None
+
+    @mock.patch("youtube_dl_gui.downloaders.os.name", "posix")
+    @mock.patch("youtube_dl_gui.downloaders.Timer")
+    @mock.patch("youtube_dl_gui.downloaders.os.killpg")
+    def test_stop(self, mock_killpg, mock_timer):
+        self.downloader.stop()
+
+        mock_killpg.assert_called_once_with(1234, signal.SIGTERM)
+        mock_timer.assert_called_once_with(YoutubeDLDownloader.STOP_TIMEOUT, self.downloader._kill_group, (self.downloader._proc,))
+        mock_timer.return_value.start.assert_called_once_with()
+        self.assertEqual(self.downloader._return_code, YoutubeDLDownloader.STOPPED)
+
+    @mock.patch("youtube_dl_gui.downloaders.os.name", "posix")
+    @mock.patch("youtube_dl_gui.downloaders.Timer")
+    @mock.patch("youtube_dl_gui.downloaders.os.killpg")
+    def test_stop_paused(self, mock_killpg, mock_timer):
+        self.downloader.paused = True
+        self.downloader.stop()
+
+        self.assertEqual(mock_killpg.call_args_list, [mock.call(1234, signal.SIGTERM), mock.call(1234, signal.SIGCONT)])
+        self.assertFalse(self.downloader.paused)
+
+    @mock.patch("youtube_dl_gui.downloaders.os.killpg")
+    def test_kill_group(self, mock_killpg):
+        proc = self.downloader._proc
+
+        self.downloader._kill_group(proc)
+        mock_killpg.assert_called_once_with(1234, signal.SIGKILL)
+
+        # The group has already exited
+        mock_killpg.side_effect = OSError
+        self.downloader._kill_group(proc)
+
+    @mock.patch("youtube_dl_gui.downloaders.os.killpg")
+    def test_kill_group_exited(self, mock_killpg):
+        proc = self.downloader._proc
+        proc.poll.return_value = -15
+
+        # Its children might still run
+        self.downloader._kill_group(proc)
+        mock_killpg.assert_called_once_with(1234, signal.SIGKILL)
+
+        # A new download has started
+        self.downloader._proc = mock.Mock(pid=4321)
+        self.downloader._kill_group(proc)
+
+        mock_killpg.assert_called_once_with(1234, signal.SIGKILL)
+
+    @unittest.skipIf(os.name == 'nt', "os.killpg is not available on Windows")
+    def test_kill_group_child(self):
+        # The group leader exits on SIGTERM but its child ignores it
+        proc = subprocess.Popen(["sh", "-c", "trap '' TERM; sleep 30 >/dev/null 2>&1 & echo $!"],
+                                stdout=subprocess.PIPE,
+                                preexec_fn=os.setsid)
+        child_pid = int(proc.communicate()[0])
+
+        self.downloader._proc = proc
+        self.downloader._kill_group(proc)
+
+        for _ in range(50):
+            try:
+                with open("/proc/%d/stat" % child_pid) as stat_file:
+                    if stat_file.read().split()[2] == "Z":
+                        break
+            except IOError:
+                break
+
+            time.sleep(0.1)
+        else:
+            os.kill(child_pid, signal.SIGKILL)
+            self.fail("The child of the process group is still running")
+
+    @mock.patch("youtube_dl_gui.downloaders.os.killpg")
+    def test_cancel_kill(self, mock_killpg):
+        mock_killpg.side_effect = OSError
+        killer = self.downloader._killer = mock.Mock()
+
+        self.downloader._log = mock.Mock()
+        self.downloader._get_cmd = mock.Mock()
+        self.downloader._create_process = mock.Mock()
+        self.downloader._proc.communicate.return_value = (b"", b"")
+        self.downloader._proc.returncode = -15
+
+        self.assertIsNone(self.downloader.extract_info("url", []))
+
+        killer.cancel.assert_called_once_with()
+        self.assertIsNone(self.downloader._killer)
+
+    @mock.patch("youtube_dl_gui.downloaders.os.killpg")
+    def test_cancel_kill_group_alive(self, mock_killpg):
+        killer = self.downloader._killer = mock.Mock()
+
+        self.downloader._cancel_kill()
+
+        mock_killpg.assert_called_once_with(1234, 0)
+        self.assertFalse(killer.cancel.called)
+        self.assertIs(self.downloader._killer, killer)
+
+
+class TestPause(unittest.TestCase):
+
+    """Test case for the YoutubeDLDownloader pause & resume methods."""
+
+    def setUp(self):
+        # Skip the PipeReader thread
+        self.downloader = YoutubeDLDownloader.__new__(YoutubeDLDownloader)
+        self.downloader.paused = False
+        self.downloader._proc = mock.Mock(pid=1234)
+        self.downloader._proc.poll.return_value = None
+
+    @mock.patch("youtube_dl_gui.downloaders.os.name", "posix")
+    @mock.patch("youtube_dl_gui.downloaders.os.killpg")
+    def test_pause_resume(self, mock_killpg):
+        self.assertTrue(self.downloader.pause())
+        self.assertTrue(self.downloader.paused)
+        mock_killpg.assert_called_once_with(1234, signal.SIGSTOP)
+
+        # Already paused
+        self.assertFalse(self.downloader.pause())
+
+        self.assertTrue(self.downloader.resume())
+        self.assertFalse(self.downloader.paused)
+        mock_killpg.assert_called_with(1234, signal.SIGCONT)
+
+        self.assertFalse(self.downloader.resume())
+        self.assertEqual(mock_killpg.call_count, 2)
+
+    @mock.patch("youtube_dl_gui.downloaders.os.name", "posix")
+    @mock.patch("youtube_dl_gui.downloaders.os.killpg")
+    def test_pause_no_process(self, mock_killpg):
+        self.downloader._proc.poll.return_value = 0
+
+        self.assertFalse(self.downloader.pause())
+        self.assertFalse(mock_killpg.called)
+
+    @mock.patch("youtube_dl_gui.downloaders.os.name", "nt")
+    @mock.patch("youtube_dl_gui.downloaders.os.killpg", create=True)
+    def test_pause_windows(self, mock_killpg):
+        self.assertFalse(self.downloader.pause())
+        self.assertFalse(mock_killpg.called)
+
+
+class RangeServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    """Local HTTP server of a single file that supports byte ranges."""
+
+    daemon_threads = True
+
+    def __init__(self, data, ranges=True):
+        BaseHTTPServer.HTTPServer.__init__(self, (str("127.0.0.1"), 0), RangeHandler)
+        self.data = data
+        self.ranges = ranges
+        self.requests = []
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{0}/video.mp4".format(self.server_address[1])
+
+
+class RangeHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        data = self.server.data
+        header = self.headers.getheader("Range")
+
+        self.server.requests.append(header)
+
+        if self.path != "/video.mp4":
+            self.send_error(404)
+            return
+
+        if header is None or not self.server.ranges:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        start, end = header.split("=")[1].split("-")
+        start, end = int(start), min(int(end or len(data) - 1), len(data) - 1)
+
+        self.send_response(206)
+        self.send_header("Content-Range", "bytes {0}-{1}/{2}".format(start, end, len(data)))
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(data[start:end + 1])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestSegmentedDownloader(unittest.TestCase):
+
+    """Test case for the SegmentedDownloader object."""
+
+    def setUp(self):
+        self.data = os.urandom(50000)
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, "video.mp4")
+
+        self.hooks = []
+        self.downloader = SegmentedDownloader(self.hooks.append)
+        self.downloader.MIN_SEGMENT_SIZE = 1000
+
+        self.server = None
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+        shutil.rmtree(self.temp_dir)
+
+    def start_server(self, ranges=True):
+        self.server = RangeServer(self.data, ranges)
+
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def read_file(self):
+        with open(self.filename, "rb") as input_file:
+            return input_file.read()
+
+    def test_download(self):
+        self.start_server()
+
+        ret_code = self.downloader.download(self.server.url, self.filename, 4, {"User-Agent": "test"})
+
+        self.assertEqual(ret_code, SegmentedDownloader.OK)
+        self.assertEqual(self.read_file(), self.data)
+        self.assertFalse(os.path.exists(self.filename + SegmentedDownloader.PART_SUFFIX))
+
+        # The size probe & one request per connection
+        self.assertEqual(sorted(self.server.requests),
+                         ["bytes=0-0", "bytes=0-12499", "bytes=12500-24999", "bytes=25000-37499", "bytes=37500-49999"])
+
+        self.assertEqual(self.hooks[-1]["percent"], "100%")
+        self.assertEqual(self.hooks[-1]["filesize"], "48.83KiB")
+        self.assertIn("downloaded", self.hooks[-1]["timings"])
+
+    def test_download_no_ranges(self):
+        self.start_server(ranges=False)
+
+        self.assertEqual(self.downloader.download(self.server.url, self.filename, 4), SegmentedDownloader.OK)
+        self.assertEqual(self.read_file(), self.data)
+        self.assertEqual(self.server.requests, ["bytes=0-0", None])
+
+    def test_download_error(self):
+        self.start_server()
+
+        ret_code = self.downloader.download(self.server.url + ".missing", self.filename, 4)
+
+        self.assertEqual(ret_code, SegmentedDownloader.ERROR)
+        self.assertIn("404", self.downloader.last_error)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_stop(self):
+        self.start_server()
+
+        def data_hook(data):
+            self.downloader.stop()
+
+        self.downloader.data_hook = data_hook
+
+        self.assertEqual(self.downloader.download(self.server.url, self.filename, 4), SegmentedDownloader.STOPPED)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_pause_resume(self):
+        self.start_server()
+
+        # No running download
+        self.assertFalse(self.downloader.pause())
+        self.assertFalse(self.downloader.resume())
+
+        received = []
+
+        def resume():
+            received.append(sum(self.downloader._received))
+            self.downloader.resume()
+
+        def data_hook(data):
+            if not received and self.downloader.pause():
+                received.append(sum(self.downloader._received))
+                threading.Timer(0.5, resume).start()
+
+        self.downloader.data_hook = data_hook
+        self.downloader.CHUNK_SIZE = 1000
+
+        self.assertEqual(self.downloader.download(self.server.url, self.filename, 4), SegmentedDownloader.OK)
+        self.assertEqual(self.read_file(), self.data)
+        self.assertFalse(self.downloader.paused)
+
+        # Each connection reads at most one chunk after the pause
+        self.assertEqual(len(received), 2)
+        self.assertLessEqual(received[1] - received[0], 4 * self.downloader.CHUNK_SIZE)
+
+    def test_split(self):
+        self.assertEqual(self.downloader._split(2500, 4), [(0, 1249), (1250, 2499)])
+        self.assertEqual(self.downloader._split(500, 4), [(0, 499)])
+        self.assertEqual(self.downloader._split(None, 4), [(0, None)])
+
+
+class TestDirectMedia(unittest.TestCase):
+
+    """Test case for the direct_media function."""
+
+    def test_direct_media(self):
+        info = {"_type": "video", "url": "http://cdn/video.mp4", "protocol": "https",
+                "filesize": 8388608, "http_headers": {"User-Agent": "test"}}
+
+        self.assertEqual(direct_media(info), ("http://cdn/video.mp4", {"User-Agent": "test"}))
+
+    def test_not_direct_media(self):
+        self.assertIsNone(direct_media({"_type": "playlist", "entries": []}))
+        self.assertIsNone(direct_media({"requested_formats": [{}, {}], "url": "http://cdn/video.mp4"}))
+        self.assertIsNone(direct_media({"url": "http://cdn/index.m3u8", "protocol": "m3u8_native"}))
+        self.assertIsNone(direct_media({"url": "http://cdn/manifest.mpd", "fragments": [{}]}))
+        self.assertIsNone(direct_media({"url": "http://cdn/live", "is_live": True}))
+        self.assertIsNone(direct_media({"url": "http://cdn/video.mp4", "protocol": "http"}))
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
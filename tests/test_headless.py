@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains test cases for the headless.py module."""
+
+from __future__ import unicode_literals
+
+import io
+import sys
+import shutil
+import os.path
+import tempfile
+import unittest
+
+PATH = os.path.realpath(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
+
+try:
+    import mock
+
+    from youtube_dl_gui.headless import HeadlessApp, read_urls
+    from youtube_dl_gui.events import send_event
+except ImportError as error:
+    print error
+    sys.exit(1)
+
+
+class TestReadUrls(unittest.TestCase):
+
+    """Test case for the read_urls function."""
+
+    def test_read_urls(self):
+        urls_file = io.BytesIO(b"url1\n\n  url2  \r\nurl3")
+        self.assertEqual(read_urls(urls_file), ["url1", "url2", "url3"])
+
+
+class TestHeadlessApp(unittest.TestCase):
+
+    """Test case for the HeadlessApp object."""
+
+    def setUp(self):
+        self.config_path = tempfile.mkdtemp()
+
+        options = {
+            "download_archive": "",
+            "skip_downloaded": True,
+            "save_path": self.config_path
+        }
+
+        self.output = io.BytesIO()
+        self.opt_manager = mock.Mock(options=options, config_path=self.config_path)
+        self.app = HeadlessApp(self.opt_manager, output=self.output)
+        self.app._options_parser = mock.Mock()
+        self.app._options_parser.parse.return_value = ("--newline",)
+
+    def tearDown(self):
+        shutil.rmtree(self.config_path)
+
+    def fake_download_manager(self, *args):
+        """Send the events of a single successful download."""
+        object_id = self.app._download_list.get_items()[0].object_id
+
+        send_event("dlworker", ("send", {"index": object_id, "status": "Downloading", "filename": "video",
+                                         "extension": ".mp4", "path": self.config_path}))
+        send_event("dlworker", ("send", {"index": object_id, "status": "Finished", "percent": "100%",
+                                         "filesize": "1.00MiB"}))
+        send_event("dlmanager", "finished")
+
+        with open(os.path.join(self.config_path, "video.mp4"), "wb"):
+            pass
+
+        return mock.Mock(time_it_took=1)
+
+    @mock.patch("youtube_dl_gui.headless.DownloadManager")
+    def test_run(self, mock_download_manager):
+        mock_download_manager.side_effect = self.fake_download_manager
+
+        self.assertEqual(self.app.add_urls(["url", "url"]), 1)
+        self.assertEqual(self.app.run(), 0)
+
+        lines = self.output.getvalue().splitlines()
+
+        self.assertIn("Downloading", lines[0])
+        self.assertIn("Finished", lines[1])
+        self.assertTrue(lines[2].startswith("Completed 1 of 1"))
+
+        # The download got recorded on the history
+        app = HeadlessApp(self.opt_manager, output=io.BytesIO())
+        app._options_parser = self.app._options_parser
+        app.add_urls(["url"])
+
+        self.assertEqual(app._download_list.get_items()[0].progress_stats["status"], "Already Downloaded")
+
+    @mock.patch("youtube_dl_gui.headless.DownloadManager")
+    def test_run_failed(self, mock_download_manager):
+        def fake_download_manager(*args):
+            object_id = self.app._download_list.get_items()[0].object_id
+
+            send_event("dlworker", ("send", {"index": object_id, "status": "Error"}))
+            send_event("dlmanager", "finished")
+
+            return mock.Mock(time_it_took=1)
+
+        mock_download_manager.side_effect = fake_download_manager
+
+        self.app.add_urls(["url"])
+        self.assertEqual(self.app.run(), 1)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains test cases for the history.py module."""
+
+from __future__ import unicode_literals
+
+import sys
+import shutil
+import os.path
+import tempfile
+import unittest
+
+PATH = os.path.realpath(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
+
+try:
+    from youtube_dl_gui.history import DownloadHistory, DownloadArchive
+    from youtube_dl_gui.downloadmanager import DownloadItem
+except ImportError as error:
+    print error
+    sys.exit(1)
+
+
+class TestDownloadHistory(unittest.TestCase):
+
+    """Test case for the DownloadHistory object."""
+
+    def setUp(self):
+        self.config_path = tempfile.mkdtemp()
+        self.history = DownloadHistory(self.config_path)
+
+    def tearDown(self):
+        self.history.close()
+        shutil.rmtree(self.config_path)
+
+    def create_item(self, url, filename="video"):
+        item = DownloadItem(url, ("--newline",))
+        item.update_stats({"path": self.config_path, "filename": filename, "extension": ".mp4",
+                           "extractor": "youtube", "video_id": url[-3:]})
+        item.update_stats({"percent": "100%", "filesize": "1.00MiB", "status": "Finished"})
+
+        with open(item.get_files()[0], "wb"):
+            pass
+
+        return item
+
+    def test_add(self):
+        item = self.create_item("url001")
+        self.history.add(item)
+        self.history.add(item)
+
+        self.assertEqual(len(self.history), 1)
+        self.assertTrue(self.history.has_url("url001"))
+        self.assertTrue(self.history.has_video("youtube", "001"))
+        self.assertFalse(self.history.has_url("url002"))
+
+    def test_lookup(self):
+        self.history.add(self.create_item("url001"))
+
+        downloaded = self.history.lookup(["url001", "url002"])
+
+        self.assertEqual(list(downloaded.keys()), ["url001"])
+
+        new_item = DownloadItem("url001", ("--newline",))
+        new_item.update_stats(downloaded["url001"])
+
+        self.assertEqual(new_item.stage, "Completed")
+        self.assertEqual(new_item.progress_stats["status"], "Already Downloaded")
+        self.assertEqual(new_item.get_files(), [os.path.join(self.config_path, "video.mp4")])
+        self.assertEqual(new_item.filesizes, [1048576.0])
+
+    def test_lookup_missing_files(self):
+        item = self.create_item("url001")
+        self.history.add(item)
+
+        os.remove(item.get_files()[0])
+
+        self.assertEqual(self.history.lookup(["url001"]), {})
+
+    def test_lookup_many(self):
+        self.history.add(self.create_item("url001"))
+
+        urls = ["url%d" % index for index in range(2000)] + ["url001"]
+
+        self.assertEqual(list(self.history.lookup(urls).keys()), ["url001"])
+
+    def test_persistence(self):
+        self.history.add(self.create_item("url001"))
+        self.history.close()
+
+        self.history = DownloadHistory(self.config_path)
+        self.assertTrue(self.history.has_url("url001"))
+
+
+class TestDownloadArchive(unittest.TestCase):
+
+    """Test case for the DownloadArchive object."""
+
+    def setUp(self):
+        self.config_path = tempfile.mkdtemp()
+        self.archive_file = os.path.join(self.config_path, "archive.txt")
+
+        with open(self.archive_file, "wb") as archive_file:
+            archive_file.write(b"youtube dQw4w9WgXcQ\nvimeo 12345\n")
+
+        self.archive = DownloadArchive(self.archive_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.config_path)
+
+    def test_load(self):
+        self.assertEqual(len(self.archive), 2)
+        self.assertTrue(self.archive.has_video("Vimeo", "12345"))
+        self.assertFalse(self.archive.has_video("vimeo", "54321"))
+
+    def test_has_url(self):
+        self.assertTrue(self.archive.has_url("https://www.youtube.com/watch?v=dQw4w9WgXcQ"))
+        self.assertTrue(self.archive.has_url("https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ"))
+        self.assertTrue(self.archive.has_url("https://youtu.be/dQw4w9WgXcQ"))
+        self.assertFalse(self.archive.has_url("https://youtu.be/aaaaaaaaaaa"))
+        self.assertFalse(self.archive.has_url("https://vimeo.com/12345"))
+
+    def test_has_item(self):
+        item = DownloadItem("https://vimeo.com/12345", ("--newline",))
+        self.assertFalse(self.archive.has_item(item))
+
+        item.update_stats({"extractor": "vimeo", "video_id": "12345"})
+        self.assertTrue(self.archive.has_item(item))
+
+    def test_refresh_reads_appended_lines(self):
+        with open(self.archive_file, "ab") as archive_file:
+            archive_file.write(b"youtube aaaaaaaaaaa\nyoutube bbbb")
+
+        self.archive.refresh()
+
+        self.assertTrue(self.archive.has_video("youtube", "aaaaaaaaaaa"))
+        self.assertFalse(self.archive.has_video("youtube", "bbbb"))
+
+        with open(self.archive_file, "ab") as archive_file:
+            archive_file.write(b"bbbbbbb\n")
+
+        self.archive.refresh()
+
+        self.assertTrue(self.archive.has_video("youtube", "bbbbbbbbbbb"))
+
+    def test_add(self):
+        self.archive.add("youtube", "aaaaaaaaaaa")
+        self.archive.add("youtube", "aaaaaaaaaaa")
+        self.archive.add("vimeo", "12345")
+
+        with open(self.archive_file, "rb") as archive_file:
+            self.assertEqual(archive_file.read().count(b"\n"), 3)
+
+        self.assertTrue(DownloadArchive(self.archive_file).has_video("youtube", "aaaaaaaaaaa"))
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
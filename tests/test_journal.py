@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains test cases for the journal.py module."""
+
+from __future__ import unicode_literals
+
+import sys
+import time
+import shutil
+import os.path
+import tempfile
+import unittest
+
+PATH = os.path.realpath(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
+
+try:
+    import mock
+    from youtube_dl_gui.journal import QueueJournal
+    from youtube_dl_gui.downloadmanager import DownloadItem, DownloadList
+except ImportError as error:
+    print error
+    sys.exit(1)
+
+
+class TestQueueJournal(unittest.TestCase):
+
+    """Test case for the QueueJournal object."""
+
+    def setUp(self):
+        self.config_path = tempfile.mkdtemp()
+        self.options = ("--newline", "-f", "mp4")
+        self.journals = []
+
+    def tearDown(self):
+        for journal in self.journals:
+            journal.close()
+
+        shutil.rmtree(self.config_path)
+
+    def create_journal(self):
+        journal = QueueJournal(self.config_path)
+        self.journals.append(journal)
+        return journal
+
+    def create_list(self):
+        journal = self.create_journal()
+        return DownloadList(journal.load(), journal), journal
+
+    def reload_list(self, journal):
+        journal.close()
+        return self.create_list()[0]
+
+    def test_load_empty(self):
+        self.assertEqual(QueueJournal(self.config_path).load(), [])
+
+    def test_restore_items(self):
+        dlist, journal = self.create_list()
+
+        items = [DownloadItem("url%d" % index, self.options) for index in range(3)]
+        items[0].path = "/home/user"
+
+        dlist.insert(items[0])
+        dlist.insert_many(items[1:])
+        dlist.remove(items[1].object_id)
+        dlist.move_up(items[2].object_id)
+
+        restored = self.reload_list(journal).get_items()
+
+        self.assertEqual([item.url for item in restored], ["url2", "url0"])
+        self.assertEqual(restored[1].path, "/home/user")
+        self.assertEqual(restored[1].options, self.options)
+        self.assertEqual(restored[1].object_id, items[0].object_id)
+
+    def test_restore_stage(self):
+        dlist, journal = self.create_list()
+
+        item = DownloadItem("url", self.options)
+        dlist.insert(item)
+
+        dlist.change_stage(item.object_id, "Active")
+        dlist.update_stats(item.object_id, {"filename": "video", "extension": ".mp4",
+                                            "path": "/home/user", "status": "Finished"})
+
+        restored = self.reload_list(journal).get_item(item.object_id)
+
+        self.assertEqual(restored.stage, "Completed")
+        self.assertEqual(restored.progress_stats["status"], "Finished")
+        self.assertEqual(restored.get_files(), ["/home/user/video.mp4"])
+
+    def test_restore_active_as_queued(self):
+        dlist, journal = self.create_list()
+
+        item = DownloadItem("url", self.options)
+        dlist.insert(item)
+        dlist.change_stage(item.object_id, "Active")
+
+        restored = self.reload_list(journal).get_item(item.object_id)
+
+        self.assertEqual(restored.stage, "Queued")
+        self.assertEqual(restored.progress_stats["status"], "Queued")
+
+    def test_ignore_partial_record(self):
+        dlist, journal = self.create_list()
+        dlist.insert(DownloadItem("url", self.options))
+        journal.close()
+
+        with open(journal.journal_file, "ab") as journal_file:
+            journal_file.write(b'["a",1,"ur')
+
+        self.assertEqual(len(self.create_list()[0]), 1)
+
+    def test_replay_many_moves(self):
+        dlist, journal = self.create_list()
+
+        items = [DownloadItem("url%d" % index, self.options) for index in range(20000)]
+        dlist.insert_many(items)
+
+        for index in range(500):
+            dlist.move_up(items[index * 7 + 1].object_id)
+            dlist.move_down(items[-index - 1].object_id)
+
+        order = [item.object_id for item in dlist.get_items()]
+        journal.close()
+
+        journal = self.create_journal()
+
+        with mock.patch.object(journal, "_move") as move_mock:
+            restored = DownloadList(journal.load(), journal)
+
+        self.assertFalse(move_mock.called)
+        self.assertEqual([item.object_id for item in restored.get_items()], order)
+
+    def test_replay_many_moves_to_top(self):
+        dlist, journal = self.create_list()
+
+        items = [DownloadItem("url%d" % index, self.options) for index in range(20000)]
+        dlist.insert_many(items)
+
+        for index in range(1000):
+            dlist.move_to_top(items[index * 19].object_id)
+            dlist.move_to_bottom(items[index * 17 + 3].object_id)
+
+        order = [item.object_id for item in dlist.get_items()]
+        journal.close()
+
+        journal = self.create_journal()
+
+        with mock.patch.object(journal, "_move") as move_mock:
+            restored = DownloadList(journal.load(), journal)
+
+        self.assertFalse(move_mock.called)
+        self.assertEqual([item.object_id for item in restored.get_items()], order)
+
+    def test_replay_without_load(self):
+        journal = self.create_journal()
+        items_data = {}
+
+        journal._replay(["a", 1, "url", 0, None], {}, items_data)
+        journal._replay(["t", 1], {}, items_data)
+
+        self.assertEqual(items_data[1][0], -1)
+
+    def test_flush_idle(self):
+        journal = QueueJournal(self.config_path)
+        journal.FLUSH_INTERVAL = 0.1
+        journal.load()
+
+        journal._last_flush = time.time()
+        journal.add(DownloadItem("url", self.options))
+
+        time.sleep(0.5)
+
+        with open(journal.journal_file, "rb") as journal_file:
+            self.assertIn(b'"url"', journal_file.read())
+
+        journal.close()
+
+    def test_compaction(self):
+        dlist, journal = self.create_list()
+        journal.COMPACT_MIN_RECORDS = 10
+
+        item = DownloadItem("url", self.options)
+        dlist.insert(item)
+
+        for _ in range(20):
+            dlist.change_stage(item.object_id, "Paused")
+
+        self.assertLessEqual(journal._records, journal.COMPACT_MIN_RECORDS)
+
+        restored = self.reload_list(journal).get_item(item.object_id)
+        self.assertEqual(restored.stage, "Paused")
+
+    def test_compaction_priority(self):
+        dlist, journal = self.create_list()
+        journal.COMPACT_MIN_RECORDS = 10
+
+        items = [DownloadItem("url%d" % index, self.options) for index in range(2)]
+        dlist.insert_many(items)
+        dlist.set_priority(items[1].object_id, 2)
+
+        for _ in range(20):
+            dlist.move_to_top(items[0].object_id)
+            dlist.move_to_bottom(items[0].object_id)
+
+        restored = self.reload_list(journal)
+
+        self.assertLessEqual(journal._records, journal.COMPACT_MIN_RECORDS)
+        self.assertEqual([item.url for item in restored.get_items()], ["url1", "url0"])
+        self.assertEqual(restored.get_item(items[1].object_id).priority, 2)
+        self.assertEqual(restored.fetch_next(), restored.get_item(items[1].object_id))
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains test cases for the metrics module."""
+
+from __future__ import unicode_literals
+
+import sys
+import os.path
+import unittest
+
+PATH = os.path.realpath(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
+
+try:
+    import mock
+    from youtube_dl_gui.metrics import (
+        MetricsRegistry,
+        METRICS,
+        update_queue_metrics,
+        parse_speed
+    )
+except ImportError as error:
+    print error
+    sys.exit(1)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    """Test case for the MetricsRegistry class."""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.register("test_total", "counter", "Test counter.")
+        self.registry.register("test_gauge", "gauge", "Test gauge.")
+        self.registry.register("test_seconds", "summary", "Test summary.")
+
+    def test_inc(self):
+        self.registry.inc("test_total")
+        self.registry.inc("test_total", 2.5)
+        self.registry.inc("test_total", worker="a")
+
+        self.assertEqual(self.registry.get("test_total"), 3.5)
+        self.assertEqual(self.registry.get("test_total", worker="a"), 1)
+        self.assertEqual(self.registry.get("test_total", worker="b"), 0)
+
+    def test_set(self):
+        self.registry.set("test_gauge", 5)
+        self.registry.set("test_gauge", 3)
+
+        self.assertEqual(self.registry.get("test_gauge"), 3)
+
+    def test_observe(self):
+        self.registry.observe("test_seconds", 0.5)
+        self.registry.observe("test_seconds", 1.5)
+
+        self.assertEqual(self.registry.get("test_seconds"), (2.0, 2))
+
+    def test_unknown_metric(self):
+        self.assertRaises(KeyError, self.registry.inc, "unknown")
+
+    def test_render(self):
+        self.registry.inc("test_total", 2, status="Finished")
+        self.registry.set("test_gauge", 0.25, path="a\"b")
+        self.registry.observe("test_seconds", 1.5)
+
+        self.assertEqual(self.registry.render(),
+                         "# HELP test_total Test counter.\n"
+                         "# TYPE test_total counter\n"
+                         "test_total{status=\"Finished\"} 2\n"
+                         "# HELP test_gauge Test gauge.\n"
+                         "# TYPE test_gauge gauge\n"
+                         "test_gauge{path=\"a\\\"b\"} 0.25\n"
+                         "# HELP test_seconds Test summary.\n"
+                         "# TYPE test_seconds summary\n"
+                         "test_seconds_sum 1.5\n"
+                         "test_seconds_count 1\n")
+
+    def test_clear(self):
+        self.registry.inc("test_total")
+        self.registry.clear()
+
+        self.assertEqual(self.registry.get("test_total"), 0)
+
+
+class TestUpdateQueueMetrics(unittest.TestCase):
+
+    """Test case for the update_queue_metrics function."""
+
+    def test_update_queue_metrics(self):
+        items = [
+            mock.Mock(stage="Active", progress_stats={"speed": "1.00MiB/s"}),
+            mock.Mock(stage="Active", progress_stats={"speed": "512.00KiB/s"}),
+            mock.Mock(stage="Active", progress_stats={"speed": "-"}),
+            mock.Mock(stage="Queued", progress_stats={"speed": "-"})
+        ]
+
+        download_list = mock.Mock()
+        download_list.get_items.return_value = items
+
+        update_queue_metrics(download_list)
+
+        self.assertEqual(METRICS.get("youtubedlg_items", stage="Active"), 3)
+        self.assertEqual(METRICS.get("youtubedlg_items", stage="Queued"), 1)
+        self.assertEqual(METRICS.get("youtubedlg_items", stage="Error"), 0)
+        self.assertEqual(METRICS.get("youtubedlg_download_speed_bytes"), 1572864.0)
+
+    def test_parse_speed(self):
+        self.assertEqual(parse_speed("2.00KiB/s"), 2048.0)
+        self.assertEqual(parse_speed("Unknown speed"), 0.0)
+        self.assertEqual(parse_speed(""), 0.0)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
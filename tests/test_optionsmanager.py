@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains test cases for the optionsmanager.py module."""
+
+from __future__ import unicode_literals
+
+import sys
+import shutil
+import os.path
+import tempfile
+import unittest
+
+PATH = os.path.realpath(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
+
+try:
+    import mock
+
+    from youtube_dl_gui.optionsmanager import OptionsManager
+except ImportError as error:
+    print error
+    sys.exit(1)
+
+
+class TestSaveToFile(unittest.TestCase):
+
+    """Test case for the OptionsManager save_to_file method."""
+
+    def setUp(self):
+        # The app config path is always unicode (see utils.get_config_path)
+        self.config_path = unicode(tempfile.mkdtemp())
+        self.opt_manager = OptionsManager(self.config_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.config_path)
+
+    def test_save_and_load(self):
+        self.opt_manager.options["save_path"] = "/home/user"
+        self.opt_manager.options["password"] = "secret"
+
+        self.assertTrue(self.opt_manager.save_to_file())
+
+        opt_manager = OptionsManager(self.config_path)
+
+        self.assertEqual(opt_manager.options["save_path"], "/home/user")
+        self.assertEqual(opt_manager.options["password"], "")
+        self.assertFalse(opt_manager.is_dirty())
+        self.assertFalse(os.path.exists(opt_manager.settings_file + ".tmp"))
+
+    def test_unchanged_options_are_not_saved(self):
+        self.assertTrue(self.opt_manager.save_to_file())
+        self.assertFalse(self.opt_manager.save_to_file())
+
+        self.opt_manager.options["save_path"] = "/home/user"
+        self.assertTrue(self.opt_manager.is_dirty())
+        self.assertTrue(self.opt_manager.save_to_file())
+
+    @mock.patch("youtube_dl_gui.optionsmanager.os.rename")
+    def test_failed_save_keeps_settings_file(self, mock_rename):
+        mock_rename.side_effect = OSError
+
+        self.opt_manager.options["save_path"] = "/home/user"
+        self.assertRaises(OSError, self.opt_manager.save_to_file)
+
+        self.assertFalse(os.path.exists(self.opt_manager.settings_file))
+        self.assertFalse(os.path.exists(self.opt_manager.settings_file + ".tmp"))
+        self.assertTrue(self.opt_manager.is_dirty())
+
+    def test_request_save_is_debounced(self):
+        self.opt_manager.SAVE_DELAY = 0.05
+
+        with mock.patch.object(self.opt_manager, "save_to_file") as mock_save:
+            for _ in range(5):
+                self.opt_manager.request_save()
+
+            self.opt_manager._save_timer.join()
+
+        mock_save.assert_called_once_with(self.opt_manager.options)
+
+    def test_request_save_snapshot(self):
+        self.opt_manager.SAVE_DELAY = 0.05
+        self.opt_manager.options["save_path"] = "/home/user"
+        self.opt_manager.request_save()
+
+        # Changed by the GUI thread while the timer waits
+        self.opt_manager.options["save_path"] = "/home/other"
+        self.opt_manager._save_timer.join()
+
+        self.assertEqual(OptionsManager(self.config_path).options["save_path"], "/home/user")
+        self.assertTrue(self.opt_manager.is_dirty())
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -132,6 +132,32 @@ class TestParse(unittest.TestCase):
 
         self.check_options_parse(expected_cmd_list)
 
+    def test_parse_download_archive(self):
+        self.options_dict["download_archive"] = "/home/user/archive.txt"
+
+        expected_cmd_list = ["--newline",
+                             "--download-archive",
+                             "/home/user/archive.txt",
+                             "-o",
+                             "/home/user/Workplace/test/youtube/%(title)s.%(ext)s"]
+
+        self.check_options_parse(expected_cmd_list)
+
+    def test_parse_is_memoized(self):
+        options_parser = OptionsParser()
+
+        options = options_parser.parse(self.options_dict)
+
+        self.assertIsInstance(options, tuple)
+        self.assertIs(options_parser.parse(dict(self.options_dict)), options)
+
+        # Options unrelated to the parsing should not invalidate the cache
+        self.options_dict["workers_number"] = 5
+        self.assertIs(options_parser.parse(self.options_dict), options)
+
+        self.options_dict["video_format"] = "mp4"
+        self.assertNotEqual(options_parser.parse(self.options_dict), options)
+
 
 def main():
     unittest.main()
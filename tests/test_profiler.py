@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains test cases for the profiler module."""
+
+from __future__ import unicode_literals
+
+import sys
+import shutil
+import os.path
+import tempfile
+import unittest
+
+PATH = os.path.realpath(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
+
+try:
+    import mock
+
+    from youtube_dl_gui.profiler import Histogram, Profiler
+except ImportError as error:
+    print error
+    sys.exit(1)
+
+
+class TestHistogram(unittest.TestCase):
+
+    """Test case for the Histogram class."""
+
+    def setUp(self):
+        self.histogram = Histogram((0.1, 0.2, 0.5))
+
+    def test_add(self):
+        for value in (0.05, 0.1, 0.15, 0.3, 2.0):
+            self.histogram.add(value)
+
+        self.assertEqual(self.histogram.counts, [2, 1, 1, 1])
+        self.assertEqual(self.histogram.count, 5)
+        self.assertAlmostEqual(self.histogram.total, 2.6)
+        self.assertEqual(self.histogram.max, 2.0)
+
+    def test_percentile(self):
+        for value in [0.05] * 90 + [0.3] * 9 + [1.0]:
+            self.histogram.add(value)
+
+        self.assertEqual(self.histogram.percentile(50), 0.1)
+        self.assertEqual(self.histogram.percentile(95), 0.5)
+        self.assertIsNone(self.histogram.percentile(100))
+
+    def test_percentile_empty(self):
+        self.assertIsNone(self.histogram.percentile(50))
+
+
+class TestProfiler(unittest.TestCase):
+
+    """Test case for the Profiler class."""
+
+    def setUp(self):
+        self.profiler = Profiler()
+
+    @mock.patch("youtube_dl_gui.profiler.time.time")
+    def test_wrap(self, time_mock):
+        time_mock.side_effect = [10.0, 10.004]
+
+        func = self.profiler.wrap("handler", lambda value: value * 2)
+
+        self.assertEqual(func(21), 42)
+
+        histogram = self.profiler._histograms["handler"]
+        self.assertEqual(histogram.count, 1)
+        self.assertAlmostEqual(histogram.max, 0.004)
+
+    def test_wrap_exception(self):
+        def func():
+            raise ValueError
+
+        self.assertRaises(ValueError, self.profiler.wrap("handler", func))
+        self.assertEqual(self.profiler._histograms["handler"].count, 1)
+
+    def test_report(self):
+        self.profiler.record("gui.timer", 0.0015)
+        self.profiler.record("gui.timer", 0.0025)
+        self.profiler.record("worker.handle_line", 3.0)
+
+        lines = self.profiler.report().splitlines()
+
+        self.assertEqual(lines[0].split(), ["name", "count", "mean(ms)", "p50(ms)", "p95(ms)", "max(ms)"])
+        self.assertEqual(lines[1].split(), ["gui.timer", "2", "2.000", "<=2", "<=5", "2.500"])
+        self.assertEqual(lines[2].split(), ["worker.handle_line", "1", "3000.000", ">1000", ">1000", "3000.000"])
+
+        self.profiler.clear()
+        self.assertEqual(len(self.profiler.report().splitlines()), 1)
+
+    def test_profile(self):
+        stats_dir = tempfile.mkdtemp()
+        stats_file = os.path.join(stats_dir, "profile.pstats")
+
+        try:
+            self.profiler.start_profile()
+            self.assertTrue(self.profiler.profiling)
+
+            sorted(range(1000))
+
+            report = self.profiler.stop_profile(stats_file)
+
+            self.assertFalse(self.profiler.profiling)
+            self.assertIn("cumulative", report)
+            self.assertTrue(os.path.getsize(stats_file) > 0)
+        finally:
+            shutil.rmtree(stats_dir)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
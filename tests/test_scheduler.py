@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains test cases for the scheduler module."""
+
+from __future__ import unicode_literals
+
+import sys
+import os.path
+import unittest
+
+PATH = os.path.realpath(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
+
+try:
+    import mock
+
+    from youtube_dl_gui.downloadmanager import DownloadList, DownloadItem
+    from youtube_dl_gui.scheduler import (
+        HostRoundRobinPolicy,
+        SmallestFirstPolicy,
+        LargestFirstPolicy,
+        SchedulingPolicy,
+        get_policy
+    )
+except ImportError as error:
+    print error
+    sys.exit(1)
+
+
+def item(object_id=0, url="http://www.youtube.com/watch?v=1", expected_size=0, duration=0):
+    return mock.Mock(object_id=object_id, url=url, expected_size=expected_size, duration=duration)
+
+
+class TestSizePolicies(unittest.TestCase):
+
+    """Test case for the SmallestFirstPolicy & LargestFirstPolicy classes."""
+
+    def setUp(self):
+        self.items = [item(expected_size=2000), item(expected_size=1000), item(duration=60), item()]
+
+    def test_smallest_first(self):
+        policy = SmallestFirstPolicy()
+        items = sorted(self.items, key=policy.key)
+
+        self.assertEqual(items, [self.items[1], self.items[0], self.items[2], self.items[3]])
+
+    def test_largest_first(self):
+        policy = LargestFirstPolicy()
+        items = sorted(self.items, key=policy.key)
+
+        self.assertEqual(items, [self.items[0], self.items[1], self.items[2], self.items[3]])
+
+
+class TestHostRoundRobinPolicy(unittest.TestCase):
+
+    """Test case for the HostRoundRobinPolicy class."""
+
+    def setUp(self):
+        self.policy = HostRoundRobinPolicy()
+
+    def test_key(self):
+        urls = ["http://www.youtube.com/1", "https://youtube.com/2", "http://vimeo.com/1", "http://www.youtube.com/3"]
+        keys = [self.policy.key(item(index, url)) for index, url in enumerate(urls)]
+
+        self.assertEqual(keys, [0, 1, 0, 2])
+
+        # Stable keys
+        self.assertEqual(self.policy.key(item(1, urls[1])), 1)
+
+    def test_forget(self):
+        self.policy.key(item(0))
+        self.policy.forget(0)
+        self.policy.forget(1)
+
+        self.assertEqual(self.policy._turns, {})
+
+    def test_release(self):
+        self.policy.key(item(0))
+        self.policy.key(item(1))
+        self.policy.release(mock.Mock(object_id=1, stage="Active"))
+
+        self.assertEqual(self.policy._first_turn, 2)
+
+        # Items leaving the queue without a dispatch do not move the turns
+        self.policy.release(mock.Mock(object_id=0, stage="Paused"))
+
+        self.assertEqual(self.policy._first_turn, 2)
+        self.assertEqual(self.policy._turns, {})
+
+    def test_host_history(self):
+        dlist = DownloadList()
+        dlist.set_policy(self.policy)
+
+        for index in range(3):
+            dlist.insert(DownloadItem("http://a.com/old%d" % index, []))
+
+        while True:
+            next_item = dlist.fetch_next()
+
+            if next_item is None:
+                break
+
+            dlist.change_stage(next_item.object_id, "Active")
+            dlist.change_stage(next_item.object_id, "Completed")
+
+        items = [DownloadItem(url, []) for url in ("http://a.com/1", "http://a.com/2", "http://b.com/1", "http://b.com/2")]
+        dlist.insert_many(items)
+
+        order = []
+
+        for _ in items:
+            next_item = dlist.fetch_next()
+            dlist.change_stage(next_item.object_id, "Active")
+            order.append(next_item.url)
+
+        self.assertEqual(order, ["http://a.com/1", "http://b.com/1", "http://a.com/2", "http://b.com/2"])
+
+    def test_get_host(self):
+        self.assertEqual(HostRoundRobinPolicy.get_host("https://WWW.Example.com:8080/a"), "example.com:8080")
+        self.assertEqual(HostRoundRobinPolicy.get_host("not a url"), "")
+
+
+class TestGetPolicy(unittest.TestCase):
+
+    """Test case for the get_policy function."""
+
+    def test_get_policy(self):
+        self.assertIsInstance(get_policy("smallest"), SmallestFirstPolicy)
+        self.assertIsInstance(get_policy("host"), HostRoundRobinPolicy)
+        self.assertEqual(type(get_policy("queue")), SchedulingPolicy)
+        self.assertEqual(type(get_policy("invalid")), SchedulingPolicy)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains test cases for the updatemanager.py module."""
+
+from __future__ import unicode_literals
+
+import sys
+import shutil
+import os.path
+import tempfile
+import unittest
+import threading
+
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+PATH = os.path.realpath(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PATH)))
+
+try:
+    import mock
+
+    from youtube_dl_gui.updatemanager import UpdateThread
+    from youtube_dl_gui.events import set_event_sink
+    from youtube_dl_gui.utils import YOUTUBEDL_BIN
+except ImportError as error:
+    print error
+    sys.exit(1)
+
+
+class FakeUpdateHandler(BaseHTTPRequestHandler):
+
+    """Local stand-in for the youtube-dl download server."""
+
+    ETAG = '"v1"'
+    BODY = b"print 'youtube-dl'\n"
+
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(dict(self.headers))
+
+        if self.headers.getheader('If-None-Match') == self.ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('ETag', self.ETAG)
+        self.send_header('Last-Modified', 'Sat, 01 Jul 2017 00:00:00 GMT')
+        self.send_header('Content-Length', str(len(self.BODY)))
+        self.end_headers()
+        self.wfile.write(self.BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestUpdateThread(unittest.TestCase):
+
+    """Test case for the UpdateThread conditional requests."""
+
+    def setUp(self):
+        FakeUpdateHandler.requests = []
+
+        self.server = HTTPServer(('127.0.0.1', 0), FakeUpdateHandler)
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+        self.download_path = tempfile.mkdtemp()
+        self.binary = os.path.join(self.download_path, YOUTUBEDL_BIN)
+
+        url = 'http://127.0.0.1:{0}/downloads/2017.07.01/'.format(self.server.server_address[1])
+
+        self.url_patcher = mock.patch.object(UpdateThread, 'LATEST_YOUTUBE_DL', url)
+        self.url_patcher.start()
+
+        self.event_sink = mock.Mock()
+        set_event_sink(self.event_sink)
+
+    def tearDown(self):
+        set_event_sink(None)
+        self.url_patcher.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.download_path)
+
+    def run_update(self):
+        self.event_sink.reset_mock()
+        UpdateThread(self.download_path, quiet=True).join()
+        return [call[0][1][0] for call in self.event_sink.call_args_list]
+
+    def test_first_update_downloads_binary(self):
+        self.assertEqual(self.run_update(), ['download', 'correct'])
+
+        with open(self.binary, 'rb') as binary:
+            self.assertEqual(binary.read(), FakeUpdateHandler.BODY)
+
+        self.assertNotIn('if-none-match', FakeUpdateHandler.requests[0])
+
+    def test_second_update_is_conditional(self):
+        self.run_update()
+        mtime = os.path.getmtime(self.binary)
+
+        self.assertEqual(self.run_update(), ['download', 'latest'])
+        self.assertEqual(FakeUpdateHandler.requests[1]['if-none-match'], FakeUpdateHandler.ETAG)
+        self.assertEqual(os.path.getmtime(self.binary), mtime)
+
+    def test_missing_binary_ignores_validators(self):
+        self.run_update()
+        os.remove(self.binary)
+
+        self.assertEqual(self.run_update(), ['download', 'correct'])
+        self.assertNotIn('if-none-match', FakeUpdateHandler.requests[1])
+        self.assertTrue(os.path.exists(self.binary))
+
+    def test_failed_write_removes_temp_file(self):
+        thread = UpdateThread.__new__(UpdateThread)
+
+        with mock.patch("youtube_dl_gui.updatemanager.os.rename", side_effect=OSError):
+            self.assertRaises(OSError, thread._write_binary, b"data", self.binary)
+
+        self.assertEqual(os.listdir(self.download_path), [])
+
+    @mock.patch("youtube_dl_gui.updatemanager.os.name", "nt")
+    def test_failed_write_restores_binary(self):
+        with open(self.binary, "wb") as binary:
+            binary.write(b"old")
+
+        real_rename = os.rename
+
+        def rename(source, destination):
+            if source.endswith(".tmp"):
+                raise OSError
+            real_rename(source, destination)
+
+        thread = UpdateThread.__new__(UpdateThread)
+
+        with mock.patch("youtube_dl_gui.updatemanager.os.rename", side_effect=rename):
+            self.assertRaises(OSError, thread._write_binary, b"new", self.binary)
+
+        self.assertEqual(os.listdir(self.download_path), [YOUTUBEDL_BIN])
+
+        with open(self.binary, "rb") as binary:
+            self.assertEqual(binary.read(), b"old")
+
+    def test_stores_version(self):
+        self.run_update()
+
+        thread = UpdateThread.__new__(UpdateThread)
+        thread.validators_file = os.path.join(self.download_path, UpdateThread.VALIDATORS_FILENAME)
+
+        self.assertEqual(thread._load_validators(self.binary)['version'], '2017.07.01')
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -65,6 +65,20 @@ class TestFormatBytes(unittest.TestCase):
         self.assertEqual(utils.format_bytes(1099511627776.00), "1.00TiB")
 
 
+class TestFormatDuration(unittest.TestCase):
+
+    """Test case for the format_duration method."""
+
+    def test_format_duration_seconds(self):
+        self.assertEqual(utils.format_duration(4.23), "4.2s")
+
+    def test_format_duration_minutes(self):
+        self.assertEqual(utils.format_duration(185), "3m 05s")
+
+    def test_format_duration_hours(self):
+        self.assertEqual(utils.format_duration(93784), "26h 03m 04s")
+
+
 class TestBuildCommand(unittest.TestCase):
 
     """Test case for the build_command method."""
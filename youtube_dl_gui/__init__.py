@@ -20,12 +20,6 @@ import sys
 import gettext
 import os.path
 
-try:
-    import wx
-except ImportError as error:
-    print error
-    sys.exit(1)
-
 __packagename__ = "youtube_dl_gui"
 
 # For package use
@@ -42,45 +36,58 @@ from .info import (
 )
 
 gettext.install(__packagename__)
-from .formats import reload_strings
 
-from .logmanager import LogManager
-from .optionsmanager import OptionsManager
 
-from .utils import (
-    get_config_path,
-    get_locale_file,
-    os_path_exists,
-    YOUTUBEDL_BIN
-)
+def main():
+    """The real main. Creates and calls the main app windows.
 
+    The GUI modules and the managers are imported here and not on the
+    package import, so importing the package (e.g. from setup.py) does
+    not pay for them.
 
-# Set config path and create options and log managers
-config_path = get_config_path()
+    """
+    try:
+        import wx
+    except ImportError as error:
+        print error
+        sys.exit(1)
 
-opt_manager = OptionsManager(config_path)
-log_manager = None
+    from .formats import reload_strings
 
-if opt_manager.options['enable_log']:
-    log_manager = LogManager(config_path, opt_manager.options['log_time'])
+    from .logmanager import LogManager
+    from .optionsmanager import OptionsManager
 
-# Set gettext before MainFrame import
-# because the GUI strings are class level attributes
-locale_dir = get_locale_file()
+    from .utils import (
+        get_config_path,
+        get_locale_file,
+        os_path_exists,
+        YOUTUBEDL_BIN
+    )
 
-try:
-    gettext.translation(__packagename__, locale_dir, [opt_manager.options['locale_name']]).install(unicode=True)
-except IOError:
-    opt_manager.options['locale_name'] = 'en_US'
-    gettext.install(__packagename__)
+    # Set config path and create options and log managers
+    config_path = get_config_path()
 
-reload_strings()
+    opt_manager = OptionsManager(config_path)
+    log_manager = None
 
-from .mainframe import MainFrame
+    if opt_manager.options['enable_log']:
+        log_manager = LogManager(config_path, opt_manager.options['log_time'])
 
+    # Set gettext before MainFrame import
+    # because the GUI strings are class level attributes
+    locale_dir = get_locale_file()
+    locale_name = opt_manager.options['locale_name']
+
+    try:
+        gettext.translation(__packagename__, locale_dir, [locale_name]).install(unicode=True)
+    except IOError:
+        opt_manager.options['locale_name'] = 'en_US'
+        gettext.install(__packagename__)
+
+    reload_strings()
+
+    from .mainframe import MainFrame
 
-def main():
-    """The real main. Creates and calls the main app windows. """
     youtubedl_path = os.path.join(opt_manager.options["youtubedl_path"], YOUTUBEDL_BIN)
 
     app = wx.App()
@@ -20,6 +20,10 @@ Example:
 
         $ youtube-dl-gui
 
+    In order to download the URLs of a file without the GUI.
+
+        $ youtube-dl-gui --headless urls.txt
+
 """
 
 from __future__ import unicode_literals
@@ -36,4 +40,9 @@ import youtube_dl_gui
 
 
 if __name__ == '__main__':
+    if "--headless" in sys.argv[1:]:
+        from youtube_dl_gui import headless
+
+        sys.exit(headless.main(sys.argv[1:]))
+
     youtube_dl_gui.main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+
+"""Youtubedlg module that exposes the download queue over HTTP.
+
+The ApiServer listens on the localhost only and speaks JSON. It lets
+scripts & dashboards add urls, control the items and the DownloadManager
+and watch the progress without touching the GUI.
+
+Example:
+    Add a url, start the downloads and watch the progress.
+
+        $ curl -H 'Content-Type: application/json' -d '{"urls": ["URL"]}' localhost:PORT/api/items
+        $ curl -H 'Content-Type: application/json' -d '{}' localhost:PORT/api/start
+        $ curl -N localhost:PORT/api/events
+
+"""
+
+from __future__ import unicode_literals
+
+import json
+import socket
+import urlparse
+from threading import Thread, Event
+from SocketServer import ThreadingMixIn
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+from .version import __version__
+from .metrics import METRICS, update_queue_metrics
+
+
+class ApiError(Exception):
+
+    """Error that is returned to the client with the given HTTP status code."""
+
+    def __init__(self, code, message):
+        super(ApiError, self).__init__(message)
+        self.code = code
+
+
+class ApiServer(Thread):
+
+    """Localhost HTTP/JSON server that controls the download queue.
+
+    The server reads the DownloadList directly, its methods share the
+    same lock with the DownloadManager & the GUI. Every action that
+    changes the queue runs on the front-end thread using the call_after
+    callable, exactly like the button handlers of the GUI.
+
+    Endpoints:
+        GET  /api/status          State of the DownloadManager.
+        GET  /api/items           All the items or with '?since=VERSION' the
+                                  items that changed after the given version.
+                                  '&wait=SECONDS' waits for a change (long-poll).
+        GET  /api/events          Server-sent events stream of the changes.
+        POST /api/items           Add the urls of the {"urls": [...]} body.
+        POST /api/items/pause     Pause the items of the {"ids": [...]} body.
+        POST /api/items/resume    Resume the items of the {"ids": [...]} body.
+        POST /api/items/remove    Remove the items of the {"ids": [...]} body.
+        POST /api/start           Start the DownloadManager.
+        POST /api/stop            Stop the DownloadManager.
+        GET  /metrics             Metrics in the Prometheus text format,
+                                  see the metrics module.
+
+    A client whose version is older than the removals the list keeps gets
+    all the items and the order instead, the items missing from the order
+    are gone. The item ids are the object_ids as strings since they do not
+    fit in the JavaScript numbers.
+
+    The POST requests must have a JSON content type, which the browsers do
+    not send cross-origin without a preflight. The requests with a Host
+    header other than the HOST_NAMES and the port get rejected, so a DNS
+    rebinding page can not reach the API either.
+
+    Attributes:
+        HOST (string): Address to listen on.
+
+        HOST_NAMES (tuple): Accepted host names of the Host header.
+
+        STREAM_INTERVAL (float): Minimum time in seconds between two events
+            of the stream. The changes of this period get coalesced into a
+            single event with the last state of each item.
+
+        KEEPALIVE_TIME (float): Time in seconds without changes after which
+            the stream sends a keep-alive comment.
+
+        MAX_WAIT (float): Maximum long-poll time in seconds.
+
+        CALL_TIMEOUT (float): Time in seconds to wait for the front-end to
+            run an action.
+
+        MAX_BODY_SIZE (int): Maximum size of a request body in bytes.
+
+    Args:
+        controller (object): Front-end that runs the actions. It provides
+            the download_manager attribute and the api_add_urls(urls),
+            api_pause(object_ids), api_resume(object_ids),
+            api_remove(object_ids), api_start() & api_stop() methods. The
+            api_add_urls() method returns the added DownloadItems and the
+            pause, resume & remove methods the changed object_ids.
+
+        download_list (downloadmanager.DownloadList): The download queue.
+
+        port (int): Port to listen on, zero picks a free port.
+
+        call_after (callable): Callable that runs func(*args) on the
+            front-end thread (e.g. wx.CallAfter).
+
+    Raises:
+        socket.error: When the port is not available.
+
+    """
+
+    HOST = "127.0.0.1"
+    HOST_NAMES = ("127.0.0.1", "localhost")
+    STREAM_INTERVAL = 1.0
+    KEEPALIVE_TIME = 15.0
+    MAX_WAIT = 60.0
+    CALL_TIMEOUT = 10.0
+    MAX_BODY_SIZE = 1024 * 1024
+
+    def __init__(self, controller, download_list, port, call_after):
+        super(ApiServer, self).__init__()
+        self.controller = controller
+        self.download_list = download_list
+        self.daemon = True
+
+        self._call_after = call_after
+        self._closed = Event()
+
+        self._server = _HTTPServer((self.HOST, port), _RequestHandler)
+        self._server.api = self
+
+        self.hosts = frozenset("{0}:{1}".format(name, self.port) for name in self.HOST_NAMES)
+
+        self.start()
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def closed(self):
+        return self._closed.is_set()
+
+    def run(self):
+        self._server.serve_forever(poll_interval=0.5)
+
+    def close(self):
+        """Stop the server and wait for its thread to exit."""
+        self._closed.set()
+        self._server.shutdown()
+        self._server.server_close()
+        self.join()
+
+    def wait(self, timeout):
+        """Sleep for the given time or until the server gets closed."""
+        self._closed.wait(timeout)
+
+    def call(self, func, *args):
+        """Run func(*args) on the front-end thread and return its result.
+
+        Raises:
+            ApiError: When the front-end did not run the function in time.
+
+        """
+        done = Event()
+        result = {}
+
+        def _wrapper():
+            try:
+                result["value"] = func(*args)
+            except Exception as error:
+                result["error"] = error
+            finally:
+                done.set()
+
+        self._call_after(_wrapper)
+
+        if not done.wait(self.CALL_TIMEOUT):
+            raise ApiError(503, "front-end is busy")
+
+        if "error" in result:
+            raise result["error"]
+
+        return result["value"]
+
+    def get_status(self):
+        """Returns the status dictionary of the queue."""
+        version, items, removed, order = self.download_list.get_changes()
+
+        stages = {}
+
+        for item in items:
+            stages[item.stage] = stages.get(item.stage, 0) + 1
+
+        return {
+            "version": version,
+            "running": self.controller.download_manager is not None,
+            "items": len(items),
+            "stages": stages
+        }
+
+    def get_changes(self, since=0, timeout=None):
+        """Returns the changes dictionary after the given version.
+
+        See downloadmanager.DownloadList.get_changes().
+
+        """
+        version, items, removed, order = self.download_list.get_changes(since, timeout)
+
+        changes = {
+            "version": version,
+            "running": self.controller.download_manager is not None,
+            "items": [item_to_json(item) for item in items],
+            "removed": [unicode(object_id) for object_id in removed]
+        }
+
+        if order is not None:
+            changes["order"] = [unicode(object_id) for object_id in order]
+
+        return changes
+
+
+def item_to_json(download_item):
+    """Returns a JSON serializable dictionary of the given DownloadItem."""
+    return {
+        "id": unicode(download_item.object_id),
+        "url": download_item.url,
+        "stage": download_item.stage,
+        "path": download_item.path,
+        "progress_stats": dict(download_item.progress_stats),
+        "timings": dict(download_item.timings),
+        "durations": download_item.get_durations()
+    }
+
+
+class _HTTPServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+    """Handles the requests of the ApiServer."""
+
+    server_version = "youtube-dlg/" + __version__
+
+    GET_ROUTES = {
+        "/api/status": "_get_status",
+        "/api/items": "_get_items",
+        "/api/events": "_get_events",
+        "/metrics": "_get_metrics"
+    }
+
+    POST_ROUTES = {
+        "/api/items": "_post_items",
+        "/api/items/pause": "_post_pause",
+        "/api/items/resume": "_post_resume",
+        "/api/items/remove": "_post_remove",
+        "/api/start": "_post_start",
+        "/api/stop": "_post_stop"
+    }
+
+    @property
+    def api(self):
+        return self.server.api
+
+    def do_GET(self):
+        self._dispatch(self.GET_ROUTES)
+
+    def do_POST(self):
+        self._dispatch(self.POST_ROUTES)
+
+    def log_message(self, format, *args):
+        pass  # Do not write every request on the stderr
+
+    def _dispatch(self, routes):
+        url = urlparse.urlsplit(self.path)
+
+        self.query = dict(urlparse.parse_qsl(url.query))
+
+        try:
+            if self.headers.get("Host", "").lower() not in self.api.hosts:
+                raise ApiError(403, "invalid host")
+
+            if url.path not in routes:
+                raise ApiError(404, "not found")
+
+            response = getattr(self, routes[url.path])()
+
+            if response is not None:
+                self._send_json(200, response)
+        except ApiError as error:
+            self._send_json(error.code, {"error": unicode(error)})
+        except socket.error:
+            pass  # The client went away
+        except Exception as error:
+            self._send_json(500, {"error": unicode(error)})
+
+    def _send_json(self, code, data):
+        body = json.dumps(data).encode("utf-8")
+
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        if not self.headers.get("Content-Type", "").startswith("application/json"):
+            raise ApiError(415, "expected application/json")
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            raise ApiError(400, "invalid content length")
+
+        if length > self.api.MAX_BODY_SIZE:
+            raise ApiError(413, "request body too large")
+
+        try:
+            data = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+        except ValueError:
+            raise ApiError(400, "invalid JSON")
+
+        if not isinstance(data, dict):
+            raise ApiError(400, "expected a JSON object")
+
+        return data
+
+    def _read_list(self, key):
+        values = self._read_json().get(key)
+
+        if not isinstance(values, list) or not all(isinstance(value, basestring) for value in values):
+            raise ApiError(400, "'{0}' must be a list of strings".format(key))
+
+        return values
+
+    def _read_ids(self):
+        try:
+            return [int(object_id) for object_id in self._read_list("ids")]
+        except ValueError:
+            raise ApiError(400, "invalid item id")
+
+    def _get_number(self, key, default, type_func=int):
+        try:
+            return type_func(self.query.get(key, default))
+        except ValueError:
+            raise ApiError(400, "invalid '{0}' value".format(key))
+
+    def _get_status(self):
+        return self.api.get_status()
+
+    def _get_items(self):
+        since = self._get_number("since", 0)
+        wait = min(self._get_number("wait", 0, float), self.api.MAX_WAIT)
+
+        return self.api.get_changes(since, wait if wait > 0 else None)
+
+    def _get_events(self):
+        since = self._get_number("since", self.headers.get("Last-Event-ID", 0))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        while not self.api.closed:
+            changes = self.api.get_changes(since, self.api.KEEPALIVE_TIME)
+
+            if changes["version"] == since:
+                self.wfile.write(b": keep-alive\n\n")
+            else:
+                since = changes["version"]
+                self.wfile.write("id: {0}\nevent: changes\ndata: {1}\n\n".format(
+                    since, json.dumps(changes)).encode("utf-8"))
+
+            self.wfile.flush()
+
+            # Let the changes of the interval pile up into the next event
+            self.api.wait(self.api.STREAM_INTERVAL)
+
+    def _get_metrics(self):
+        update_queue_metrics(self.api.download_list)
+
+        body = METRICS.render().encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _post_items(self):
+        urls = [url.strip() for url in self._read_list("urls") if url.strip()]
+
+        if not urls:
+            raise ApiError(400, "no urls")
+
+        items = self.api.call(self.api.controller.api_add_urls, urls)
+
+        return {"added": [item_to_json(item) for item in items]}
+
+    def _post_pause(self):
+        return self._post_change(self.api.controller.api_pause)
+
+    def _post_resume(self):
+        return self._post_change(self.api.controller.api_resume)
+
+    def _post_remove(self):
+        return self._post_change(self.api.controller.api_remove)
+
+    def _post_change(self, func):
+        changed = self.api.call(func, self._read_ids())
+        return {"changed": [unicode(object_id) for object_id in changed]}
+
+    def _post_start(self):
+        self._read_json()
+        self.api.call(self.api.controller.api_start)
+        return self.api.get_status()
+
+    def _post_stop(self):
+        self._read_json()
+        self.api.call(self.api.controller.api_stop)
+        return self.api.get_status()
@@ -13,15 +13,23 @@ from __future__ import unicode_literals
 import re
 import os
 import sys
+import json
 import locale
 import signal
+import urllib2
 import subprocess
 
-from time import sleep
+from time import sleep, time
 from Queue import Queue
-from threading import Thread
+from threading import Event, Lock, Thread, Timer
 
-from .utils import convert_item
+from .utils import (
+    convert_item,
+    format_bytes,
+    remove_file
+)
+from .metrics import METRICS
+from .profiler import PROFILER
 
 
 class PipeReader(Thread):
@@ -75,6 +83,14 @@ class PipeReader(Thread):
         """Attach a filedescriptor to the PipeReader. """
         self._filedescriptor = filedesc
 
+    def wait_for_eof(self, timeout):
+        """Wait up to timeout seconds until the attached filedescriptor
+        has been read to the end. """
+        end_time = time() + timeout
+
+        while self._filedescriptor is not None and time() < end_time:
+            sleep(0.01)
+
     def join(self, timeout=None):
         self._running = False
         super(PipeReader, self).join(timeout)
@@ -91,6 +107,18 @@ class YoutubeDLDownloader(object):
             Codes with smaller hierachy cannot overwrite codes with higher
             hierarchy.
 
+        STDERR_TIMEOUT (float): Time in seconds to wait for the stderr of
+            a failed youtube-dl process to be read, see PipeReader.
+
+        STOP_TIMEOUT (float): Time in seconds the stopped youtube-dl process
+            has to exit before it gets killed, see stop().
+
+        paused (boolean): True while the youtube-dl process is suspended,
+            see pause().
+
+        last_error (string): The error lines youtube-dl wrote on stderr
+            during the last download() call, empty if there were none.
+
     Args:
         youtubedl_path (string): Absolute path to youtube-dl binary.
 
@@ -126,13 +154,20 @@ class YoutubeDLDownloader(object):
     ALREADY = 4
     STOPPED = 5
 
+    STDERR_TIMEOUT = 1.0
+    STOP_TIMEOUT = 5.0
+
     def __init__(self, youtubedl_path, data_hook=None, log_data=None):
         self.youtubedl_path = youtubedl_path
         self.data_hook = data_hook
         self.log_data = log_data
+        self.last_error = ""
+        self.paused = False
 
         self._return_code = self.OK
+        self._timings = {}
         self._proc = None
+        self._killer = None
 
         self._stderr_queue = Queue()
         self._stderr_reader = PipeReader(self._stderr_queue)
@@ -158,22 +193,46 @@ class YoutubeDLDownloader(object):
 
         """
         self._return_code = self.OK
+        self._timings = {}
+        self.last_error = ""
+        self.paused = False
 
         cmd = self._get_cmd(url, options)
+
+        start_time = time()
         self._create_process(cmd)
 
         if self._proc is not None:
             self._stderr_reader.attach_filedescriptor(self._proc.stderr)
+            self._hook_data({'timings': {'spawned': time()}})
 
         while self._proc_is_alive():
             stdout = self._proc.stdout.readline().rstrip()
             stdout = convert_item(stdout, to_unicode=True)
 
             if stdout:
+                if start_time is not None:
+                    METRICS.observe("youtubedlg_process_start_seconds", time() - start_time)
+                    start_time = None
+
+                METRICS.inc("youtubedlg_parsed_lines_total")
+
+                line_time = time()
+
                 data_dict = extract_data(stdout)
                 self._extract_info(data_dict)
+                self._add_timings(data_dict)
                 self._hook_data(data_dict)
 
+                if PROFILER.enabled:
+                    PROFILER.record("worker.handle_line", time() - line_time)
+
+        self._cancel_kill()
+
+        # The error lines must be in the queue before we read it
+        if self._proc is not None and self._proc.returncode > 0:
+            self._stderr_reader.wait_for_eof(self.STDERR_TIMEOUT)
+
         # Read stderr after download process has been completed
         # We don't need to read stderr in real time
         while not self._stderr_queue.empty():
@@ -186,6 +245,7 @@ class YoutubeDLDownloader(object):
                 self._set_returncode(self.WARNING)
             else:
                 self._set_returncode(self.ERROR)
+                self.last_error = (self.last_error + "\n" + stderr).lstrip("\n")
 
         # Set return code to ERROR if we could not start the download process
         # or the childs return code is greater than zero
@@ -204,8 +264,90 @@ class YoutubeDLDownloader(object):
 
         return self._return_code
 
+    def extract_info(self, url, options):
+        """Flat extract the info JSON of the given url.
+
+        Runs youtube-dl with the '--flat-playlist -J' options which give
+        the full info of a video but only list the entries of a playlist
+        without extracting each one of them. The process can be stopped
+        with the stop() method.
+
+        Args:
+            url (string): URL string to extract.
+            options (list): Python list that contains youtube-dl options.
+
+        Returns:
+            The info JSON string or None if the extraction failed.
+
+        """
+        self._return_code = self.OK
+
+        self._create_process(self._get_cmd(url, list(options) + ['--flat-playlist', '-J']))
+
+        if self._proc is None:
+            return None
+
+        stdout, stderr = self._proc.communicate()
+        self._cancel_kill()
+
+        if self._proc.returncode != 0:
+            for line in convert_item(stderr, to_unicode=True).splitlines():
+                self._log(line)
+
+            return None
+
+        return convert_item(stdout, to_unicode=True)
+
+    def get_filename(self, url, options):
+        """Returns the absolute path of the file youtube-dl would download
+        for the given url & options or None if youtube-dl failed.
+
+        Combined with the '--load-info-json' option youtube-dl does not
+        extract the url again. """
+        self._return_code = self.OK
+
+        self._create_process(self._get_cmd(url, list(options) + ['--get-filename']))
+
+        if self._proc is None:
+            return None
+
+        stdout, stderr = self._proc.communicate()
+        self._cancel_kill()
+
+        if self._proc.returncode != 0 or not stdout.strip():
+            for line in convert_item(stderr, to_unicode=True).splitlines():
+                self._log(line)
+
+            return None
+
+        return os.path.abspath(convert_item(stdout, to_unicode=True).strip().splitlines()[-1])
+
+    def extract_playlist(self, url, options):
+        """Flat extract the entries of the given playlist url.
+
+        See extract_info().
+
+        Returns:
+            List with the urls of the playlist entries. None if the url is
+            not a playlist or the extraction failed.
+
+        """
+        info_json = self.extract_info(url, options)
+
+        if info_json is None:
+            return None
+
+        return parse_playlist(info_json)
+
     def stop(self):
-        """Stop the download process and set return code to STOPPED. """
+        """Stop the download process and set return code to STOPPED.
+
+        On POSIX the process group gets a SIGTERM first, so youtube-dl and
+        the external downloaders can flush their '.part' files, and a
+        SIGKILL if youtube-dl is still running after STOP_TIMEOUT seconds.
+        This method does not wait.
+
+        """
         if self._proc_is_alive():
 
             if os.name == 'nt':
@@ -219,14 +361,84 @@ class YoutubeDLDownloader(object):
                 # method
                 self._proc.returncode = 0
             else:
-                os.killpg(self._proc.pid, signal.SIGKILL)
+                os.killpg(self._proc.pid, signal.SIGTERM)
+
+                # A suspended process gets the SIGTERM only after a SIGCONT
+                if self.paused:
+                    os.killpg(self._proc.pid, signal.SIGCONT)
+                    self.paused = False
+
+                self._cancel_kill()
+                self._killer = Timer(self.STOP_TIMEOUT, self._kill_group, (self._proc,))
+                self._killer.daemon = True
+                self._killer.start()
 
             self._set_returncode(self.STOPPED)
 
+    def pause(self):
+        """Suspend the youtube-dl process group with SIGSTOP.
+
+        The process keeps its progress & its connections, see resume().
+
+        Returns:
+            True on success, False if there is no process or the platform
+            does not support it (Windows).
+
+        """
+        if os.name == 'nt' or self.paused or not self._proc_is_alive():
+            return False
+
+        os.killpg(self._proc.pid, signal.SIGSTOP)
+        self.paused = True
+
+        return True
+
+    def resume(self):
+        """Continue the suspended youtube-dl process group with SIGCONT.
+
+        Returns:
+            True on success, False if the process is not suspended.
+
+        """
+        if not self.paused:
+            return False
+
+        self.paused = False
+
+        if self._proc_is_alive():
+            os.killpg(self._proc.pid, signal.SIGCONT)
+
+        return True
+
     def close(self):
         """Destructor like function for the object. """
         self._stderr_reader.join()
 
+    def _kill_group(self, proc):
+        """Kill the process group of the given stopped process.
+
+        The group outlives youtube-dl while one of its children, e.g.
+        ffmpeg, is still running. Nothing happens if a new process has
+        started in the meantime.
+
+        """
+        if proc is not self._proc:
+            return
+
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass  # The whole group has exited
+
+    def _cancel_kill(self):
+        """Cancel the SIGKILL of stop() once the whole process group has exited. """
+        if self._killer is not None:
+            try:
+                os.killpg(self._proc.pid, 0)
+            except OSError:
+                self._killer.cancel()
+                self._killer = None
+
     def _set_returncode(self, code):
         """Set self._return_code only if the hierarchy of the given code is
         higher than the current self._return_code. """
@@ -259,6 +471,10 @@ class YoutubeDLDownloader(object):
         else:
             data_dictionary['status'] = 'Filesize Abort'
 
+        data_dictionary['timings'] = {'finished': time()}
+
+        METRICS.inc("youtubedlg_downloads_total", status=data_dictionary['status'])
+
         self._hook_data(data_dictionary)
 
     def _extract_info(self, data):
@@ -283,6 +499,24 @@ class YoutubeDLDownloader(object):
                 self._set_returncode(self.FILESIZE_ABORT)
                 data['status'] = None
 
+    def _add_timings(self, data):
+        """Add the 'timings' key to the given data when the download reaches
+        a new point. See the DownloadItem 'timings' attribute. """
+        timings = {}
+
+        if data.get('status') == 'Downloading' and 'download' not in self._timings:
+            timings['download'] = time()
+
+        if data.get('percent') == '100%':
+            timings['downloaded'] = time()
+
+        if data.get('status') == 'Post Processing' and 'post_processing' not in self._timings:
+            timings['post_processing'] = time()
+
+        if timings:
+            self._timings.update(timings)
+            data['timings'] = timings
+
     def _log(self, data):
         """Log data using the callback function. """
         if self.log_data is not None:
@@ -305,16 +539,16 @@ class YoutubeDLDownloader(object):
 
         Args:
             url (string): URL string to download.
-            options (list): Python list that contains youtube-dl options.
+            options (list): Python list or tuple that contains youtube-dl options.
 
         Returns:
             Python list that contains the command to execute.
 
         """
         if os.name == 'nt':
-            cmd = [self.youtubedl_path] + options + [url]
+            cmd = [self.youtubedl_path] + list(options) + [url]
         else:
-            cmd = ['python', self.youtubedl_path] + options + [url]
+            cmd = ['python', self.youtubedl_path] + list(options) + [url]
 
         return cmd
 
@@ -355,6 +589,398 @@ class YoutubeDLDownloader(object):
             self._log(convert_item(str(error), to_unicode=True))
 
 
+class SegmentedDownloader(object):
+
+    """Download a direct media url over many HTTP connections.
+
+    Some CDNs limit the bandwidth of each connection, so each connection
+    here fetches one byte range of the file into its place of a single
+    part file. The part file is renamed to the final filename once all
+    the ranges are complete. Servers that ignore the 'Range' header get a
+    single connection. A failed or stopped download removes the part file,
+    there is no resume. A paused download keeps its connections open, the
+    threads wait between two reads until resume().
+
+    Attributes:
+        OK, ERROR, STOPPED (int): The return codes of the download() method,
+            same as the YoutubeDLDownloader ones.
+
+        PART_SUFFIX (string): Suffix of the part file. It differs from the
+            youtube-dl '.part' suffix since youtube-dl would resume a file
+            with holes.
+
+        MIN_SEGMENT_SIZE (int): Smallest byte range of a connection.
+
+        CHUNK_SIZE (int): Bytes of each read from a connection.
+
+        RETRIES (int): Number of the times a connection that failed is
+            opened again from where it stopped.
+
+        TIMEOUT (float): Socket timeout in seconds.
+
+        PROGRESS_INTERVAL (float): Time in seconds between two progress
+            reports of the data_hook.
+
+        last_error (string): The error of the last download() call, empty
+            if there was none.
+
+        paused (boolean): True if the download is paused.
+
+    Args:
+        data_hook (function): Optional callback function to retrieve the
+            progress with the same keys as the youtube-dl output, see
+            extract_data().
+
+        log_data (function): Optional callback function to write data to
+            the log file.
+
+    """
+
+    OK = YoutubeDLDownloader.OK
+    ERROR = YoutubeDLDownloader.ERROR
+    STOPPED = YoutubeDLDownloader.STOPPED
+
+    PART_SUFFIX = ".segments.part"
+    MIN_SEGMENT_SIZE = 1048576
+    CHUNK_SIZE = 65536
+    RETRIES = 3
+    TIMEOUT = 20.0
+    PROGRESS_INTERVAL = 0.5
+
+    def __init__(self, data_hook=None, log_data=None):
+        self.data_hook = data_hook
+        self.log_data = log_data
+        self.last_error = ""
+        self.paused = False
+
+        self._lock = Lock()
+        self._stopped = False
+        self._fetching = False
+        self._resumed = Event()
+        self._resumed.set()
+        self._received = []
+        self._errors = []
+
+    def download(self, url, filename, connections, headers=None):
+        """Download the given url to the given filename.
+
+        Args:
+            url (string): The direct media url.
+            filename (string): Absolute path of the output file.
+            connections (int): Maximum number of the parallel connections.
+            headers (dict): HTTP headers of the requests, e.g. the
+                'http_headers' of the youtube-dl info JSON.
+
+        Returns:
+            OK, ERROR or STOPPED.
+
+        """
+        self.last_error = ""
+        self._stopped = False
+        self._errors = []
+
+        self.paused = False
+        self._resumed.set()
+
+        headers = dict(headers or {})
+
+        # The file functions below get encoded paths
+        filename = convert_item(filename)
+        part_file = filename + convert_item(self.PART_SUFFIX)
+
+        try:
+            total = self._get_size(url, headers)
+        except (urllib2.URLError, IOError, ValueError) as error:
+            return self._fail(part_file, error)
+
+        segments = self._split(total, connections)
+        self._received = [0] * len(segments)
+
+        try:
+            with open(part_file, "wb") as output:
+                if total is not None:
+                    output.truncate(total)
+        except IOError as error:
+            return self._fail(part_file, error)
+
+        threads = [Thread(target=self._fetch, args=(index, url, headers, part_file, segment))
+                   for index, segment in enumerate(segments)]
+
+        self._fetching = True
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        self._hook_data({'status': 'Downloading', 'timings': {'download': time()}})
+        self._report_progress(threads, total)
+
+        self._fetching = False
+        self.paused = False
+
+        if self._stopped:
+            remove_file(part_file)
+            return self.STOPPED
+
+        received = sum(self._received)
+
+        if self._errors or (total is not None and received != total):
+            return self._fail(part_file, self._errors[0] if self._errors else "Incomplete download")
+
+        if os.name == 'nt':
+            remove_file(filename)
+
+        os.rename(part_file, filename)
+
+        self._hook_data({'status': 'Downloading', 'percent': '100%', 'filesize': format_bytes(received),
+                         'speed': '', 'eta': '', 'timings': {'downloaded': time()}})
+
+        return self.OK
+
+    def stop(self):
+        """Stop the connections, download() returns STOPPED. """
+        self._stopped = True
+        self._resumed.set()
+
+    def pause(self):
+        """Suspend the connections of the running download, see resume().
+
+        Returns:
+            True on success, False if there is no running download or it
+            is already paused.
+
+        """
+        if self.paused or self._stopped or not self._fetching:
+            return False
+
+        self.paused = True
+        self._resumed.clear()
+
+        return True
+
+    def resume(self):
+        """Continue the paused download.
+
+        A connection the server has closed in the meantime gets opened
+        again from where it stopped, see RETRIES.
+
+        Returns:
+            True on success, False if the download is not paused.
+
+        """
+        if not self.paused:
+            return False
+
+        self.paused = False
+        self._resumed.set()
+
+        return True
+
+    def _get_size(self, url, headers):
+        """Returns the size of the file if the server serves byte ranges
+        else None. """
+        request = urllib2.Request(url, headers=dict(headers, Range=str("bytes=0-0")))
+        response = urllib2.urlopen(request, timeout=self.TIMEOUT)
+
+        try:
+            content_range = response.info().getheader("Content-Range")
+
+            if response.getcode() == 206 and content_range and "/" in content_range:
+                size = content_range.rsplit("/", 1)[1].strip()
+
+                if size != "*":
+                    return int(size)
+        finally:
+            response.close()
+
+        return None
+
+    def _split(self, total, connections):
+        """Returns the (start, end) byte ranges of the connections, a single
+        (0, None) range when the size is unknown. """
+        if not total:
+            return [(0, None)]
+
+        count = max(1, min(connections, total // self.MIN_SEGMENT_SIZE))
+        size = total // count
+
+        return [(index * size, total - 1 if index == count - 1 else (index + 1) * size - 1)
+                for index in xrange(count)]
+
+    def _fetch(self, index, url, headers, part_file, segment):
+        """Thread target that writes the given byte range to the part file. """
+        start, end = segment
+
+        for attempt in xrange(self.RETRIES + 1):
+            if end is None:
+                # Without ranges a retry starts over
+                with self._lock:
+                    self._received[index] = 0
+
+            offset = start + self._received[index]
+
+            if self._stopped or self._errors or (end is not None and offset > end):
+                return
+
+            request_headers = dict(headers)
+
+            if end is not None:
+                request_headers["Range"] = str("bytes={0}-{1}".format(offset, end))
+
+            try:
+                response = urllib2.urlopen(urllib2.Request(url, headers=request_headers), timeout=self.TIMEOUT)
+
+                if end is not None and response.getcode() != 206:
+                    raise IOError("Range request returned HTTP {0}".format(response.getcode()))
+
+                with open(part_file, "r+b" if end is not None else "wb") as output:
+                    output.seek(offset)
+
+                    while not (self._stopped or self._errors):
+                        self._resumed.wait()
+
+                        data = response.read(self.CHUNK_SIZE)
+
+                        if not data:
+                            break
+
+                        output.write(data)
+
+                        with self._lock:
+                            self._received[index] += len(data)
+
+                response.close()
+
+                if end is None or start + self._received[index] > end:
+                    return
+            except (urllib2.URLError, IOError, ValueError) as error:
+                if attempt == self.RETRIES:
+                    self._errors.append(error)
+                else:
+                    self._log("Segment {0} failed, retrying: {1}".format(index + 1, error))
+
+    def _report_progress(self, threads, total):
+        """Report the merged progress of the connections until they end. """
+        last_time = time()
+        last_received = 0
+
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(self.PROGRESS_INTERVAL)
+
+                if thread.is_alive():
+                    break
+
+            now = time()
+            received = sum(self._received)
+
+            if self.paused:
+                last_time, last_received = now, received
+                continue
+            speed = (received - last_received) / max(now - last_time, 0.001)
+
+            last_time, last_received = now, received
+
+            data = {'status': 'Downloading', 'speed': format_bytes(speed) + "/s"}
+
+            if total:
+                eta = int((total - received) / speed) if speed else 0
+
+                data['percent'] = "{0:.1f}%".format(100.0 * received / total)
+                data['filesize'] = format_bytes(total)
+                data['eta'] = "{0:02d}:{1:02d}".format(eta // 60, eta % 60)
+
+            self._hook_data(data)
+
+    def _fail(self, part_file, error):
+        remove_file(part_file)
+
+        self.last_error = convert_item(str(error), to_unicode=True)
+        self._log("Segmented download failed: {0}".format(self.last_error))
+
+        return self.ERROR
+
+    def _log(self, data):
+        """Log data using the callback function. """
+        if self.log_data is not None:
+            self.log_data(data)
+
+    def _hook_data(self, data):
+        """Pass data back to the caller. """
+        if self.data_hook is not None:
+            self.data_hook(data)
+
+
+def direct_media(info):
+    """Returns the (url, http_headers) of the file of the given youtube-dl
+    info dictionary if it is a single file of known size served over HTTP
+    else None.
+
+    The formats youtube-dl merges, the fragmented (DASH, HLS) and the live
+    formats need youtube-dl itself. Without a filesize the file is likely
+    too small or too dynamic to be worth the range requests.
+
+    """
+    if info.get('_type', 'video') != 'video' or not info.get('url'):
+        return None
+
+    if info.get('requested_formats') or info.get('fragments') or info.get('is_live'):
+        return None
+
+    if info.get('protocol', 'http') not in ('http', 'https') or not info.get('filesize'):
+        return None
+
+    return info['url'], info.get('http_headers') or {}
+
+
+def parse_playlist(json_data):
+    """Returns the entry urls of the given youtube-dl '-J' output.
+
+    Returns:
+        List with the urls of the entries or None if the JSON data
+        does not describe a playlist.
+
+    """
+    try:
+        info = json.loads(json_data)
+    except ValueError:
+        return None
+
+    return playlist_entries(info)
+
+
+def playlist_entries(info):
+    """Returns the entry urls of the given info dictionary, None if it
+    does not describe a playlist. See parse_playlist(). """
+    if not isinstance(info, dict) or info.get('_type') != 'playlist':
+        return None
+
+    urls = []
+
+    for entry in info.get('entries') or []:
+        if not isinstance(entry, dict):
+            continue
+
+        # Flat entries have the 'url' key, fully extracted ones the 'webpage_url'
+        url = entry.get('url') or entry.get('webpage_url')
+
+        if url:
+            urls.append(url)
+
+    return urls
+
+
+# Output tags of the youtube-dl downloaders & postprocessors, everything
+# else in brackets is the name of an extractor
+NON_EXTRACTOR_TAGS = frozenset([
+    'debug', 'download', 'info', 'ffmpeg', 'hlsnative', 'dashsegments',
+    'Merger', 'ExtractAudio', 'EmbedSubtitle', 'EmbedThumbnail',
+    'FixupM3u8', 'FixupM4a', 'FixupStretched', 'Metadata', 'MetadataFromTitle',
+    'SubtitlesConvertor', 'ThumbnailsConvertor', 'VideoConvertor',
+    'VideoRemuxer', 'XAttrMetadata', 'atomicparsley', 'Exec', 'MoveFiles'
+])
+
+
 def extract_data(stdout):
     """Extract data from youtube-dl stdout.
 
@@ -376,6 +1002,8 @@ def extract_data(stdout):
         'filesize'       : The size of the video file being downloaded.
         'playlist_index' : The playlist index of the current video file being downloaded.
         'playlist_size'  : The number of videos in the playlist.
+        'extractor'      : The name of the youtube-dl extractor.
+        'video_id'       : The video id as reported by the extractor.
 
     """
     # REFACTOR
@@ -493,4 +1121,12 @@ def extract_data(stdout):
     else:
         data_dictionary['status'] = 'Pre Processing'
 
+        # Get the extractor & the video id (e.g. '[youtube] <id>: Downloading webpage')
+        extractor = stdout[0][1:-1]
+
+        if (len(stdout) > 2 and extractor not in NON_EXTRACTOR_TAGS and
+                stdout[1][-1] == ':' and stdout_with_spaces[1] == stdout[1]):
+            data_dictionary['extractor'] = extractor
+            data_dictionary['video_id'] = stdout[1][:-1]
+
     return data_dictionary
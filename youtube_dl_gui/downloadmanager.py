@@ -7,12 +7,15 @@ This module is responsible for managing the download process
 and update the GUI interface.
 
 Attributes:
-    MANAGER_PUB_TOPIC (string): wxPublisher subscription topic of the
+    MANAGER_PUB_TOPIC (string): Event topic of the
         DownloadManager thread.
 
-    WORKER_PUB_TOPIC (string): wxPublisher subscription topic of the
+    WORKER_PUB_TOPIC (string): Event topic of the
         Worker thread.
 
+    EXPANDED_STATS (dict): Stats dictionary that completes an expanded
+        playlist item (see DownloadList.expand_item()).
+
 Note:
     It's not the actual module that downloads the urls
     thats the job of the 'downloaders' module.
@@ -21,22 +24,31 @@ Note:
 
 from __future__ import unicode_literals
 
+import io
+import re
+import json
 import time
+import heapq
+import random
+import shutil
 import os.path
+import tempfile
+from collections import OrderedDict
 
 from threading import (
+    Condition,
     Thread,
     RLock,
     Lock
 )
 
-from wx import CallAfter
-from wx.lib.pubsub import setuparg1
-from wx.lib.pubsub import pub as Publisher
-
+from .events import send_event
+from .metrics import METRICS
 from .parsers import OptionsParser
+from .scheduler import SchedulingPolicy, get_policy
 from .updatemanager import UpdateThread
-from .downloaders import YoutubeDLDownloader
+from .history import ALREADY_DOWNLOADED_STATS, is_video_url
+from .downloaders import YoutubeDLDownloader, SegmentedDownloader, direct_media, playlist_entries
 
 from .utils import (
     YOUTUBEDL_BIN,
@@ -50,20 +62,36 @@ from .utils import (
 MANAGER_PUB_TOPIC = 'dlmanager'
 WORKER_PUB_TOPIC = 'dlworker'
 
+EXPANDED_STATS = {"status": "Expanded", "percent": "100%", "speed": "", "eta": ""}
+
 _SYNC_LOCK = RLock()
+_SYNC_CHANGED = Condition(_SYNC_LOCK)
 
 # Decorator that adds thread synchronization to a function
 def synchronized(lock):
     def _decorator(func):
         def _wrapper(*args, **kwargs):
             lock.acquire()
-            ret_value = func(*args, **kwargs)
-            lock.release()
-            return ret_value
+            try:
+                return func(*args, **kwargs)
+            finally:
+                lock.release()
         return _wrapper
     return _decorator
 
 
+def sum_durations(download_items):
+    """Returns a dictionary with the total duration of each phase of the
+    given items. See DownloadItem.get_durations(). """
+    totals = {}
+
+    for download_item in download_items:
+        for phase, duration in download_item.get_durations().items():
+            totals[phase] = totals.get(phase, 0.0) + duration
+
+    return totals
+
+
 class DownloadItem(object):
 
     """Object that represents a download.
@@ -71,31 +99,106 @@ class DownloadItem(object):
     Attributes:
         STAGES (tuple): Main stages of the download item.
 
+        QUEUED_STAGES (tuple): Sub stages of the 'Queued' stage.
+
         ACTIVE_STAGES (tuple): Sub stages of the 'Active' stage.
 
         COMPLETED_STAGES (tuple): Sub stages of the 'Completed' stage.
 
         ERROR_STAGES (tuple): Sub stages of the 'Error' stage.
 
+        PRIORITIES (tuple): Names of the priority levels, the priority of
+            an item is an index of this tuple.
+
+        DEFAULT_PRIORITY (int): Priority of the new items ('Normal').
+
+        PHASES (tuple): Phases of the download as (name, start timing,
+            end timings) tuples. The first end timing that exists ends
+            the phase, see get_durations().
+
+        parent_id (int): The object_id of the playlist item this item was
+            expanded from, None for the items the user added.
+
+        info_file (string): Path of the info JSON the Prefetcher cached for
+            the item, empty string if there is none.
+
+        formats (list): The format ids the Prefetcher found for the item.
+
+        expected_size (int): Size in bytes the Prefetcher found for the
+            item, zero if it is unknown.
+
+        duration (int): Duration in seconds the Prefetcher found for the
+            item, zero if it is unknown.
+
+        attempts (int): Number of the failed downloads of the item that
+            got retried, see RetryPolicy.
+
+        not_before (float): Time before which the item must not be
+            dispatched, zero if it can be dispatched right away.
+
+        part_files (list): The '.part' files youtube-dl has started for
+            the item. They survive reset() while they exist on the disk so
+            the next download resumes them, see get_part_files().
+
+        priority (int): The items of a higher priority are dispatched
+            before the others whatever the scheduling policy. It survives
+            reset().
+
+    Note:
+        The 'timings' dictionary holds the time when the item reached
+        each of the following points:
+
+        'queued'          : Item (re)entered the queue.
+        'active'          : DownloadManager dispatched the item.
+        'spawned'         : youtube-dl process started.
+        'download'        : First '[download]' line.
+        'downloaded'      : Last '100%' line.
+        'post_processing' : First '[ffmpeg]' line.
+        'finished'        : youtube-dl process exited.
+
     Args:
         url (string): URL that corresponds to the download item.
 
-        options (list): Options list to use during the download phase.
+        options (tuple): Options to use during the download phase. The same
+            tuple is shared between all the items added with the same options.
+
+        options_key (string): String representation of the options. Callers
+            that create many items with the same options should compute it
+            once and pass it in. Default is to_string(options).
 
     """
 
     STAGES = ("Queued", "Active", "Paused", "Completed", "Error")
 
-    ACTIVE_STAGES = ("Pre Processing", "Downloading", "Post Processing")
+    QUEUED_STAGES = ("Queued", "Retrying")
 
-    COMPLETED_STAGES = ("Finished", "Warning", "Already Downloaded")
+    ACTIVE_STAGES = ("Pre Processing", "Downloading", "Post Processing", "Paused")
+
+    COMPLETED_STAGES = ("Finished", "Warning", "Already Downloaded", "Expanded")
 
     ERROR_STAGES = ("Error", "Stopped", "Filesize Abort")
 
-    def __init__(self, url, options):
+    PRIORITIES = ("Low", "Normal", "High")
+
+    DEFAULT_PRIORITY = 1
+
+    PHASES = (
+        ("spawn", "active", ("spawned",)),
+        ("extraction", "spawned", ("download", "finished")),
+        ("download", "download", ("downloaded", "post_processing", "finished")),
+        ("post_processing", "post_processing", ("finished",))
+    )
+
+    def __init__(self, url, options, options_key=None):
+        if options_key is None:
+            options_key = to_string(options)
+
         self.url = url
         self.options = options
-        self.object_id = hash(url + to_string(options))
+        self.object_id = hash(url + options_key)
+        self.parent_id = None
+        self.part_files = []
+        self.priority = self.DEFAULT_PRIORITY
 
         self.reset()
 
@@ -110,8 +213,10 @@ class DownloadItem(object):
 
         if value == "Queued":
             self.progress_stats["status"] = value
+            self.timings = {"queued": time.time()}
         if value == "Active":
             self.progress_stats["status"] = self.ACTIVE_STAGES[0]
+            self.timings = {"queued": self.timings.get("queued", time.time()), "active": time.time()}
         if value == "Completed":
             self.progress_stats["status"] = self.COMPLETED_STAGES[0]
         if value == "Paused":
@@ -126,10 +231,20 @@ class DownloadItem(object):
             raise RuntimeError("Cannot reset an 'Active' item")
 
         self._stage = self.STAGES[0]
+        self.part_files = self.get_part_files()
         self.path = ""
         self.filenames = []
         self.extensions = []
         self.filesizes = []
+        self.extractor = ""
+        self.video_id = ""
+        self.info_file = ""
+        self.formats = []
+        self.expected_size = 0
+        self.duration = 0
+        self.attempts = 0
+        self.not_before = 0.0
+        self.timings = {"queued": time.time()}
 
         self.default_values = {
             "filename": self.url,
@@ -158,6 +273,16 @@ class DownloadItem(object):
 
         return files
 
+    @property
+    def suspended(self):
+        """True if the youtube-dl process of the 'Active' item is paused,
+        see Worker.pause_download(). """
+        return self._stage == self.STAGES[1] and self.progress_stats["status"] == self.ACTIVE_STAGES[3]
+
+    def get_part_files(self):
+        """Returns the '.part' files of the item that exist on the disk. """
+        return [part_file for part_file in self.part_files if os_path_exists(part_file)]
+
     def update_stats(self, stats_dict):
         """Updates the progress_stats dict from the given dictionary."""
         assert isinstance(stats_dict, dict)
@@ -193,6 +318,20 @@ class DownloadItem(object):
         if "path" in stats_dict:
             self.path = stats_dict["path"]
 
+        # youtube-dl writes the data of each destination file to '<file>.part'
+        if "filename" in stats_dict and "extension" in stats_dict:
+            part_file = self.get_files()[-1] + ".part"
+
+            if part_file not in self.part_files:
+                self.part_files.append(part_file)
+
+        if "extractor" in stats_dict:
+            self.extractor = stats_dict["extractor"]
+            self.video_id = stats_dict["video_id"]
+
+        if "timings" in stats_dict:
+            self.timings.update(stats_dict["timings"])
+
         if "filesize" in stats_dict:
             if stats_dict["percent"] == "100%" and len(self.filesizes) < len(self.filenames):
                 filesize = stats_dict["filesize"].lstrip("~")  # HLS downloader etc
@@ -209,7 +348,103 @@ class DownloadItem(object):
 
             self._set_stage(stats_dict["status"])
 
+        if "retry" in stats_dict:
+            # The failed attempt starts over, see Worker._data_hook()
+            self.attempts = stats_dict["retry"]["attempts"]
+            self.not_before = stats_dict["retry"]["not_before"]
+
+            self.filenames = []
+            self.extensions = []
+            self.filesizes = []
+            self.timings = {"queued": time.time()}
+
+    def set_info(self, info):
+        """Store the metadata of the given Prefetcher info dictionary.
+
+        The title, extension & size show up only while the item is
+        queued, after that youtube-dl reports the real ones.
+
+        """
+        self.info_file = info["info_file"]
+        self.formats = list(info.get("formats", []))
+        self.expected_size = info.get("size", 0)
+        self.duration = info.get("duration", 0)
+
+        if self._stage == self.STAGES[0]:
+            for key in ("filename", "extension", "filesize"):
+                if info.get(key):
+                    self.progress_stats[key] = info[key]
+
+    def get_durations(self):
+        """Returns a dictionary with the duration in seconds of each phase.
+
+        The phases that did not happen (yet) are missing. See PHASES.
+
+        """
+        durations = {}
+
+        for phase, start, ends in self.PHASES:
+            if start in self.timings:
+                for end in ends:
+                    if end in self.timings:
+                        durations[phase] = max(self.timings[end] - self.timings[start], 0.0)
+                        break
+
+        return durations
+
+    def get_state(self):
+        """Returns a JSON serializable dictionary with the item progress.
+
+        The state together with the url & options is enough to
+        re-create the item. See set_state().
+
+        """
+        return {
+            "stage": self._stage,
+            "path": self.path,
+            "filenames": self.filenames,
+            "extensions": self.extensions,
+            "filesizes": self.filesizes,
+            "extractor": self.extractor,
+            "video_id": self.video_id,
+            "timings": self.timings,
+            "parent_id": self.parent_id,
+            "part_files": self.part_files,
+            "priority": self.priority,
+            "progress_stats": self.progress_stats
+        }
+
+    def set_state(self, state):
+        """Restores the item progress from the given state dictionary.
+
+        Items that were 'Active' when the state was stored go back
+        to the 'Queued' stage since their download got interrupted.
+        Only the '.part' files that still exist are kept.
+
+        """
+        self.path = state["path"]
+        self.filenames = list(state["filenames"])
+        self.extensions = list(state["extensions"])
+        self.filesizes = list(state["filesizes"])
+        self.extractor = state.get("extractor", "")
+        self.video_id = state.get("video_id", "")
+        self.timings = dict(state.get("timings", self.timings))
+        self.parent_id = state.get("parent_id")
+        self.part_files = [part_file for part_file in state.get("part_files", []) if os_path_exists(part_file)]
+        self.priority = state.get("priority", self.DEFAULT_PRIORITY)
+        self.progress_stats.update(state["progress_stats"])
+
+        if state["stage"] == self.STAGES[1]:
+            self.stage = self.STAGES[0]
+            self.progress_stats["speed"] = self.default_values["speed"]
+            self.progress_stats["eta"] = self.default_values["eta"]
+        else:
+            self._stage = state["stage"]
+
     def _set_stage(self, status):
+        if status in self.QUEUED_STAGES:
+            self._stage = self.STAGES[0]
+
         if status in self.ACTIVE_STAGES:
             self._stage = self.STAGES[1]
 
@@ -228,14 +463,43 @@ class DownloadList(object):
 
     """List like data structure that contains DownloadItems.
 
+    Every change of the list gets a new version number. The versions let
+    the readers of other threads fetch only what changed since their last
+    read, see get_changes(). Only the last MAX_REMOVED removals are kept,
+    a reader that is older than them gets a full snapshot instead.
+
+    The queued items are also kept in a heap of (priority, key, rank,
+    object_id) entries where the priority is the negated priority of the
+    item, the key comes from the scheduling policy and the rank follows
+    the position of the item in the list, so fetch_next() does not scan
+    the whole list. Moving an item to the top or the bottom only gives it
+    a rank below or above all the others, the list itself gets re-sorted
+    by rank the next time its order is read. An entry is valid while it is
+    the latest entry of its item and the item is queued, the rest are
+    dropped when they reach the top of the heap. The items are re-scheduled
+    on every change that goes through the list methods. The items that wait
+    for a retry (see DownloadItem.not_before) move to a second heap ordered
+    by the time they become ready.
+
     Args:
         items (list): List that contains DownloadItems.
 
+        journal (journal.QueueJournal): Optional journal to record all the
+            changes of the list in order to restore it on the next run.
+
+        policy (scheduler.SchedulingPolicy): Policy that sets the dispatch
+            order of the queued items. Default is the list order.
+
     """
 
-    def __init__(self, items=None):
+    MAX_REMOVED = 10000
+
+    def __init__(self, items=None, journal=None, policy=None):
         assert isinstance(items, list) or items is None
 
+        self._journal = journal
+        self._policy = SchedulingPolicy() if policy is None else policy
+
         if items is None:
             self._items_dict = {}  # Speed up lookup
             self._items_list = []  # Keep the sequence
@@ -243,17 +507,127 @@ class DownloadList(object):
             self._items_list = [item.object_id for item in items]
             self._items_dict = {item.object_id: item for item in items}
 
+        self._version = 1
+        self._order_version = 1
+        self._versions = {object_id: 1 for object_id in self._items_list}  # Version of the last item change
+        self._removed = OrderedDict()  # Version of the item removal, oldest first
+        self._pruned_version = 0  # Version of the last removal we forgot
+
+        self._ranks = {object_id: rank for rank, object_id in enumerate(self._items_list)}
+        self._first_rank = 0
+        self._next_rank = len(self._items_list)
+        self._unsorted = False  # The ranks changed since the last sort of the list
+        self._rebuild_heap()
+
+    @synchronized(_SYNC_LOCK)
+    def set_policy(self, policy):
+        """Dispatch the queued items in the order of the given policy. """
+        self._policy = policy
+        self._rebuild_heap()
+
     @synchronized(_SYNC_LOCK)
     def clear(self):
         """Removes all the items from the list even the 'Active' ones."""
+        for object_id in self._items_list:
+            self._touch_removed(object_id)
+            self._policy.forget(object_id)
+
         self._items_list = []
         self._items_dict = {}
+        self._ranks = {}
+        self._first_rank = self._next_rank = 0
+        self._unsorted = False
+        self._rebuild_heap()
+
+        self._touch_order()
+
+        if self._journal is not None:
+            self._journal.clear()
 
     @synchronized(_SYNC_LOCK)
     def insert(self, item):
         """Inserts the given item to the list. Does not check for duplicates. """
         self._items_list.append(item.object_id)
         self._items_dict[item.object_id] = item
+        self._set_rank(item.object_id)
+
+        self._touch(item.object_id)
+        self._touch_order()
+
+        if self._journal is not None:
+            self._journal.add(item)
+            self._check_journal()
+
+    @synchronized(_SYNC_LOCK)
+    def insert_many(self, items):
+        """Inserts the given items to the list skipping the duplicates.
+
+        The lock is acquired only once for the whole batch which makes this
+        method the preferred way to insert a large number of items.
+
+        Returns:
+            List with the items that were actually inserted.
+
+        """
+        inserted = []
+
+        for item in items:
+            if item.object_id not in self._items_dict:
+                self._items_list.append(item.object_id)
+                self._items_dict[item.object_id] = item
+                inserted.append(item)
+
+        if inserted:
+            self._version += 1
+
+            for item in inserted:
+                self._versions[item.object_id] = self._version
+                self._removed.pop(item.object_id, None)
+                self._set_rank(item.object_id)
+                self._schedule(item.object_id)
+
+            self._touch_order()
+
+        if self._journal is not None:
+            for item in inserted:
+                self._journal.add(item)
+
+            self._check_journal()
+
+        return inserted
+
+    @synchronized(_SYNC_LOCK)
+    def expand_item(self, object_id, urls):
+        """Replace the playlist item with the given object_id by its entries.
+
+        The entries become new items with the options & the path of the
+        playlist item, so the workers download them in parallel. The
+        playlist item gets completed with the 'Expanded' status.
+
+        Args:
+            object_id (int): The object_id of the playlist item.
+            urls (list): The urls of the playlist entries.
+
+        Returns:
+            List with the items that were actually inserted.
+
+        """
+        item = self._items_dict[object_id]
+        options_key = to_string(item.options)
+
+        entries = []
+
+        for url in urls:
+            entry = DownloadItem(url, item.options, options_key)
+            entry.path = item.path
+            entry.parent_id = object_id
+            entries.append(entry)
+
+        inserted = self.insert_many(entries)
+
+        self.update_stats(object_id, EXPANDED_STATS)
+
+        return inserted
 
     @synchronized(_SYNC_LOCK)
     def remove(self, object_id):
@@ -269,33 +643,124 @@ class DownloadList(object):
         if self._items_dict[object_id].stage != "Active":
             self._items_list.remove(object_id)
             del self._items_dict[object_id]
+            del self._ranks[object_id]
+
+            self._scheduled.pop(object_id, None)
+            self._policy.forget(object_id)
+
+            self._touch_removed(object_id)
+            self._touch_order()
+
+            if self._journal is not None:
+                self._journal.remove(object_id)
+                self._check_journal()
 
             return True
         return False
 
     @synchronized(_SYNC_LOCK)
     def fetch_next(self):
-        """Returns the next queued item on the list.
+        """Returns the next queued item in the order of the scheduling policy.
+
+        The item stays on the heap until it leaves the 'Queued' stage.
 
         Returns:
             Next queued item or None if no other item exist.
 
         """
-        for object_id in self._items_list:
-            cur_item = self._items_dict[object_id]
+        now = time.time()
+
+        while self._delayed and self._delayed[0][0] <= now:
+            heapq.heappush(self._heap, heapq.heappop(self._delayed)[1])
 
-            if cur_item.stage == "Queued":
-                return cur_item
+        while self._heap:
+            entry = self._heap[0]
+            object_id = entry[-1]
+
+            if self._scheduled.get(object_id) is entry:
+                cur_item = self._items_dict[object_id]
+
+                if cur_item.stage == "Queued":
+                    if cur_item.not_before <= now:
+                        return cur_item
+
+                    heapq.heappush(self._delayed, (cur_item.not_before, entry))
+                else:
+                    del self._scheduled[object_id]
+
+            heapq.heappop(self._heap)
 
         return None
 
+    @synchronized(_SYNC_LOCK)
+    def has_pending(self):
+        """Returns True if an item is 'Active' or waits for its retry.
+
+        The item of a worker that has finished stays 'Active' until the
+        GUI applies its last status, which might queue it again.
+
+        """
+        # Drop the entries of the items that left the queue or got a new entry
+        while self._delayed and self._scheduled.get(self._delayed[0][1][-1]) is not self._delayed[0][1]:
+            heapq.heappop(self._delayed)
+
+        return bool(self._active or self._delayed)
+
+    @synchronized(_SYNC_LOCK)
+    def get_queued(self, count):
+        """Returns the next count queued items in the dispatch order.
+
+        The items that wait for a retry are skipped, see fetch_next(). The
+        heap is walked from its root through a second heap of candidates,
+        so only the entries that precede the returned items get visited.
+
+        """
+        items = []
+        candidates = [(self._heap[0], 0)] if self._heap else []
+        now = time.time()
+
+        while candidates and len(items) < count:
+            entry, index = heapq.heappop(candidates)
+            object_id = entry[-1]
+
+            if self._scheduled.get(object_id) is entry:
+                cur_item = self._items_dict[object_id]
+
+                if cur_item.stage == "Queued" and cur_item.not_before <= now:
+                    items.append(cur_item)
+
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(self._heap):
+                    heapq.heappush(candidates, (self._heap[child], child))
+
+        return items
+
+    @synchronized(_SYNC_LOCK)
+    def set_info(self, object_id, info):
+        """Store the prefetched info on the item with the given object_id.
+
+        See DownloadItem.set_info().
+
+        Returns:
+            The updated DownloadItem or None if the item has been removed.
+
+        """
+        item = self._items_dict.get(object_id)
+
+        if item is not None:
+            item.set_info(info)
+            self._touch(object_id)
+
+        return item
+
     @synchronized(_SYNC_LOCK)
     def move_up(self, object_id):
         """Moves the item with the corresponding object_id up to the list."""
-        index = self._items_list.index(object_id)
+        index = self._get_order().index(object_id)
 
         if index > 0:
             self._swap(index, index - 1)
+            self._touch_order()
             return True
 
         return False
@@ -303,14 +768,81 @@ class DownloadList(object):
     @synchronized(_SYNC_LOCK)
     def move_down(self, object_id):
         """Moves the item with the corresponding object_id down to the list."""
-        index = self._items_list.index(object_id)
+        index = self._get_order().index(object_id)
 
         if index < (len(self._items_list) - 1):
             self._swap(index, index + 1)
+            self._touch_order()
             return True
 
         return False
 
+    @synchronized(_SYNC_LOCK)
+    def move_to_top(self, object_id):
+        """Moves the item with the corresponding object_id to the top of the list.
+
+        The item is dispatched before the other queued items of its priority
+        without shifting their ranks, see move_up() for a single step.
+
+        """
+        if object_id not in self._ranks:
+            raise ValueError(object_id)
+
+        if self._ranks[object_id] == self._first_rank:
+            return False
+
+        self._first_rank -= 1
+        self._ranks[object_id] = self._first_rank
+        self._unsorted = True
+        self._schedule(object_id)
+
+        self._touch_order()
+
+        if self._journal is not None:
+            self._journal.move_to_top(object_id)
+            self._check_journal()
+
+        return True
+
+    @synchronized(_SYNC_LOCK)
+    def move_to_bottom(self, object_id):
+        """Moves the item with the corresponding object_id to the bottom of the list."""
+        if object_id not in self._ranks:
+            raise ValueError(object_id)
+
+        if self._ranks[object_id] == self._next_rank - 1:
+            return False
+
+        self._set_rank(object_id)
+        self._unsorted = True
+        self._schedule(object_id)
+
+        self._touch_order()
+
+        if self._journal is not None:
+            self._journal.move_to_bottom(object_id)
+            self._check_journal()
+
+        return True
+
+    @synchronized(_SYNC_LOCK)
+    def set_priority(self, object_id, priority):
+        """Set the priority of the item with the given object_id.
+
+        Args:
+            object_id (int): The object_id of the item.
+            priority (int): Index of the DownloadItem.PRIORITIES.
+
+        """
+        if priority < 0 or priority >= len(DownloadItem.PRIORITIES):
+            raise ValueError(priority)
+
+        item = self._items_dict[object_id]
+        item.priority = priority
+
+        self._touch(object_id)
+        self._journal_state(item)
+
     @synchronized(_SYNC_LOCK)
     def get_item(self, object_id):
         """Returns the DownloadItem with the given object_id."""
@@ -319,31 +851,309 @@ class DownloadList(object):
     @synchronized(_SYNC_LOCK)
     def has_item(self, object_id):
         """Returns True if the given object_id is in the list else False."""
-        return object_id in self._items_list
+        return object_id in self._items_dict
 
     @synchronized(_SYNC_LOCK)
     def get_items(self):
         """Returns a list with all the items."""
-        return [self._items_dict[object_id] for object_id in self._items_list]
+        return [self._items_dict[object_id] for object_id in self._get_order()]
 
     @synchronized(_SYNC_LOCK)
     def change_stage(self, object_id, new_stage):
         """Change the stage of the item with the given object_id."""
-        self._items_dict[object_id].stage = new_stage
+        item = self._items_dict[object_id]
+        item.stage = new_stage
+
+        self._touch(object_id)
+        self._journal_state(item)
+
+    @synchronized(_SYNC_LOCK)
+    def update_stats(self, object_id, stats_dict):
+        """Update the progress stats of the item with the given object_id.
+
+        See DownloadItem.update_stats(). Only the stage transitions
+        and the new '.part' files are recorded on the journal.
+
+        Returns:
+            The updated DownloadItem.
+
+        """
+        item = self._items_dict[object_id]
+        old_stage = item.stage
+        old_part_files = len(item.part_files)
+
+        item.update_stats(stats_dict)
+
+        self._touch(object_id)
+
+        if item.stage != old_stage or len(item.part_files) != old_part_files:
+            self._journal_state(item)
+
+        return item
+
+    @synchronized(_SYNC_LOCK)
+    def reset_item(self, object_id):
+        """Reset the item with the given object_id keeping its save path."""
+        item = self._items_dict[object_id]
+
+        savepath = item.path
+        item.reset()
+        item.path = savepath
+
+        self._touch(object_id)
+        self._journal_state(item)
+
+        return item
+
+    @synchronized(_SYNC_LOCK)
+    def get_changes(self, since=0, timeout=None):
+        """Returns the changes of the list after the given version.
+
+        The changes are coalesced, an item that changed many times after
+        the given version is returned only once with its current state.
+
+        Args:
+            since (int): Version of the last read. Zero returns all the items.
+
+            timeout (float): Time in seconds to wait for a change when there
+                is none after the given version. None does not wait.
+
+        Returns:
+            Tuple (version, items, removed, order). Version is the current
+            version of the list, items is a list with the changed items,
+            removed is a list with the object_ids of the removed items and
+            order is the list of all the object_ids when the sequence of
+            the items changed else None.
+
+            When the removals after the given version have been pruned,
+            the result is a snapshot like with since zero: all the items,
+            no removals and the order, which tells the removed items.
+
+        """
+        if timeout is not None and self._version <= since:
+            _SYNC_CHANGED.wait(timeout)
+
+        if since < self._pruned_version:
+            since = 0
+
+        items = [self._items_dict[object_id] for object_id in self._get_order()
+                 if self._versions[object_id] > since]
+
+        removed = []
+
+        if since > 0:
+            # The removals are in version order, read only the new ones
+            for object_id in reversed(self._removed):
+                if self._removed[object_id] <= since:
+                    break
+
+                removed.append(object_id)
+
+            removed.reverse()
+
+        order = None
+
+        if self._order_version > since:
+            order = list(self._get_order())
+
+        return self._version, items, removed, order
+
+    @synchronized(_SYNC_LOCK)
+    def flush(self):
+        """Flush the pending journal records to the disk."""
+        if self._journal is not None:
+            self._journal.flush()
 
     @synchronized(_SYNC_LOCK)
     def index(self, object_id):
         """Get the zero based index of the item with the given object_id."""
-        if object_id in self._items_list:
-            return self._items_list.index(object_id)
+        if object_id in self._items_dict:
+            return self._get_order().index(object_id)
         return -1
 
     @synchronized(_SYNC_LOCK)
     def __len__(self):
         return len(self._items_list)
 
+    def _touch(self, object_id):
+        self._version += 1
+        self._versions[object_id] = self._version
+        self._removed.pop(object_id, None)
+        self._schedule(object_id)
+        _SYNC_CHANGED.notify_all()
+
+    def _touch_removed(self, object_id):
+        self._version += 1
+        self._removed[object_id] = self._version
+        del self._versions[object_id]
+
+        if len(self._removed) > self.MAX_REMOVED:
+            self._pruned_version = self._removed.popitem(last=False)[1]
+
+        _SYNC_CHANGED.notify_all()
+
+    def _touch_order(self):
+        self._order_version = self._version = self._version + 1
+        _SYNC_CHANGED.notify_all()
+
     def _swap(self, index1, index2):
-        self._items_list[index1], self._items_list[index2] = self._items_list[index2], self._items_list[index1]
+        object_id1, object_id2 = self._items_list[index1], self._items_list[index2]
+
+        self._items_list[index1], self._items_list[index2] = object_id2, object_id1
+        self._ranks[object_id1], self._ranks[object_id2] = self._ranks[object_id2], self._ranks[object_id1]
+
+        self._schedule(object_id1)
+        self._schedule(object_id2)
+
+        if self._journal is not None:
+            self._journal.swap(object_id1, object_id2)
+            self._check_journal()
+
+    def _set_rank(self, object_id):
+        self._ranks[object_id] = self._next_rank
+        self._next_rank += 1
+
+    def _get_order(self):
+        """Returns the object_ids in the list order. """
+        if self._unsorted:
+            self._items_list.sort(key=self._ranks.__getitem__)
+            self._unsorted = False
+
+        return self._items_list
+
+    def _schedule(self, object_id):
+        """Push a new heap entry for the given item if it is queued and
+        its key or its rank has changed."""
+        item = self._items_dict[object_id]
+
+        if item.stage == "Active":
+            self._active.add(object_id)
+        else:
+            self._active.discard(object_id)
+
+        if item.stage != "Queued":
+            self._scheduled.pop(object_id, None)
+            self._policy.release(item)
+            return
+
+        entry = self._get_entry(item)
+
+        if self._scheduled.get(object_id) != entry:
+            self._scheduled[object_id] = entry
+
+            if item.not_before > time.time():
+                heapq.heappush(self._delayed, (item.not_before, entry))
+            else:
+                heapq.heappush(self._heap, entry)
+
+            # Too many invalid entries
+            if len(self._heap) > 2 * len(self._scheduled) + 64:
+                self._heap = list(self._scheduled.values())
+                heapq.heapify(self._heap)
+
+    def _rebuild_heap(self):
+        self._scheduled = {}  # object_id -> latest heap entry
+        self._delayed = []  # (not_before, entry)
+        self._active = set()  # object_ids of the 'Active' items
+        self._heap = []
+
+        now = time.time()
+
+        for object_id in self._items_list:
+            item = self._items_dict[object_id]
+
+            if item.stage == "Active":
+                self._active.add(object_id)
+            elif item.stage == "Queued":
+                entry = self._scheduled[object_id] = self._get_entry(item)
+
+                if item.not_before > now:
+                    self._delayed.append((item.not_before, entry))
+                else:
+                    self._heap.append(entry)
+
+        heapq.heapify(self._heap)
+        heapq.heapify(self._delayed)
+
+    def _get_entry(self, item):
+        return (-item.priority, self._policy.key(item), self._ranks[item.object_id], item.object_id)
+
+    def _journal_state(self, item):
+        if self._journal is not None:
+            self._journal.update(item)
+            self._check_journal()
+
+    def _check_journal(self):
+        """Compact the journal when it has grown too much. """
+        if self._journal.needs_compaction():
+            self._journal.compact([self._items_dict[object_id] for object_id in self._get_order()])
+
+
+class RetryPolicy(object):
+
+    """Decides if & when a failed download gets retried.
+
+    Only the errors that look transient (network & server errors) are
+    retried. The delay doubles on every attempt up to MAX_DELAY and the
+    jitter spreads the retries of the items that failed together.
+
+    Attributes:
+        RETRYABLE_ERRORS (tuple): Regular expressions of the youtube-dl
+            errors worth a retry.
+
+        BASE_DELAY (float): Delay in seconds before the first retry.
+
+        MAX_DELAY (float): Upper bound of the delay in seconds.
+
+        JITTER (float): Fraction of the delay that is randomized.
+
+    Args:
+        max_retries (int): Number of the retries of an item.
+
+    """
+
+    RETRYABLE_ERRORS = (
+        r"HTTP Error (429|5\d\d)",
+        r"Unable to download (webpage|JSON metadata|API page)",
+        r"urlopen error",
+        r"timed? ?out",
+        r"Connection (reset|refused|aborted)",
+        r"Temporary failure in name resolution",
+        r"IncompleteRead",
+        r"giving up after \d+ (fragment )?retries"
+    )
+
+    BASE_DELAY = 5.0
+    MAX_DELAY = 300.0
+    JITTER = 0.5
+
+    def __init__(self, max_retries):
+        self.max_retries = max_retries
+
+        self._pattern = re.compile("|".join(self.RETRYABLE_ERRORS), re.IGNORECASE)
+
+    def is_retryable(self, error):
+        """Returns True if the given youtube-dl error output looks transient. """
+        return self._pattern.search(error) is not None
+
+    def get_delay(self, attempts, error):
+        """Returns the delay in seconds before the next attempt.
+
+        Args:
+            attempts (int): Number of the retries of the item so far.
+
+            error (string): The error output of the failed download.
+
+        Returns:
+            The delay or None if the item should not be retried.
+
+        """
+        if attempts >= self.max_retries or not self.is_retryable(error):
+            return None
+
+        delay = min(self.BASE_DELAY * 2 ** attempts, self.MAX_DELAY)
+
+        return delay * (1.0 - self.JITTER * random.random())
 
 
 class DownloadManager(Thread):
@@ -353,6 +1163,12 @@ class DownloadManager(Thread):
     Attributes:
         WAIT_TIME (float): Time in seconds to sleep.
 
+        PREFETCH_AHEAD (int): Number of the next queued items the
+            Prefetchers look at, see the 'prefetch_workers' option.
+
+        INFO_TTL (float): Time in seconds a prefetched info JSON is used
+            for the download. The media urls in it expire after a while.
+
     Args:
         download_list (DownloadList): List that contains items to download.
 
@@ -362,25 +1178,62 @@ class DownloadManager(Thread):
         log_manager (logmanager.LogManager): Object responsible for writing
             errors to the log.
 
+        history (history.DownloadHistory): Download history to consult before
+            dispatching an item, when the 'skip_downloaded' option is set.
+
+        archive (history.DownloadArchive): Download archive to consult before
+            dispatching an item that uses the '--download-archive' option.
+
     """
 
     WAIT_TIME = 0.1
+    PREFETCH_AHEAD = 20
+    INFO_TTL = 1800.0
 
-    def __init__(self, parent, download_list, opt_manager, log_manager=None):
+    def __init__(self, parent, download_list, opt_manager, log_manager=None, history=None, archive=None):
         super(DownloadManager, self).__init__()
         self.parent = parent
         self.opt_manager = opt_manager
         self.log_manager = log_manager
         self.download_list = download_list
+        self.history = history
+        self.archive = archive
 
         self._time_it_took = 0
         self._successful = 0
         self._running = True
 
+        self._update_thread = None
+        self._youtubedl_found = False
+
+        download_list.set_policy(get_policy(opt_manager.options["scheduling_policy"]))
+
+        retry_policy = None
+
+        if opt_manager.options["retry_attempts"] > 0:
+            retry_policy = RetryPolicy(opt_manager.options["retry_attempts"])
+
         # Init the custom workers thread pool
         log_lock = None if log_manager is None else Lock()
-        wparams = (opt_manager, self._youtubedl_path(), log_manager, log_lock)
-        self._workers = [Worker(*wparams) for _ in xrange(opt_manager.options["workers_number"])]
+        self._worker_params = (opt_manager, self._youtubedl_path(), log_manager, log_lock)
+        self._retry_policy = retry_policy
+        self._workers = []
+        self._preempted = []  # Workers suspended for a higher priority item
+
+        for _ in xrange(opt_manager.options["workers_number"]):
+            self._workers.append(self._create_worker())
+
+        # The info JSON files of the Prefetchers live as long as this run
+        self._prefetched = set()
+        self._prefetchers = []
+        self._cache_dir = None
+
+        if opt_manager.options["prefetch_workers"] > 0:
+            self._cache_dir = tempfile.mkdtemp(prefix="youtubedlg-info-")
+
+            pparams = (self._youtubedl_path(), self._cache_dir, log_manager, log_lock)
+            self._prefetchers = [Prefetcher(*pparams, name="Prefetcher-{0}".format(index + 1))
+                                 for index in xrange(opt_manager.options["prefetch_workers"])]
 
         self.start()
 
@@ -398,25 +1251,44 @@ class DownloadManager(Thread):
     def run(self):
         if not self.opt_manager.options["disable_update"]:
             self._check_youtubedl()
+
+        if self.archive is not None:
+            self.archive.refresh()
+
         self._time_it_took = time.time()
 
         while self._running:
-            item = self.download_list.fetch_next()
+            self._release_update_thread()
 
-            if item is not None:
-                worker = self._get_worker()
+            if self._youtubedl_available():
+                item = self.download_list.fetch_next()
 
-                if worker is not None:
-                    worker.download(item.url, item.options, item.object_id)
-                    self.download_list.change_stage(item.object_id, "Active")
+                if item is not None and self._skip_downloaded(item):
+                    continue
 
-            if item is None and self._jobs_done():
-                break
+                self._resume_preempted(item)
+
+                if item is not None:
+                    worker = self._get_worker()
+
+                    if worker is None and self._preempt(item):
+                        worker = self._get_worker()
+
+                    if worker is not None:
+                        # Before the worker starts, its last status must find the item 'Active'
+                        self.download_list.change_stage(item.object_id, "Active")
+                        worker.download(item.url, self._download_options(item), item.object_id,
+                                        self._needs_expansion(item), item.attempts)
+
+                if item is None and self._jobs_done() and not self.download_list.has_pending():
+                    break
+
+                self._prefetch()
 
             time.sleep(self.WAIT_TIME)
 
         # Close all the workers
-        for worker in self._workers:
+        for worker in self._workers + self._prefetchers:
             worker.close()
 
         # Join and collect
@@ -424,6 +1296,12 @@ class DownloadManager(Thread):
             worker.join()
             self._successful += worker.successful
 
+        for prefetcher in self._prefetchers:
+            prefetcher.join()
+
+        if self._cache_dir is not None:
+            shutil.rmtree(self._cache_dir, ignore_errors=True)
+
         self._time_it_took = time.time() - self._time_it_took
 
         if not self._running:
@@ -486,8 +1364,36 @@ class DownloadManager(Thread):
                 if worker.has_index(data['index']):
                     worker.update_data(data)
 
+    def pause_item(self, object_id):
+        """Suspend the active download of the item with the given object_id.
+
+        See Worker.pause_download() & the 'pause_frees_worker' option.
+
+        Returns:
+            True if the download got suspended else False.
+
+        """
+        for worker in self._workers:
+            if worker.has_index(object_id):
+                return worker.pause_download()
+
+        return False
+
+    def resume_item(self, object_id):
+        """Continue the suspended download of the item with the given object_id.
+
+        Returns:
+            True if the download got resumed else False.
+
+        """
+        for worker in self._workers:
+            if worker.has_index(object_id):
+                return worker.resume_download()
+
+        return False
+
     def _talk_to_gui(self, data):
-        """Send data back to the GUI using wxCallAfter and wxPublisher.
+        """Send data back to the GUI using the events.send_event() function.
 
         Args:
             data (string): Unique signal string that informs the GUI for the
@@ -502,21 +1408,234 @@ class DownloadManager(Thread):
                     downloads using the active() method.
 
         """
-        CallAfter(Publisher.sendMessage, MANAGER_PUB_TOPIC, data)
+        send_event(MANAGER_PUB_TOPIC, data)
 
     def _check_youtubedl(self):
-        """Check if youtube-dl binary exists. If not try to download it. """
-        if not os_path_exists(self._youtubedl_path()) and self.parent.update_thread is None:
-            self.parent.update_thread = UpdateThread(self.opt_manager.options['youtubedl_path'], True)
-            self.parent.update_thread.join()
-            self.parent.update_thread = None
+        """Download the youtube-dl binary in the background if it is missing.
+
+        The update does not block the download process. The items are
+        dispatched as soon as a youtube-dl binary exists (see the
+        _youtubedl_available() method). An existing binary is only updated
+        on the user's request.
+
+        """
+        if os_path_exists(self._youtubedl_path()):
+            self._youtubedl_found = True
+            return
+
+        update_thread = self.parent.update_thread
+
+        if update_thread is None or not update_thread.is_alive():
+            update_thread = UpdateThread(self.opt_manager.options['youtubedl_path'], True,
+                                         self.opt_manager.config_path)
+            self.parent.update_thread = update_thread
+
+        self._update_thread = update_thread
+
+    def _release_update_thread(self):
+        """Clear the parent's update thread after our update has finished. """
+        if self._update_thread is not None and not self._update_thread.is_alive():
+            if self.parent.update_thread is self._update_thread:
+                self.parent.update_thread = None
+
+            self._update_thread = None
+
+    def _youtubedl_available(self):
+        """Returns True if the workers can start using the youtube-dl binary.
+
+        We only hold back the dispatching while the binary is missing and
+        an update that could provide it is still running. If the update
+        failed the workers will report the error for each item.
+
+        """
+        if not self._youtubedl_found:
+            self._youtubedl_found = os_path_exists(self._youtubedl_path())
+
+        return (self._youtubedl_found or
+                self._update_thread is None or
+                not self._update_thread.is_alive())
+
+    def _skip_downloaded(self, item):
+        """Complete the given item without a worker if it is in the history
+        or in the download archive.
+
+        Returns:
+            True if the item was skipped else False.
+
+        """
+        stats = None
+
+        if self.history is not None and self.opt_manager.options["skip_downloaded"]:
+            stats = self.history.lookup([item.url]).get(item.url)
+
+        if stats is None and self.archive is not None and "--download-archive" in item.options:
+            if self.archive.has_item(item):
+                stats = dict(ALREADY_DOWNLOADED_STATS)
+
+        if stats is None:
+            return False
+
+        # Take it out of the queue, the GUI applies the final stats
+        # exactly like it does for the Worker's updates
+        self.download_list.change_stage(item.object_id, "Active")
+        self._successful += 1
+
+        stats["index"] = item.object_id
+        send_event(WORKER_PUB_TOPIC, ('send', stats))
+
+        return True
+
+    def _needs_expansion(self, item):
+        """Returns True if the worker should flat extract the given item
+        before downloading it, see the 'expand_playlists' option.
+
+        The entries of an expanded playlist and the urls of a single
+        video (unless they also point to a list) are not extracted.
+
+        """
+        if not self.opt_manager.options["expand_playlists"] or item.parent_id is not None:
+            return False
+
+        # The Prefetcher has already expanded it if it was a playlist
+        if item.info_file:
+            return False
+
+        return not is_video_url(item.url) or "list=" in item.url
+
+    def _prefetch(self):
+        """Hand the next queued items to the available Prefetchers."""
+        prefetchers = [prefetcher for prefetcher in self._prefetchers if prefetcher.available()]
+
+        if not prefetchers:
+            return
+
+        for item in self.download_list.get_queued(self.PREFETCH_AHEAD):
+            if item.object_id not in self._prefetched:
+                self._prefetched.add(item.object_id)
+                prefetchers.pop().prefetch(item.url, item.options, item.object_id, self._needs_expansion(item))
+
+                if not prefetchers:
+                    break
+
+    def _download_options(self, item):
+        """Returns the youtube-dl options for the download of the given item.
+
+        When the Prefetcher has cached a fresh info JSON for the item,
+        youtube-dl loads it with '--load-info-json' instead of extracting
+        the url again. When the item has '.part' files left from a stopped
+        or interrupted download, '--continue' makes youtube-dl resume them
+        even if the options or the youtube-dl config say otherwise.
+
+        """
+        options = tuple(item.options)
+
+        if item.get_part_files():
+            options += ('--continue',)
+
+        if item.info_file:
+            try:
+                if time.time() - os.path.getmtime(item.info_file) < self.INFO_TTL:
+                    options += ('--load-info-json', item.info_file)
+            except OSError:
+                pass  # The cache of an older run
+
+        return options
 
     def _get_worker(self):
+        """Returns a worker for the next item or None if all the worker
+        slots are in use. A new worker takes the slot of a suspended
+        download, see _used_slots(). """
+        if self._used_slots() >= self.opt_manager.options["workers_number"]:
+            return None
+
         for worker in self._workers:
             if worker.available():
                 return worker
 
-        return None
+        worker = self._create_worker()
+        self._workers.append(worker)
+
+        return worker
+
+    def _used_slots(self):
+        """Returns the number of the busy workers that hold a slot.
+
+        The preempted downloads never hold a slot and with the
+        'pause_frees_worker' option neither do the paused ones.
+
+        """
+        pause_frees_worker = self.opt_manager.options["pause_frees_worker"]
+
+        slots = 0
+
+        for worker in self._workers:
+            if worker.available() or worker in self._preempted:
+                continue
+
+            if not (pause_frees_worker and worker.paused):
+                slots += 1
+
+        return slots
+
+    def _get_priority(self, worker):
+        """Returns the priority of the item the given worker downloads. """
+        object_id = worker.object_id
+
+        if object_id is not None and self.download_list.has_item(object_id):
+            return self.download_list.get_item(object_id).priority
+
+        return DownloadItem.DEFAULT_PRIORITY
+
+    def _preempt(self, item):
+        """Suspend the running download with the lowest priority if it is
+        below the priority of the given queued item.
+
+        See the 'preempt_downloads' option & Worker.pause_download().
+
+        Returns:
+            True if a download got suspended else False.
+
+        """
+        if not self.opt_manager.options["preempt_downloads"]:
+            return False
+
+        victim = None
+
+        for worker in self._workers:
+            if worker.available() or worker.paused:
+                continue
+
+            priority = self._get_priority(worker)
+
+            if priority < item.priority and (victim is None or priority < victim[0]):
+                victim = (priority, worker)
+
+        if victim is not None and victim[1].pause_download():
+            self._preempted.append(victim[1])
+            return True
+
+        return False
+
+    def _resume_preempted(self, item):
+        """Continue the preempted downloads while there are free slots
+        and the given next queued item has no higher priority. """
+        # Finished, stopped or resumed by the user
+        self._preempted = [worker for worker in self._preempted if worker.paused]
+
+        self._preempted.sort(key=self._get_priority, reverse=True)
+
+        while self._preempted and self._used_slots() < self.opt_manager.options["workers_number"]:
+            worker = self._preempted[0]
+
+            if item is not None and item.priority > self._get_priority(worker):
+                break
+
+            del self._preempted[0]
+            worker.resume_download()
+
+    def _create_worker(self):
+        name = "Worker-{0}".format(len(self._workers) + 1)
+        return Worker(*self._worker_params, name=name, retry_policy=self._retry_policy)
 
     def _jobs_done(self):
         """Returns True if the workers have finished their jobs else False. """
@@ -554,6 +1673,11 @@ class Worker(Thread):
             If the log_manager is set (not None) then the caller has to make
             sure that the log_lock is also set.
 
+        name (string): Name of the thread, it labels the worker metrics.
+
+        retry_policy (RetryPolicy): Policy to queue the failed downloads
+            again. None reports every failure as an 'Error'.
+
     Note:
         For available data keys see self._data under the __init__() method.
 
@@ -561,17 +1685,24 @@ class Worker(Thread):
 
     WAIT_TIME = 0.1
 
-    def __init__(self, opt_manager, youtubedl, log_manager=None, log_lock=None):
-        super(Worker, self).__init__()
+    def __init__(self, opt_manager, youtubedl, log_manager=None, log_lock=None, name=None, retry_policy=None):
+        super(Worker, self).__init__(name=name)
         self.opt_manager = opt_manager
         self.log_manager = log_manager
         self.log_lock = log_lock
+        self.retry_policy = retry_policy
 
         self._downloader = YoutubeDLDownloader(youtubedl, self._data_hook, self._log_data)
+        self._segmented = SegmentedDownloader(self._data_hook, self._log_data)
         self._options_parser = OptionsParser()
         self._successful = 0
         self._running = True
         self._options = None
+        self._expand = False
+        self._attempts = 0
+        self._last_status = None
+        self._segmented_file = None
+        self._stopping = False
 
         self._wait_for_reply = False
 
@@ -596,13 +1727,27 @@ class Worker(Thread):
     def run(self):
         while self._running:
             if self._data['url'] is not None:
-                #options = self._options_parser.parse(self.opt_manager.options)
-                ret_code = self._downloader.download(self._data['url'], self._options)
+                start_time = time.time()
+                entries = None
+
+                if self._expand:
+                    entries = self._downloader.extract_playlist(self._data['url'], self._options)
+
+                if entries is not None:
+                    self._talk_to_gui('playlist', {'entries': entries})
+                elif not self._running:
+                    # Stopped during the playlist extraction
+                    self._talk_to_gui('send', {'status': 'Stopped', 'speed': '', 'eta': ''})
+                else:
+                    #options = self._options_parser.parse(self.opt_manager.options)
+                    ret_code = self._download(self._data['url'], self._options)
+
+                    if (ret_code == YoutubeDLDownloader.OK or
+                            ret_code == YoutubeDLDownloader.ALREADY or
+                            ret_code == YoutubeDLDownloader.WARNING):
+                        self._successful += 1
 
-                if (ret_code == YoutubeDLDownloader.OK or
-                        ret_code == YoutubeDLDownloader.ALREADY or
-                        ret_code == YoutubeDLDownloader.WARNING):
-                    self._successful += 1
+                METRICS.inc("youtubedlg_worker_busy_seconds_total", time.time() - start_time, worker=self.name)
 
                 # Ask GUI for name updates
                 #self._talk_to_gui('receive', {'source': 'filename', 'dest': 'new_filename'})
@@ -618,7 +1763,7 @@ class Worker(Thread):
         # Call the destructor function of YoutubeDLDownloader object
         self._downloader.close()
 
-    def download(self, url, options, object_id):
+    def download(self, url, options, object_id, expand=False, attempts=0):
         """Download given item.
 
         Args:
@@ -627,18 +1772,70 @@ class Worker(Thread):
                 the worker should send back the information about the
                 download process.
 
+            expand (boolean): When True the url gets flat extracted first
+                and if it is a playlist its entries are sent back to the
+                GUI with the 'playlist' signal instead of downloading it.
+
+            attempts (int): Number of the retries of the item so far.
+
         """
-        self._data['url'] = url
+        self._expand = expand
+        self._attempts = attempts
+        self._last_status = DownloadItem.ACTIVE_STAGES[0]
+        self._stopping = False
         self._options = options
         self._data['index'] = object_id
+        self._data['url'] = url
 
     def stop_download(self):
         """Stop the download process of the worker. """
+        self._stopping = True
+        self._segmented.stop()
         self._downloader.stop()
 
+    def pause_download(self):
+        """Suspend the download process of the worker, its item shows
+        the 'Paused' status. See YoutubeDLDownloader.pause() and
+        SegmentedDownloader.pause().
+
+        Returns:
+            True if the download got suspended else False.
+
+        """
+        if self._downloader.pause() or self._segmented.pause():
+            self._talk_to_gui('send', {'status': DownloadItem.ACTIVE_STAGES[3], 'speed': '', 'eta': ''})
+            return True
+
+        return False
+
+    def resume_download(self):
+        """Continue the suspended download process of the worker.
+
+        Returns:
+            True if the download got resumed else False.
+
+        """
+        if self._downloader.resume() or self._segmented.resume():
+            self._talk_to_gui('send', {'status': self._last_status})
+            return True
+
+        return False
+
+    @property
+    def paused(self):
+        """True if the download process of the worker is suspended. """
+        return self._downloader.paused or self._segmented.paused
+
+    @property
+    def object_id(self):
+        """The object_id of the item the worker downloads, None if it is idle. """
+        return self._data['index']
+
     def close(self):
         """Kill the worker after stopping the download process. """
         self._running = False
+        self._stopping = True
+        self._segmented.stop()
         self._downloader.stop()
 
     def available(self):
@@ -663,6 +1860,95 @@ class Worker(Thread):
         """Return the number of successful downloads for current worker. """
         return self._successful
 
+    def _download(self, url, options):
+        """Download the given url with youtube-dl.
+
+        When the 'download_connections' option is above one and the
+        Prefetcher has cached the info JSON of the url ('--load-info-json'),
+        a direct media file may get downloaded over many connections first,
+        see _segmented_download(). The urls without a cached info JSON go
+        straight to youtube-dl, the option never spawns extra extractions.
+
+        Returns:
+            The return code of the download, see YoutubeDLDownloader.
+
+        """
+        if self.opt_manager.options["download_connections"] < 2 or '--load-info-json' not in options:
+            return self._downloader.download(url, options)
+
+        ret_code = None
+
+        if not self._stopping:
+            ret_code = self._segmented_download(url, options)
+
+        if ret_code is None and self._stopping:
+            ret_code = YoutubeDLDownloader.STOPPED
+            self._talk_to_gui('send', {'status': 'Stopped', 'speed': '', 'eta': ''})
+
+        if ret_code is None:
+            ret_code = self._downloader.download(url, options)
+
+        return ret_code
+
+    def _segmented_download(self, url, options):
+        """Download the file of the given url over many connections with
+        the SegmentedDownloader, then let youtube-dl post process it.
+
+        youtube-dl finds the file already downloaded, so it only runs the
+        post processors and records the download archive.
+
+        The destination comes from the '_filename' of the info JSON, only
+        the info files without it cost a '--get-filename' run.
+
+        Returns:
+            The return code of the youtube-dl pass or None if youtube-dl
+            should download the url on its own: the url is not a single
+            file of known size served over HTTP, the segmented download
+            failed or it was stopped.
+
+        """
+        try:
+            with io.open(options[options.index('--load-info-json') + 1], encoding="utf-8") as info_file:
+                info = json.load(info_file)
+        except (IOError, ValueError):
+            return None
+
+        media = direct_media(info)
+
+        if media is None:
+            return None
+
+        filename = info.get('_filename')
+
+        if not filename or not os.path.isabs(filename):
+            filename = self._downloader.get_filename(url, options)
+
+        if filename is None or self._stopping:
+            return None
+
+        path, fullname = os.path.split(filename)
+        name, extension = os.path.splitext(fullname)
+
+        self._talk_to_gui('send', {'status': 'Downloading', 'path': path, 'filename': name, 'extension': extension})
+
+        connections = self.opt_manager.options["download_connections"]
+        ret_code = self._segmented.download(media[0], filename, connections, media[1])
+
+        if ret_code != SegmentedDownloader.OK:
+            if ret_code == SegmentedDownloader.ERROR:
+                METRICS.inc("youtubedlg_segmented_downloads_total", status="fallback")
+
+            return None
+
+        METRICS.inc("youtubedlg_segmented_downloads_total", status="ok")
+
+        self._segmented_file = filename
+
+        try:
+            return self._downloader.download(url, options)
+        finally:
+            self._segmented_file = None
+
     def _reset(self):
         """Reset self._data back to the original state. """
         for key in self._data:
@@ -716,10 +2002,42 @@ class Worker(Thread):
 
         #if len(temp_dict):
             #self._talk_to_gui('send', temp_dict)
+        if self._segmented_file is not None:
+            # The youtube-dl pass after a segmented download
+            if data.get('status') == 'Already Downloaded':
+                data['status'] = 'Finished'
+
+            if 'filename' in data:
+                filename = os.path.join(data.get('path', ''), data['filename'] + data.get('extension', ''))
+
+                if os.path.abspath(filename) == self._segmented_file:
+                    for key in ('path', 'filename', 'extension'):
+                        data.pop(key, None)
+
+        if data.get('percent') == '100%' and data.get('filesize'):
+            METRICS.inc("youtubedlg_downloaded_bytes_total", to_bytes(data['filesize'].lstrip('~')))
+
+        if data.get('status') in DownloadItem.ACTIVE_STAGES:
+            self._last_status = data['status']
+
+            # Lines youtube-dl wrote just before it got suspended
+            if self.paused:
+                data['status'] = DownloadItem.ACTIVE_STAGES[3]
+
+        if data.get('status') == 'Error' and self.retry_policy is not None:
+            delay = self.retry_policy.get_delay(self._attempts, self._downloader.last_error)
+
+            if delay is not None:
+                data['status'] = 'Retrying'
+                data['retry'] = {'attempts': self._attempts + 1, 'not_before': time.time() + delay}
+
+                self._log_data("Retrying {0} in {1:.0f} seconds".format(self._data['url'], delay))
+                METRICS.inc("youtubedlg_retries_total")
+
         self._talk_to_gui('send', data)
 
     def _talk_to_gui(self, signal, data):
-        """Communicate with the GUI using wxCallAfter and wxPublisher.
+        """Communicate with the GUI using the events.send_event() function.
 
         Send/Ask data to/from the GUI. Note that if the signal is 'receive'
         then the Worker will wait until it receives a reply from the GUI.
@@ -738,15 +2056,22 @@ class Worker(Thread):
                 under which key to store the retrieved data.
 
         Note:
-            Worker class supports 2 signals.
+            Worker class supports 3 signals, the Prefetcher also sends
+            the 'info' signal (see DownloadList.set_info()).
                 1) send: The Worker sends data back to the GUI
                          (e.g. Send status updates).
                 2) receive: The Worker asks data from the GUI
                             (e.g. Receive the name of a file).
+                3) playlist: The Worker sends the entry urls of an expanded
+                             playlist (see DownloadList.expand_item()).
 
         Structure:
             ('send', {'index': <item_row>, data_to_send*})
 
+            ('playlist', {'index': <item_row>, 'entries': [<url>, ...]})
+
+            ('info', {'index': <item_row>, 'info_file': <path>, info*})
+
             ('receive', {'index': <item_row>, 'source': 'source_key', 'dest': 'destination_key'})
 
         """
@@ -755,5 +2080,135 @@ class Worker(Thread):
         if signal == 'receive':
             self._wait_for_reply = True
 
-        CallAfter(Publisher.sendMessage, WORKER_PUB_TOPIC, (signal, data))
+        send_event(WORKER_PUB_TOPIC, (signal, data))
+
+
+
+class Prefetcher(Thread):
+
+    """Worker that fetches the metadata of the queued items ahead of the
+    download Workers.
 
+    The Prefetcher flat extracts the url (see YoutubeDLDownloader.extract_info())
+    and caches the info JSON in a file. The info goes to the GUI with the
+    'info' signal (see DownloadList.set_info()) and the download Worker
+    passes the file to youtube-dl with '--load-info-json' which skips the
+    extraction. A playlist that should be expanded is sent with the
+    'playlist' signal exactly like the Worker does.
+
+    Attributes:
+        WAIT_TIME (float): Time in seconds to sleep.
+
+    Args:
+        youtubedl (string): Absolute path to youtube-dl binary.
+
+        cache_dir (string): Directory to store the info JSON files.
+
+        log_manager (logmanager.LogManager): Check DownloadManager
+            description.
+
+        log_lock (threading.Lock): Check Worker description.
+
+        name (string): Name of the thread.
+
+    """
+
+    WAIT_TIME = 0.1
+
+    def __init__(self, youtubedl, cache_dir, log_manager=None, log_lock=None, name=None):
+        super(Prefetcher, self).__init__(name=name)
+        self.cache_dir = cache_dir
+        self.log_manager = log_manager
+        self.log_lock = log_lock
+
+        self._downloader = YoutubeDLDownloader(youtubedl, log_data=self._log_data)
+        self._running = True
+        self._job = None
+
+        self.start()
+
+    def run(self):
+        while self._running:
+            if self._job is not None:
+                self._prefetch(*self._job)
+                self._job = None
+
+            time.sleep(self.WAIT_TIME)
+
+        self._downloader.close()
+
+    def prefetch(self, url, options, object_id, expand=False):
+        """Fetch the metadata of the given item.
+
+        Args:
+            expand (boolean): When True a playlist gets expanded,
+                see Worker.download().
+
+        """
+        self._job = (url, options, object_id, expand)
+
+    def available(self):
+        """Return True if the prefetcher has no job else False. """
+        return self._job is None
+
+    def close(self):
+        """Kill the prefetcher after stopping the youtube-dl process. """
+        self._running = False
+        self._downloader.stop()
+
+    def _prefetch(self, url, options, object_id, expand):
+        info_json = self._downloader.extract_info(url, options)
+
+        # The download Worker reports the errors
+        if info_json is None or not self._running:
+            return
+
+        try:
+            info = json.loads(info_json)
+        except ValueError:
+            return
+
+        entries = playlist_entries(info)
+
+        if expand and entries is not None:
+            self._talk_to_gui('playlist', {'index': object_id, 'entries': entries})
+            return
+
+        info_file = os.path.join(self.cache_dir, "{0}.info.json".format(object_id))
+
+        with io.open(info_file, "w", encoding="utf-8") as output:
+            output.write(info_json)
+
+        data = {
+            'index': object_id,
+            'info_file': info_file,
+            'formats': [video_format.get('format_id') for video_format in info.get('formats') or []]
+        }
+
+        if info.get('title'):
+            data['filename'] = info['title']
+
+        if info.get('ext'):
+            data['extension'] = '.' + info['ext']
+
+        filesize = info.get('filesize') or info.get('filesize_approx')
+
+        if filesize:
+            data['size'] = filesize
+            data['filesize'] = format_bytes(filesize)
+
+        if info.get('duration'):
+            data['duration'] = info['duration']
+
+        self._talk_to_gui('info', data)
+
+    def _log_data(self, data):
+        """Write the given data to the log, see Worker._log_data(). """
+        if self.log_manager is not None:
+            self.log_lock.acquire()
+            self.log_manager.log(data)
+            self.log_lock.release()
+
+    def _talk_to_gui(self, signal, data):
+        """Send the data to the GUI, see Worker._talk_to_gui(). """
+        send_event(WORKER_PUB_TOPIC, (signal, data))
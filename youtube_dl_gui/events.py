@@ -0,0 +1,84 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+
+"""Youtubedlg module that delivers the events of the background threads.
+
+The DownloadManager, Worker & UpdateThread threads publish their events
+with the send_event() function. The events end up on the installed event
+sink, which is any callable that accepts the (topic, data) arguments.
+
+The default sink forwards the events to the GUI thread using wxCallAfter
+and wxPublisher. Other front-ends (e.g. the headless mode) install their
+own sink using the set_event_sink() function, so the download engine
+does not depend on wx.
+
+"""
+
+from __future__ import unicode_literals
+
+import time
+
+from .metrics import METRICS
+from .profiler import PROFILER
+
+
+class WxEventSink(object):
+
+    """Event sink that publishes the events on the GUI thread.
+
+    The events are delivered to the wxPublisher listeners of the
+    given topic from the main loop of the wx application.
+
+    """
+
+    def __init__(self):
+        # Import wx only when the GUI is actually used
+        from wx import CallAfter
+        from wx.lib.pubsub import setuparg1
+        from wx.lib.pubsub import pub as Publisher
+
+        self._call_after = CallAfter
+        self._publisher = Publisher
+
+    def __call__(self, topic, data):
+        METRICS.inc("youtubedlg_event_queue_depth")
+        self._call_after(self._deliver, topic, data, time.time())
+
+    def _deliver(self, topic, data, send_time):
+        METRICS.inc("youtubedlg_event_queue_depth", -1)
+
+        if PROFILER.enabled:
+            PROFILER.record("gui.callafter_latency", time.time() - send_time)
+
+        self._publisher.sendMessage(topic, data)
+
+
+_event_sink = None
+
+
+def set_event_sink(event_sink):
+    """Install the given callable as the event sink.
+
+    Args:
+        event_sink (callable): Callable with the (topic, data) signature.
+            It gets called from the background threads. None restores
+            the default WxEventSink.
+
+    """
+    global _event_sink
+    _event_sink = event_sink
+
+
+def get_event_sink():
+    """Returns the installed event sink creating the default one if needed."""
+    global _event_sink
+
+    if _event_sink is None:
+        _event_sink = WxEventSink()
+
+    return _event_sink
+
+
+def send_event(topic, data):
+    """Send the given data under the given topic to the event sink."""
+    get_event_sink()(topic, data)
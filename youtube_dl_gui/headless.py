@@ -0,0 +1,341 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+
+"""Youtubedlg module that runs the download engine without the GUI.
+
+The headless mode uses the saved youtubedlg options, the same
+DownloadManager and the same download history as the GUI but it
+prints the progress of the downloads on the standard output.
+
+Example:
+    Download the URLs of a file or the standard input.
+
+        $ youtube-dl-gui --headless urls.txt
+        $ cat urls.txt | python -m youtube_dl_gui --headless
+
+"""
+
+from __future__ import unicode_literals
+
+import io
+import sys
+import time
+import os.path
+import argparse
+from Queue import Queue, Empty
+
+from .events import set_event_sink
+from .parsers import OptionsParser
+from .logmanager import LogManager
+from .optionsmanager import OptionsManager
+from .updatemanager import UPDATE_PUB_TOPIC
+
+from .history import (
+    ALREADY_DOWNLOADED_STATS,
+    DownloadHistory,
+    DownloadArchive,
+    record_download
+)
+
+from .downloadmanager import (
+    MANAGER_PUB_TOPIC,
+    WORKER_PUB_TOPIC,
+    DownloadManager,
+    DownloadList,
+    DownloadItem,
+    sum_durations
+)
+
+from .utils import (
+    YOUTUBEDL_BIN,
+    get_config_path,
+    os_path_exists,
+    format_duration,
+    get_encoding,
+    to_string,
+    get_time
+)
+
+
+class HeadlessApp(object):
+
+    """Runs the download queue and reports the progress as text lines.
+
+    HeadlessApp plays the role of the MainFrame for the DownloadManager.
+    The events of the background threads are collected on a queue by the
+    installed event sink and they are handled on the calling thread.
+
+    Attributes:
+        PROGRESS_INTERVAL (float): Minimum time in seconds between two
+            progress lines of the same item when its status does not change.
+
+        WAIT_TIME (float): Time in seconds to wait for a new event.
+
+    Args:
+        opt_manager (optionsmanager.OptionsManager): Object responsible for
+            managing the youtubedlg options.
+
+        log_manager (logmanager.LogManager): Object responsible for writing
+            errors to the log.
+
+        output (file): File object to write the progress lines.
+
+    """
+
+    PROGRESS_INTERVAL = 5.0
+    WAIT_TIME = 0.5
+
+    def __init__(self, opt_manager, log_manager=None, output=None):
+        self.opt_manager = opt_manager
+        self.log_manager = log_manager
+        self.output = sys.stdout if output is None else output
+
+        # The DownloadManager shares the update thread with its parent
+        self.update_thread = None
+        self.download_manager = None
+
+        self._encoding = get_encoding()
+        self._events = Queue()
+        self._last_progress = {}
+
+        self._options_parser = OptionsParser()
+        self._download_list = DownloadList()
+        self._history = DownloadHistory(opt_manager.config_path)
+        self._archive = None
+
+        if opt_manager.options["download_archive"]:
+            self._archive = DownloadArchive(opt_manager.options["download_archive"])
+
+    def add_urls(self, urls):
+        """Add the given urls to the download queue.
+
+        Returns:
+            Number of the items that were added.
+
+        """
+        options = self._options_parser.parse(self.opt_manager.options)
+        options_key = to_string(options)
+        save_path = self.opt_manager.options["save_path"]
+
+        download_items = []
+
+        for url in urls:
+            download_item = DownloadItem(url, options, options_key)
+            download_item.path = save_path
+            download_items.append(download_item)
+
+        download_items = self._download_list.insert_many(download_items)
+
+        if self.opt_manager.options["skip_downloaded"]:
+            downloaded = self._history.lookup([download_item.url for download_item in download_items])
+        else:
+            downloaded = {}
+
+        for download_item in download_items:
+            if download_item.url in downloaded:
+                self._download_list.update_stats(download_item.object_id, downloaded[download_item.url])
+            elif self._archive is not None and self._archive.has_url(download_item.url):
+                self._download_list.update_stats(download_item.object_id, ALREADY_DOWNLOADED_STATS)
+            else:
+                continue
+
+            self._report(download_item)
+
+        return len(download_items)
+
+    def run(self):
+        """Download the queued items.
+
+        Returns:
+            Exit status, 0 if all the items completed else 1.
+
+        """
+        set_event_sink(self._put_event)
+
+        try:
+            self.download_manager = DownloadManager(self, self._download_list, self.opt_manager,
+                                                    self.log_manager, self._history, self._archive)
+
+            try:
+                while self._handle_event():
+                    pass
+            except KeyboardInterrupt:
+                self.download_manager.stop_downloads()
+
+                while self._handle_event():
+                    pass
+        finally:
+            set_event_sink(None)
+            self._history.close()
+
+        items = self._download_list.get_items()
+        completed = len([item for item in items if item.stage == "Completed"])
+
+        dtime = get_time(self.download_manager.time_it_took)
+
+        self._write("Completed {0} of {1} URL(s) in {2} day(s) {3} hour(s) {4} minute(s) {5} second(s)".format(
+            completed, len(items), dtime['days'], dtime['hours'], dtime['minutes'], dtime['seconds']))
+
+        durations = sum_durations(items)
+
+        if durations:
+            phases = ["{0} {1}".format(phase.replace("_", " "), format_duration(durations[phase]))
+                      for phase, start, ends in DownloadItem.PHASES if phase in durations]
+
+            self._write("Time per phase: " + ", ".join(phases))
+
+        return 0 if completed == len(items) else 1
+
+    def _put_event(self, topic, data):
+        """Event sink, see the events module. Called from the background threads."""
+        self._events.put((topic, data))
+
+    def _handle_event(self):
+        """Handle the next event.
+
+        Returns:
+            False when the DownloadManager has stopped else True.
+
+        """
+        try:
+            # Queue.get() without timeout blocks the KeyboardInterrupt
+            topic, data = self._events.get(timeout=self.WAIT_TIME)
+        except Empty:
+            return True
+
+        if topic == WORKER_PUB_TOPIC:
+            self._on_worker_event(data)
+        elif topic == MANAGER_PUB_TOPIC:
+            if data == "closing":
+                self._write("Stopping the downloads...")
+            elif data in ("finished", "closed"):
+                return False
+        elif topic == UPDATE_PUB_TOPIC:
+            self._on_update_event(data)
+
+        return True
+
+    def _on_worker_event(self, msg):
+        signal, data = msg
+
+        old_status = self._download_list.get_item(data["index"]).progress_stats["status"]
+
+        if signal == "playlist":
+            self._download_list.expand_item(data["index"], data["entries"])
+            download_item = self._download_list.get_item(data["index"])
+        elif signal == "info":
+            download_item = self._download_list.set_info(data["index"], data)
+        else:
+            download_item = self._download_list.update_stats(data["index"], data)
+
+        if data.get("status") in DownloadItem.COMPLETED_STAGES:
+            record_download(download_item, self._history, self._archive)
+
+        now = time.time()
+        last_progress = self._last_progress.get(download_item.object_id, 0)
+
+        if download_item.progress_stats["status"] != old_status or now - last_progress >= self.PROGRESS_INTERVAL:
+            self._last_progress[download_item.object_id] = now
+            self._report(download_item)
+
+    def _on_update_event(self, msg):
+        signal, data = msg
+
+        if signal == "download":
+            self._write("Updating youtube-dl...")
+        elif signal == "correct":
+            self._write("youtube-dl updated")
+        elif signal == "latest":
+            self._write("youtube-dl is already the latest version")
+        elif signal == "error":
+            self._write("youtube-dl update failed: {0}".format(data))
+
+    def _report(self, download_item):
+        """Write the progress line of the given item."""
+        stats = download_item.progress_stats
+
+        if download_item.filenames:
+            name = stats["filename"] + stats["extension"]
+        else:
+            name = download_item.url
+
+        self._write("[{0}/{1}] {2:<18} {3:>6} {4:>10} {5:>12} {6:>8}  {7}".format(
+            self._download_list.index(download_item.object_id) + 1,
+            len(self._download_list),
+            stats["status"],
+            stats["percent"],
+            stats["filesize"],
+            stats["speed"],
+            stats["eta"],
+            name))
+
+    def _write(self, line):
+        self.output.write((line + "\n").encode(self._encoding, "replace"))
+        self.output.flush()
+
+
+def read_urls(urls_file):
+    """Returns the list of the urls of the given file object, one per line."""
+    urls = []
+
+    for line in urls_file:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", "ignore")
+
+        line = line.strip()
+
+        if line:
+            urls.append(line)
+
+    return urls
+
+
+def main(argv=None):
+    """Entry point of the headless mode.
+
+    Args:
+        argv (list): Command line arguments. Default is sys.argv[1:].
+
+    Returns:
+        Exit status.
+
+    """
+    parser = argparse.ArgumentParser(prog="youtube-dl-gui --headless",
+                                     description="Download the given URLs without the GUI using the saved options")
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("urls_file", nargs="?", default="-",
+                        help="file with one URL per line, '-' (the default) reads the standard input")
+
+    args = parser.parse_args(argv)
+
+    if args.urls_file == "-":
+        urls = read_urls(sys.stdin)
+    else:
+        try:
+            with io.open(args.urls_file, "r", encoding="utf-8", errors="ignore") as urls_file:
+                urls = read_urls(urls_file)
+        except IOError as error:
+            sys.stderr.write("{0}\n".format(error))
+            return 1
+
+    config_path = get_config_path()
+
+    opt_manager = OptionsManager(config_path)
+    log_manager = None
+
+    if opt_manager.options["enable_log"]:
+        log_manager = LogManager(config_path, opt_manager.options["log_time"])
+
+    youtubedl_path = os.path.join(opt_manager.options["youtubedl_path"], YOUTUBEDL_BIN)
+
+    if opt_manager.options["disable_update"] and not os_path_exists(youtubedl_path):
+        sys.stderr.write("Failed to locate youtube-dl and updates are disabled\n")
+        return 1
+
+    app = HeadlessApp(opt_manager, log_manager)
+
+    if not app.add_urls(urls):
+        sys.stderr.write("No URLs to download\n")
+        return 1
+
+    return app.run()
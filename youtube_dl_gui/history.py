@@ -0,0 +1,310 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+
+"""Youtubedlg module responsible for the download history.
+
+The history is an SQLite database stored under the config path that holds
+every completed URL together with its output files. It is used to detect
+the already downloaded URLs without spawning youtube-dl.
+
+The module also provides an in-memory view of the youtube-dl download
+archive file (see the --download-archive option).
+
+Attributes:
+    ALREADY_DOWNLOADED_STATS (dict): Stats dictionary that completes an
+        archived item (see DownloadItem.update_stats()).
+
+    VIDEO_URL_PATTERNS (list): List of (extractor, compiled regex) tuples
+        used to get the video id from a URL without running youtube-dl.
+
+"""
+
+from __future__ import unicode_literals
+
+import re
+import json
+import time
+import sqlite3
+import os.path
+from threading import Lock
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .utils import (
+    os_path_expanduser,
+    os_path_exists,
+    format_bytes,
+    check_path
+)
+
+
+ALREADY_DOWNLOADED_STATS = {"status": "Already Downloaded", "percent": "100%"}
+
+VIDEO_URL_PATTERNS = [
+    ("youtube", re.compile(r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|embed/|v/|shorts/)|youtu\.be/)([0-9A-Za-z_-]{11})(?![0-9A-Za-z_-])"))
+]
+
+
+def record_download(download_item, history, archive=None):
+    """Add the given completed DownloadItem to the history & archive.
+
+    Args:
+        download_item (downloadmanager.DownloadItem): Completed item.
+
+        history (DownloadHistory): Download history.
+
+        archive (DownloadArchive): Download archive or None.
+
+    """
+    already_recorded = (download_item.progress_stats["status"] == "Already Downloaded" and
+                        history.has_url(download_item.url))
+
+    if download_item.get_files() and not already_recorded:
+        history.add(download_item)
+
+    # Sub-extractors (e.g. 'youtube:playlist') are not archive keys
+    if archive is not None and download_item.video_id and ":" not in download_item.extractor:
+        archive.add(download_item.extractor, download_item.video_id)
+
+
+def is_video_url(url):
+    """Returns True if the given url matches one of the VIDEO_URL_PATTERNS."""
+    return any(pattern.search(url) is not None for extractor, pattern in VIDEO_URL_PATTERNS)
+
+
+class DownloadHistory(object):
+
+    """SQLite index of the completed downloads.
+
+    All the methods are thread safe, the same object can be used by the
+    GUI and the DownloadManager thread.
+
+    Attributes:
+        DB_FILENAME (string): Filename of the history database.
+        QUERY_CHUNK_SIZE (int): Maximum number of urls to look up with a
+            single query (SQLite limits the number of query parameters).
+
+    Args:
+        config_path (string): Absolute path where DownloadHistory should
+            store the database.
+
+    """
+
+    DB_FILENAME = "history.db"
+    QUERY_CHUNK_SIZE = 500
+
+    def __init__(self, config_path):
+        self.config_path = config_path
+        self.db_file = os.path.join(config_path, self.DB_FILENAME)
+
+        check_path(config_path)
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+
+            # The 'url' primary key is the index we use for the look ups
+            self._conn.execute("CREATE TABLE IF NOT EXISTS downloads ("
+                               "url TEXT PRIMARY KEY, "
+                               "extractor TEXT, "
+                               "video_id TEXT, "
+                               "path TEXT, "
+                               "files TEXT, "
+                               "filesizes TEXT, "
+                               "completed REAL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS downloads_video "
+                               "ON downloads (extractor, video_id)")
+            self._conn.commit()
+
+    def add(self, download_item):
+        """Record the given completed downloadmanager.DownloadItem."""
+        values = (
+            download_item.url,
+            download_item.extractor,
+            download_item.video_id,
+            download_item.path,
+            json.dumps(download_item.get_files()),
+            json.dumps(download_item.filesizes),
+            time.time()
+        )
+
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?, ?)", values)
+            self._conn.commit()
+
+    def has_url(self, url):
+        """Returns True if the given url is in the history else False."""
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM downloads WHERE url = ?", (url,)).fetchone()
+
+        return row is not None
+
+    def has_video(self, extractor, video_id):
+        """Returns True if the given extractor video is in the history else False."""
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM downloads WHERE extractor = ? AND video_id = ?",
+                                     (extractor, video_id)).fetchone()
+
+        return row is not None
+
+    def lookup(self, urls):
+        """Look up the given urls in the history.
+
+        Urls whose recorded output files no longer exist on the disk are
+        not reported, since youtube-dl would download them again.
+
+        Args:
+            urls (list): List with the urls to look up.
+
+        Returns:
+            Dictionary that maps each downloaded url to a stats dictionary
+            that can be passed to the DownloadItem.update_stats() method.
+
+        """
+        rows = []
+
+        with self._lock:
+            for index in xrange(0, len(urls), self.QUERY_CHUNK_SIZE):
+                chunk = urls[index:index + self.QUERY_CHUNK_SIZE]
+                query = "SELECT url, path, files, filesizes FROM downloads WHERE url IN ({0})"
+
+                rows.extend(self._conn.execute(query.format(", ".join("?" * len(chunk))), chunk))
+
+        downloaded = {}
+
+        for url, path, files, filesizes in rows:
+            files = json.loads(files)
+            filesizes = json.loads(filesizes)
+
+            if files and all(os_path_exists(filename) for filename in files):
+                filename, extension = os.path.splitext(os.path.basename(files[-1]))
+
+                stats = {
+                    "status": "Already Downloaded",
+                    "percent": "100%",
+                    "path": path,
+                    "filename": filename,
+                    "extension": extension
+                }
+
+                if filesizes:
+                    stats["filesize"] = format_bytes(filesizes[-1])
+
+                downloaded[url] = stats
+
+        return downloaded
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM downloads").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DownloadArchive(object):
+
+    """In-memory view of the youtube-dl download archive file.
+
+    The archive file holds one '<extractor> <video id>' line per
+    downloaded video. It is read once into a set and afterwards only the
+    lines appended by the youtube-dl processes get read (see refresh()).
+
+    Args:
+        archive_file (string): Path to the download archive file.
+
+    """
+
+    def __init__(self, archive_file):
+        self.archive_file = os_path_expanduser(archive_file)
+
+        self._lock = Lock()
+        self._ids = set()
+        self._offset = 0
+
+        self.refresh()
+
+    def refresh(self):
+        """Read the lines appended to the archive file since the last read."""
+        with self._lock:
+            if not os_path_exists(self.archive_file):
+                return
+
+            if os.path.getsize(self.archive_file) < self._offset:
+                # The file has been replaced, read it from the start
+                self._ids.clear()
+                self._offset = 0
+
+            with open(self.archive_file, "rb") as archive_file:
+                archive_file.seek(self._offset)
+
+                for line in archive_file:
+                    if not line.endswith(b"\n"):
+                        # The writer has not finished this line yet
+                        break
+
+                    self._offset += len(line)
+                    self._ids.add(line.decode("utf-8", "ignore").strip())
+
+    def has_video(self, extractor, video_id):
+        """Returns True if the given extractor video is in the archive else False."""
+        return "{0} {1}".format(extractor.lower(), video_id) in self._ids
+
+    def has_url(self, url):
+        """Returns True if the video of the given url is in the archive.
+
+        Only the urls that match one of the VIDEO_URL_PATTERNS can be
+        checked, for all the other urls this method returns False.
+
+        """
+        for extractor, pattern in VIDEO_URL_PATTERNS:
+            match = pattern.search(url)
+
+            if match is not None:
+                return self.has_video(extractor, match.group(1))
+
+        return False
+
+    def has_item(self, download_item):
+        """Returns True if the given DownloadItem is in the archive else False."""
+        if download_item.extractor and download_item.video_id:
+            return self.has_video(download_item.extractor, download_item.video_id)
+
+        return self.has_url(download_item.url)
+
+    def add(self, extractor, video_id):
+        """Append the given video to the archive if it is not already there.
+
+        The line is written with a single append under an exclusive lock
+        (the same lock youtube-dl uses), so it never interleaves with the
+        lines of the running youtube-dl processes.
+
+        """
+        self.refresh()
+
+        entry = "{0} {1}".format(extractor.lower(), video_id)
+
+        with self._lock:
+            if entry in self._ids:
+                return
+
+            try:
+                with open(self.archive_file, "ab") as archive_file:
+                    if fcntl is not None:
+                        fcntl.lockf(archive_file, fcntl.LOCK_EX)
+
+                    archive_file.write((entry + "\n").encode("utf-8"))
+            except IOError:
+                return  # youtube-dl will add it on the next download
+
+            self._ids.add(entry)
+
+    def __len__(self):
+        return len(self._ids)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+
+"""Youtubedlg module responsible for persisting the download queue.
+
+The queue is stored as an append-only journal, one JSON record per line.
+Each change of the downloadmanager.DownloadList appends a small record,
+so the write path never rewrites the whole queue. When the journal has
+grown too much compared to the number of the items it describes it gets
+compacted to a fresh snapshot.
+
+Records:
+    ["o", index, options]: Declares the options tuple with the given index.
+    ["a", object_id, url, options_index, path]: Item added.
+    ["s", object_id, state]: Item state changed (see DownloadItem.get_state).
+    ["r", object_id]: Item removed.
+    ["w", object_id1, object_id2]: Items swapped.
+    ["t", object_id]: Item moved to the top.
+    ["b", object_id]: Item moved to the bottom.
+    ["m", object_id, index]: Item moved to the given index (old journals).
+    ["c"]: All the items removed.
+
+"""
+
+from __future__ import unicode_literals
+
+import gc
+import os
+import json
+import time
+import os.path
+import threading
+
+from .downloadmanager import DownloadItem
+
+from .utils import (
+    os_path_exists,
+    check_path,
+    to_string
+)
+
+
+class QueueJournal(object):
+
+    """Append-only journal of the download queue.
+
+    Attributes:
+        JOURNAL_FILENAME (string): Filename of the journal file.
+        FLUSH_INTERVAL (float): Maximum time in seconds to keep
+            records in the write buffer.
+        COMPACT_MIN_RECORDS (int): Never compact journals with less records.
+        COMPACT_RATIO (int): Compact the journal when it holds more than
+            COMPACT_RATIO records per live item.
+
+    Args:
+        config_path (string): Absolute path where QueueJournal should
+            store the journal file.
+
+    """
+
+    JOURNAL_FILENAME = "queue.journal"
+    FLUSH_INTERVAL = 1.0
+    COMPACT_MIN_RECORDS = 1000
+    COMPACT_RATIO = 4
+
+    def __init__(self, config_path):
+        self.config_path = config_path
+        self.journal_file = os.path.join(config_path, self.JOURNAL_FILENAME)
+
+        self._file = None
+        self._last_flush = 0
+        self._flush_timer = None
+        self._lock = threading.RLock()  # The flush timer runs on its own thread
+        self._records = 0
+        self._top_sequence = 0  # Sequence of the last move to the top
+        self._items = 0
+        self._options = {}
+
+    def load(self):
+        """Replay the journal file.
+
+        Returns:
+            List with the restored DownloadItems in the queue order.
+
+        """
+        # We only allocate objects that will live for the whole session,
+        # so the garbage collector passes are just overhead here
+        gc_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            items = self._load()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        self._items = len(items)
+
+        if self.needs_compaction():
+            self.compact(items)
+
+        return items
+
+    def _load(self):
+        options = {}
+        items_data = {}
+
+        self._records = 0
+        self._top_sequence = 0
+
+        if os_path_exists(self.journal_file):
+            with open(self.journal_file, "rb") as journal_file:
+                for line in journal_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Partial record from a crash
+                        continue
+
+                    self._records += 1
+                    self._replay(record, options, items_data)
+
+        items = []
+        options_keys = {}
+
+        for _, url, options_index, path, state in sorted(items_data.values()):
+            item_options = options[options_index]
+
+            if options_index not in options_keys:
+                options_keys[options_index] = to_string(item_options)
+
+            item = DownloadItem(url, item_options, options_keys[options_index])
+            item.path = path
+
+            if state is not None:
+                item.set_state(state)
+
+            items.append(item)
+
+        self._options = dict((value, key) for key, value in options.items())
+
+        return items
+
+    def add(self, item):
+        options = tuple(item.options)
+        options_index = self._options.get(options)
+
+        if options_index is None:
+            options_index = self._options[options] = len(self._options)
+            self._write(["o", options_index, options])
+
+        self._write(["a", item.object_id, item.url, options_index, item.path])
+        self._items += 1
+
+    def update(self, item):
+        self._write(["s", item.object_id, item.get_state()])
+
+    def remove(self, object_id):
+        self._write(["r", object_id])
+        self._items -= 1
+
+    def move_to_top(self, object_id):
+        self._write(["t", object_id])
+
+    def move_to_bottom(self, object_id):
+        self._write(["b", object_id])
+
+    def swap(self, object_id1, object_id2):
+        self._write(["w", object_id1, object_id2])
+
+    def clear(self):
+        self._write(["c"])
+        self._items = 0
+
+    def needs_compaction(self):
+        """Returns True if the journal should be compacted. """
+        return (self._records > self.COMPACT_MIN_RECORDS and
+                self._records > self._items * self.COMPACT_RATIO)
+
+    def compact(self, items):
+        """Replace the journal with a snapshot of the given items.
+
+        The snapshot is written to a temporary file which is then renamed
+        over the journal, so a crash during the compaction leaves the old
+        journal intact.
+
+        """
+        with self._lock:
+            self.close()
+            check_path(self.config_path)
+
+            self._options = {}
+            self._records = 0
+            self._items = 0
+
+            temp_file = self.journal_file + ".tmp"
+            self._file = open(temp_file, "wb")
+
+            for item in items:
+                self.add(item)
+
+                if item.stage != "Queued" or item.filenames or item.priority != DownloadItem.DEFAULT_PRIORITY:
+                    self.update(item)
+
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            self._cancel_flush()
+
+            if os.name == "nt" and os_path_exists(self.journal_file):
+                os.remove(self.journal_file)
+
+            os.rename(temp_file, self.journal_file)
+
+    def flush(self):
+        with self._lock:
+            self._cancel_flush()
+
+            if self._file is not None:
+                self._file.flush()
+                self._last_flush = time.time()
+
+    def close(self):
+        with self._lock:
+            self._cancel_flush()
+
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write(self, record):
+        with self._lock:
+            if self._file is None:
+                check_path(self.config_path)
+                self._file = open(self.journal_file, "ab")
+
+            line = json.dumps(record, separators=(",", ":")) + "\n"
+            self._file.write(line.encode("utf-8"))
+            self._records += 1
+
+            if time.time() - self._last_flush > self.FLUSH_INTERVAL:
+                self.flush()
+            elif self._flush_timer is None:
+                # Make sure the last records of a burst reach the disk
+                # even if no other write follows them
+                self._flush_timer = threading.Timer(self.FLUSH_INTERVAL, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _cancel_flush(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def _replay(self, record, options, items_data):
+        """Apply the given record on the options & items_data dictionaries.
+
+        Each entry of the items_data holds the sequence number of the
+        item in the queue, since the dictionary itself has no order. The
+        record number is above all the sequences given so far, so it is
+        the sequence of the added items and of the moves to the bottom.
+
+        """
+        action = record[0]
+
+        if action == "o":
+            options[record[1]] = tuple(record[2])
+        elif action == "a":
+            items_data[record[1]] = [self._records, record[2], record[3], record[4], None]
+        elif action == "s":
+            if record[1] in items_data:
+                items_data[record[1]][4] = record[2]
+        elif action == "r":
+            items_data.pop(record[1], None)
+        elif action == "w":
+            if record[1] in items_data and record[2] in items_data:
+                item1, item2 = items_data[record[1]], items_data[record[2]]
+                item1[0], item2[0] = item2[0], item1[0]
+        elif action == "t":
+            if record[1] in items_data:
+                self._top_sequence -= 1
+                items_data[record[1]][0] = self._top_sequence
+        elif action == "b":
+            if record[1] in items_data:
+                items_data[record[1]][0] = self._records
+        elif action == "m":
+            if record[1] in items_data:
+                self._move(items_data, record[1], record[2])
+        elif action == "c":
+            items_data.clear()
+
+    def _move(self, items_data, object_id, index):
+        """Move the item and renumber the sequence of all the items.
+
+        Only journals written before the "w", "t" & "b" records hold index
+        moves, so this slow path runs at most once per old journal.
+
+        """
+        items = sorted(items_data.values())
+
+        item = items_data[object_id]
+        items.remove(item)
+        items.insert(index, item)
+
+        for sequence, item in enumerate(items):
+            item[0] = sequence
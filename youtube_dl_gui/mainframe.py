@@ -5,9 +5,12 @@
 
 from __future__ import unicode_literals
 
+import io
 import os
 import gettext
 
+from itertools import islice
+
 import wx
 from wx.lib.pubsub import setuparg1 #NOTE Should remove deprecated
 from wx.lib.pubsub import pub as Publisher
@@ -15,10 +18,12 @@ from wx.lib.pubsub import pub as Publisher
 from wx.lib.mixins.listctrl import ListCtrlAutoWidthMixin
 
 from .parsers import OptionsParser
-
-from .optionsframe import (
-    OptionsFrame,
-    LogGUI
+from .journal import QueueJournal
+from .history import (
+    ALREADY_DOWNLOADED_STATS,
+    DownloadHistory,
+    DownloadArchive,
+    record_download
 )
 
 from .updatemanager import (
@@ -31,20 +36,25 @@ from .downloadmanager import (
     WORKER_PUB_TOPIC,
     DownloadManager,
     DownloadList,
-    DownloadItem
+    DownloadItem,
+    sum_durations
 )
 
 from .utils import (
+    os_path_expanduser,
+    format_duration,
     get_pixmaps_dir,
     build_command,
     get_icon_file,
     shutdown_sys,
     remove_file,
+    to_string,
     open_file,
     get_time
 )
 
 from .widgets import CustomComboBox
+from .profiler import PROFILER
 
 from .formats import (
     DEFAULT_FORMATS,
@@ -93,6 +103,8 @@ class MainFrame(wx.Frame):
 
     FRAMES_MIN_SIZE = (560, 360)
 
+    IMPORT_CHUNK_SIZE = 2000
+
     # Labels area
     URLS_LABEL = _("Enter URLs below")
     UPDATE_LABEL = _("Update")
@@ -112,7 +124,9 @@ class MainFrame(wx.Frame):
     PAUSE_LABEL = _("Pause")
     START_LABEL = _("Start")
     ABOUT_LABEL = _("About")
+    IMPORT_LABEL = _("Import URLs")
     VIEWLOG_LABEL = _("View Log")
+    PROFILER_LABEL = _("Profiler")
 
     SUCC_REPORT_MSG = _("Successfully downloaded {0} URL(s) in {1} "
                        "day(s) {2} hour(s) {3} minute(s) {4} second(s)")
@@ -123,13 +137,19 @@ class MainFrame(wx.Frame):
     PROVIDE_URL_MSG = _("You need to provide at least one URL")
     DOWNLOAD_STARTED = _("Downloads started")
     CHOOSE_DIRECTORY = _("Choose Directory")
+    IMPORTING_MSG = _("Importing URLs ({0})")
+    IMPORTED_MSG = _("Imported {0} URL(s)")
+    API_ERR_MSG = _("Unable to start the control API on port {0} [{1}]")
+    DURATIONS_MSG = _("Spawn {0} | Extraction {1} | Download {2} | Post Processing {3}")
+    PRIORITY_MSG = _("Priority {0}")
+    PROFILING_MSG = _("Profiling the GUI thread, select the profiler again for the report")
 
-    DOWNLOAD_ACTIVE = _("Download in progress. Please wait for all downloads to complete")
     UPDATE_ACTIVE = _("Update already in progress")
 
     UPDATING_MSG = _("Downloading latest youtube-dl. Please wait...")
     UPDATE_ERR_MSG = _("Youtube-dl download failed [{0}]")
     UPDATE_SUCC_MSG = _("Successfully downloaded youtube-dl")
+    UPDATE_LATEST_MSG = _("Youtube-dl is up to date")
 
     OPEN_DIR_ERR = _("Unable to open directory: '{dir}'. "
                     "The specified path does not exist")
@@ -171,7 +191,15 @@ class MainFrame(wx.Frame):
         self.update_thread = None
         self.app_icon = None  #REFACTOR Get and set on __init__.py
 
-        self._download_list = DownloadList()
+        self._journal = QueueJournal(opt_manager.config_path)
+        self._download_list = DownloadList(self._journal.load(), self._journal)
+        self._history = DownloadHistory(opt_manager.config_path)
+        self._archive = None
+        self._api_server = None
+        self._statuslist_tooltip = ""
+
+        if opt_manager.options["enable_profiling"]:
+            self._enable_profiler()
 
         # Set up youtube-dl options parser
         self._options_parser = OptionsParser()
@@ -226,20 +254,29 @@ class MainFrame(wx.Frame):
         # label, event_handler
         settings_menu_data = (
             (self.OPTIONS_LABEL, self._on_options),
+            (self.IMPORT_LABEL, self._on_import),
             (self.UPDATE_LABEL, self._on_update),
             (self.VIEWLOG_LABEL, self._on_viewlog),
             (self.ABOUT_LABEL, self._on_about)
         )
 
+        if PROFILER.enabled:
+            settings_menu_data += ((self.PROFILER_LABEL, self._on_profiler),)
+
         statuslist_menu_data = (
             (_("Get URL"), self._on_geturl),
             (_("Get command"), self._on_getcmd),
             (_("Open destination"), self._on_open_dest),
-            (_("Re-enter"), self._on_reenter)
+            (_("Re-enter"), self._on_reenter),
+            (_("Move to top"), self._on_move_top),
+            (_("Move to bottom"), self._on_move_bottom),
+            (_("High priority"), lambda event: self._on_priority(DownloadItem.PRIORITIES.index("High"))),
+            (_("Normal priority"), lambda event: self._on_priority(DownloadItem.PRIORITIES.index("Normal"))),
+            (_("Low priority"), lambda event: self._on_priority(DownloadItem.PRIORITIES.index("Low")))
         )
 
-        # Create options frame
-        self._options_frame = OptionsFrame(self)
+        # The options frame is created on first use, see _get_options_frame()
+        self._options_frame = None
 
         # Create frame components
         self._panel = wx.Panel(self)
@@ -260,6 +297,7 @@ class MainFrame(wx.Frame):
         self._status_list = ListCtrl(self.STATUSLIST_COLUMNS,
                                      parent=self._panel,
                                      style=wx.LC_REPORT | wx.LC_HRULES | wx.LC_VRULES)
+        self._status_list.bind_items(self._download_list.get_items())
 
         # Dictionary to store all the buttons
         self._buttons = {}
@@ -293,6 +331,7 @@ class MainFrame(wx.Frame):
 
         # Bind extra events
         self.Bind(wx.EVT_LIST_ITEM_RIGHT_CLICK, self._on_statuslist_right_click, self._status_list)
+        self._status_list.Bind(wx.EVT_MOTION, self._on_statuslist_motion)
         self.Bind(wx.EVT_TEXT, self._update_savepath, self._path_combobox)
         self.Bind(wx.EVT_LIST_ITEM_SELECTED, self._update_pause_button, self._status_list)
         self.Bind(wx.EVT_LIST_ITEM_DESELECTED, self._update_pause_button, self._status_list)
@@ -311,6 +350,7 @@ class MainFrame(wx.Frame):
         self.SetMinSize(self.FRAMES_MIN_SIZE)
 
         self._status_bar_write(self.WELCOME_MSG)
+        self._start_api_server()
 
         self._update_videoformat_combobox()
         self._path_combobox.LoadMultiple(self.opt_manager.options["save_path_dirs"])
@@ -331,6 +371,37 @@ class MainFrame(wx.Frame):
 
         return menu
 
+    def _on_statuslist_motion(self, event):
+        """Show the priority & the phase durations of the item under the mouse as tooltip."""
+        row, flags = self._status_list.HitTest(event.GetPosition())
+
+        tooltip = ""
+
+        if row != -1:
+            download_item = self._download_list.get_item(self._status_list.GetItemData(row))
+            priority = self.PRIORITY_MSG.format(_(DownloadItem.PRIORITIES[download_item.priority]))
+
+            tooltip = "{0} | {1}".format(priority, self._format_durations(download_item.get_durations()))
+
+        # Setting the same tooltip again makes it flicker
+        if tooltip != self._statuslist_tooltip:
+            self._statuslist_tooltip = tooltip
+            self._status_list.SetToolTipString(tooltip)
+
+        event.Skip()
+
+    def _format_durations(self, durations):
+        """Format the given phase durations, see DownloadItem.get_durations()."""
+        values = []
+
+        for phase in DownloadItem.PHASES:
+            if phase[0] in durations:
+                values.append(format_duration(durations[phase[0]]))
+            else:
+                values.append("-")
+
+        return self.DURATIONS_MSG.format(*values)
+
     def _on_statuslist_right_click(self, event):
         selected = event.GetIndex()
 
@@ -442,6 +513,8 @@ class MainFrame(wx.Frame):
             # Dont overwrite the update messages
             self._status_bar_write(msg)
 
+        self._download_list.flush()
+
     def _update_pause_button(self, event):
         selected_rows = self._status_list.get_all_selected()
 
@@ -452,7 +525,7 @@ class MainFrame(wx.Frame):
             object_id = self._status_list.GetItemData(row)
             download_item = self._download_list.get_item(object_id)
 
-            if download_item.stage == "Paused":
+            if download_item.stage == "Paused" or download_item.suspended:
                 # If we find one or more items in Paused
                 # state set the button functionality to resume
                 label = _("Resume")
@@ -506,8 +579,11 @@ class MainFrame(wx.Frame):
             self.opt_manager.options["video_format"] = DEFAULT_FORMATS[_("default")]
             self.opt_manager.options["audio_format"] = ""
 
+        self.opt_manager.request_save()
+
     def _update_savepath(self, event):
         self.opt_manager.options["save_path"] = self._path_combobox.GetValue()
+        self.opt_manager.request_save()
 
     def _on_delete(self, event):
         index = self._status_list.get_next_selected()
@@ -616,16 +692,42 @@ class MainFrame(wx.Frame):
 
                 index = self._status_list.get_next_selected(index, True)
 
+    def _on_move_top(self, event):
+        selected = self._status_list.get_selected()
+
+        if selected != -1:
+            object_id = self._status_list.GetItemData(selected)
+
+            if self._download_list.move_to_top(object_id):
+                self._status_list.move_item_top(selected)
+                self._status_list._update_from_item(0, self._download_list.get_item(object_id))
+
+    def _on_move_bottom(self, event):
+        selected = self._status_list.get_selected()
+
+        if selected != -1:
+            object_id = self._status_list.GetItemData(selected)
+
+            if self._download_list.move_to_bottom(object_id):
+                new_index = self._status_list.GetItemCount() - 1
+
+                self._status_list.move_item_bottom(selected)
+                self._status_list._update_from_item(new_index, self._download_list.get_item(object_id))
+
+    def _on_priority(self, priority):
+        for selected_row in self._status_list.get_all_selected():
+            object_id = self._status_list.GetItemData(selected_row)
+
+            self._download_list.set_priority(object_id, priority)
+            self._status_list._update_from_item(selected_row, self._download_list.get_item(object_id))
+
     def _on_reload(self, event):
         selected_rows = self._status_list.get_all_selected()
 
         if not selected_rows:
             for index, item in enumerate(self._download_list.get_items()):
                 if item.stage in ("Paused", "Completed", "Error"):
-                    # Store the old savepath because reset is going to remove it
-                    savepath = item.path
-                    item.reset()
-                    item.path = savepath
+                    self._download_list.reset_item(item.object_id)
                     self._status_list._update_from_item(index, item)
         else:
             for selected_row in selected_rows:
@@ -633,10 +735,7 @@ class MainFrame(wx.Frame):
                 item = self._download_list.get_item(object_id)
 
                 if item.stage in ("Paused", "Completed", "Error"):
-                    # Store the old savepath because reset is going to remove it
-                    savepath = item.path
-                    item.reset()
-                    item.path = savepath
+                    self._download_list.reset_item(object_id)
                     self._status_list._update_from_item(selected_row, item)
 
             self._update_pause_button(None)
@@ -657,6 +756,8 @@ class MainFrame(wx.Frame):
 
                 if download_item.stage == "Queued" or download_item.stage == "Paused":
                     self._download_list.change_stage(object_id, new_state)
+                else:
+                    self._suspend_item(download_item, new_state == "Paused")
 
                 self._status_list._update_from_item(selected_row, download_item)
 
@@ -664,12 +765,7 @@ class MainFrame(wx.Frame):
 
     def _on_start(self, event):
         if self.download_manager is None:
-            if self.update_thread is not None and self.update_thread.is_alive():
-                self._create_popup(_("Update in progress. Please wait for the update to complete"),
-                                   self.WARNING_LABEL,
-                                   wx.OK | wx.ICON_EXCLAMATION)
-            else:
-                self._start_download()
+            self._start_download()
         else:
             self.download_manager.stop_downloads()
 
@@ -694,16 +790,171 @@ class MainFrame(wx.Frame):
                                wx.OK | wx.ICON_EXCLAMATION)
         else:
             self._url_list.Clear()
-            options = self._options_parser.parse(self.opt_manager.options)
+            self._add_urls(urls)
 
-            for url in urls:
-                download_item = DownloadItem(url, options)
-                download_item.path = self.opt_manager.options["save_path"]
+    def _add_urls(self, urls):
+        """Add the given urls to the download list using the current options.
 
-                if not self._download_list.has_item(download_item.object_id):
-                    self._status_list.bind_item(download_item)
-                    self._download_list.insert(download_item)
+        All the items are inserted in a single batch, duplicate urls
+        are ignored.
+
+        Returns:
+            List with the items that were added.
+
+        """
+        options = self._options_parser.parse(self.opt_manager.options)
+        options_key = to_string(options)
+        save_path = self.opt_manager.options["save_path"]
+
+        download_items = []
+
+        for url in urls:
+            download_item = DownloadItem(url, options, options_key)
+            download_item.path = save_path
+            download_items.append(download_item)
+
+        download_items = self._download_list.insert_many(download_items)
+
+        if self.opt_manager.options["skip_downloaded"]:
+            downloaded = self._history.lookup([download_item.url for download_item in download_items])
+        else:
+            downloaded = {}
+
+        archive = self._get_archive()
+
+        for download_item in download_items:
+            if download_item.url in downloaded:
+                self._download_list.update_stats(download_item.object_id, downloaded[download_item.url])
+            elif archive is not None and archive.has_url(download_item.url):
+                self._download_list.update_stats(download_item.object_id, ALREADY_DOWNLOADED_STATS)
+
+        self._status_list.bind_items(download_items)
+
+        return download_items
+
+    def api_add_urls(self, urls):
+        """Add the given urls for the apiserver.ApiServer."""
+        return self._add_urls(urls)
+
+    def api_pause(self, object_ids):
+        """Pause the queued & the active items with the given object_ids."""
+        return self._api_change_stage(object_ids, "Queued", "Paused")
+
+    def api_resume(self, object_ids):
+        """Resume the paused & the suspended items with the given object_ids."""
+        return self._api_change_stage(object_ids, "Paused", "Queued")
+
+    def api_remove(self, object_ids):
+        """Remove the items with the given object_ids that are not active."""
+        removed = []
+
+        for object_id in object_ids:
+            if self._download_list.has_item(object_id):
+                row = self._download_list.index(object_id)
+
+                if self._download_list.remove(object_id):
+                    self._status_list.remove_row(row)
+                    removed.append(object_id)
+
+        self._update_pause_button(None)
+
+        return removed
+
+    def api_start(self):
+        """Start the DownloadManager if it is not running."""
+        if self.download_manager is None and not self._status_list.is_empty():
+            self._start_download()
+
+    def api_stop(self):
+        """Stop the DownloadManager if it is running."""
+        if self.download_manager is not None:
+            self.download_manager.stop_downloads()
+
+    def _api_change_stage(self, object_ids, old_stage, new_stage):
+        changed = []
+
+        for object_id in object_ids:
+            if self._download_list.has_item(object_id):
+                download_item = self._download_list.get_item(object_id)
+
+                if download_item.stage == old_stage:
+                    self._download_list.change_stage(object_id, new_stage)
+                    self._status_list._update_from_item(self._download_list.index(object_id), download_item)
+                    changed.append(object_id)
+                elif self._suspend_item(download_item, new_stage == "Paused"):
+                    changed.append(object_id)
 
+        self._update_pause_button(None)
+
+        return changed
+
+    def _suspend_item(self, download_item, suspend):
+        """Suspend or continue the youtube-dl process of the given 'Active'
+        item. The worker sends the new status of the item.
+
+        Returns:
+            True if the process got suspended or continued else False.
+
+        """
+        if self.download_manager is None or download_item.stage != "Active":
+            return False
+
+        if suspend and not download_item.suspended:
+            return self.download_manager.pause_item(download_item.object_id)
+
+        if not suspend and download_item.suspended:
+            return self.download_manager.resume_item(download_item.object_id)
+
+        return False
+
+    def _start_api_server(self):
+        """Start the control API server if the 'api_port' option is set."""
+        port = self.opt_manager.options["api_port"]
+
+        if port:
+            # The HTTP server modules are not needed when the API is disabled
+            import socket
+            from .apiserver import ApiServer
+
+            try:
+                self._api_server = ApiServer(self, self._download_list, port, wx.CallAfter)
+            except socket.error as error:
+                self._status_bar_write(self.API_ERR_MSG.format(port, error))
+
+    def _on_import(self, event):
+        dlg = wx.FileDialog(self, _("Choose a file with URLs"),
+                            wildcard=_("Text files") + " (*.txt)|*.txt|" + _("All files") + " (*.*)|*.*",
+                            style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST)
+
+        if dlg.ShowModal() == wx.ID_OK:
+            try:
+                urls_file = io.open(dlg.GetPath(), "r", encoding="utf-8", errors="ignore")
+            except IOError as error:
+                self._create_popup(unicode(error), self.WARNING_LABEL, wx.OK | wx.ICON_EXCLAMATION)
+            else:
+                self._import_urls(urls_file)
+
+        dlg.Destroy()
+
+    def _import_urls(self, urls_file, imported=0):
+        """Import the urls of the given file object one chunk at a time.
+
+        Each chunk of IMPORT_CHUNK_SIZE lines is added on a separate
+        iteration of the wx event loop so the GUI stays responsive
+        while we stream huge files.
+
+        """
+        lines = list(islice(urls_file, self.IMPORT_CHUNK_SIZE))
+
+        if lines:
+            urls = [url for url in (line.strip() for line in lines) if url]
+            imported += len(self._add_urls(urls))
+
+            self._status_bar_write(self.IMPORTING_MSG.format(imported))
+            wx.CallAfter(self._import_urls, urls_file, imported)
+        else:
+            urls_file.close()
+            self._status_bar_write(self.IMPORTED_MSG.format(imported))
 
     def _on_settings(self, event):
         event_object_pos = event.EventObject.GetPosition()
@@ -717,10 +968,45 @@ class MainFrame(wx.Frame):
                                self.WARNING_LABEL,
                                wx.OK | wx.ICON_EXCLAMATION)
         else:
+            from .optionsframe import LogGUI
+
             log_window = LogGUI(self)
             log_window.load(self.log_manager.log_file)
             log_window.Show()
 
+    def _enable_profiler(self):
+        """Replace the event handlers & the timer with timed wrappers.
+
+        Must run before the handlers get bound. The wrappers are kept as
+        instance attributes since the Publisher holds weak references.
+
+        """
+        PROFILER.enabled = True
+
+        for name in ("_update_handler", "_download_worker_handler", "_download_manager_handler", "_on_timer"):
+            setattr(self, name, PROFILER.wrap("gui." + name.strip("_"), getattr(self, name)))
+
+    def _on_profiler(self, event):
+        if not PROFILER.profiling:
+            PROFILER.start_profile()
+            self._status_bar_write(self.PROFILING_MSG)
+            return
+
+        config_path = self.opt_manager.config_path
+        report_file = os.path.join(config_path, "profile.txt")
+
+        report = PROFILER.report() + "\n" + PROFILER.stop_profile(os.path.join(config_path, "profile.pstats"))
+
+        with io.open(report_file, "w", encoding="utf-8") as output:
+            output.write(report)
+
+        from .optionsframe import LogGUI
+
+        report_window = LogGUI(self)
+        report_window.SetTitle(self.PROFILER_LABEL)
+        report_window.load(report_file)
+        report_window.Show()
+
     def _on_about(self, event):
         info = wx.AboutDialogInfo()
 
@@ -845,16 +1131,13 @@ class MainFrame(wx.Frame):
 
     def _update_youtubedl(self):
         """Update youtube-dl binary to the latest version. """
-        if self.download_manager is not None and self.download_manager.is_alive():
-            self._create_popup(self.DOWNLOAD_ACTIVE,
-                               self.WARNING_LABEL,
-                               wx.OK | wx.ICON_EXCLAMATION)
-        elif self.update_thread is not None and self.update_thread.is_alive():
+        if self.update_thread is not None and self.update_thread.is_alive():
             self._create_popup(self.UPDATE_ACTIVE,
                                self.INFO_LABEL,
                                wx.OK | wx.ICON_INFORMATION)
         else:
-            self.update_thread = UpdateThread(self.opt_manager.options['youtubedl_path'])
+            self.update_thread = UpdateThread(self.opt_manager.options['youtubedl_path'],
+                                              config_path=self.opt_manager.config_path)
 
     def _status_bar_write(self, msg):
         """Display msg in the status bar. """
@@ -877,6 +1160,11 @@ class MainFrame(wx.Frame):
                                           dtime['minutes'],
                                           dtime['seconds'])
 
+        durations = sum_durations(self._download_list.get_items())
+
+        if durations:
+            msg += " | " + self._format_durations(durations)
+
         self._status_bar_write(msg)
 
     def _after_download(self):
@@ -915,12 +1203,37 @@ class MainFrame(wx.Frame):
         """
         signal, data = msg.data
 
-        download_item = self._download_list.get_item(data["index"])
-        download_item.update_stats(data)
+        # The queued items can be removed before their prefetched info arrives
+        if not self._download_list.has_item(data["index"]):
+            return
+
+        if signal == "playlist":
+            self._status_list.bind_items(self._download_list.expand_item(data["index"], data["entries"]))
+            download_item = self._download_list.get_item(data["index"])
+        elif signal == "info":
+            download_item = self._download_list.set_info(data["index"], data)
+        else:
+            download_item = self._download_list.update_stats(data["index"], data)
+
         row = self._download_list.index(data["index"])
 
         self._status_list._update_from_item(row, download_item)
 
+        if data.get("status") in DownloadItem.COMPLETED_STAGES:
+            record_download(download_item, self._history, self._get_archive())
+
+    def _get_archive(self):
+        """Returns the DownloadArchive of the 'download_archive' option or None."""
+        archive_file = self.opt_manager.options["download_archive"]
+
+        if not archive_file:
+            return None
+
+        if self._archive is None or self._archive.archive_file != os_path_expanduser(archive_file):
+            self._archive = DownloadArchive(archive_file)
+
+        return self._archive
+
     def _download_manager_handler(self, msg):
         """downloadmanager.DownloadManager thread handler.
 
@@ -967,8 +1280,12 @@ class MainFrame(wx.Frame):
             self._status_bar_write(self.UPDATE_ERR_MSG.format(data[1]))
         elif data[0] == 'correct':
             self._status_bar_write(self.UPDATE_SUCC_MSG)
+        elif data[0] == 'latest':
+            self._status_bar_write(self.UPDATE_LATEST_MSG)
         else:
-            self._reset_widgets()
+            if self.download_manager is None:
+                self._reset_widgets()
+
             self.update_thread = None
 
     def _get_urls(self):
@@ -982,7 +1299,8 @@ class MainFrame(wx.Frame):
                                wx.OK | wx.ICON_EXCLAMATION)
         else:
             self._app_timer.Start(100)
-            self.download_manager = DownloadManager(self, self._download_list, self.opt_manager, self.log_manager)
+            self.download_manager = DownloadManager(self, self._download_list, self.opt_manager,
+                                                    self.log_manager, self._history, self._get_archive())
 
             self._status_bar_write(self.DOWNLOAD_STARTED)
             self._buttons["start"].SetLabel(self.STOP_LABEL)
@@ -1050,8 +1368,23 @@ class MainFrame(wx.Frame):
         the options window.
 
         """
-        self._options_frame.load_all_options()
-        self._options_frame.Show()
+        options_frame = self._get_options_frame()
+        options_frame.load_all_options()
+        options_frame.Show()
+
+    def _get_options_frame(self):
+        """Returns the options frame creating it on the first call.
+
+        The options frame holds most of the app widgets, building it only
+        when the user asks for it keeps it out of the startup.
+
+        """
+        if self._options_frame is None:
+            from .optionsframe import OptionsFrame
+
+            self._options_frame = OptionsFrame(self)
+
+        return self._options_frame
 
     def _on_close(self, event):
         """Event handler for the wx.EVT_CLOSE event.
@@ -1073,6 +1406,9 @@ class MainFrame(wx.Frame):
             self.close()
 
     def close(self):
+        if self._api_server is not None:
+            self._api_server.close()
+
         if self.download_manager is not None:
             self.download_manager.stop_downloads()
             self.download_manager.join()
@@ -1082,13 +1418,18 @@ class MainFrame(wx.Frame):
 
         # Store main-options frame size
         self.opt_manager.options['main_win_size'] = self.GetSize()
-        self.opt_manager.options['opts_win_size'] = self._options_frame.GetSize()
+
+        if self._options_frame is not None:
+            self.opt_manager.options['opts_win_size'] = self._options_frame.GetSize()
+            self._options_frame.save_all_options()
 
         self.opt_manager.options["save_path_dirs"] = self._path_combobox.GetStrings()
 
-        self._options_frame.save_all_options()
         self.opt_manager.save_to_file()
 
+        self._journal.close()
+        self._history.close()
+
         self.Destroy()
 
 
@@ -1119,6 +1460,12 @@ class ListCtrl(wx.ListCtrl, ListCtrlAutoWidthMixin):
     def move_item_down(self, row_number):
         self._move_item(row_number, row_number + 1)
 
+    def move_item_top(self, row_number):
+        self._move_item(row_number, 0)
+
+    def move_item_bottom(self, row_number):
+        self._move_item(row_number, self._list_index - 1)
+
     def _move_item(self, cur_row, new_row):
         self.Freeze()
         item = self.GetItem(cur_row)
@@ -1148,6 +1495,15 @@ class ListCtrl(wx.ListCtrl, ListCtrlAutoWidthMixin):
 
         self._list_index += 1
 
+    def bind_items(self, download_items):
+        """Bind multiple items, the widget is refreshed only once."""
+        self.Freeze()
+
+        for download_item in download_items:
+            self.bind_item(download_item)
+
+        self.Thaw()
+
     def _update_from_item(self, row, download_item):
         progress_stats = download_item.progress_stats
 
@@ -0,0 +1,181 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+
+"""Youtubedlg module that keeps the runtime metrics.
+
+The DownloadManager, the Worker threads and the downloaders update the
+counters & gauges of the METRICS registry while they run. The registry
+renders them in the Prometheus text format, the apiserver module serves
+them on the '/metrics' path so long unattended runs can be graphed.
+
+Attributes:
+    METRICS (MetricsRegistry): The metrics of the application.
+
+"""
+
+from __future__ import unicode_literals
+
+from threading import Lock
+from collections import OrderedDict
+
+from .utils import to_bytes
+
+
+class MetricsRegistry(object):
+
+    """Thread safe collection of counters, gauges & summaries.
+
+    Each metric is identified by its name and a set of labels given as
+    keyword arguments. A summary keeps the sum & the count of the
+    observed values (see observe()).
+
+    """
+
+    TYPES = ("counter", "gauge", "summary")
+
+    def __init__(self):
+        self._lock = Lock()
+        self._metrics = OrderedDict()  # name -> (type, help)
+        self._values = {}  # name -> {labels: value}
+
+    def register(self, name, metric_type, help_text):
+        """Register a new metric with the given type & help text."""
+        assert metric_type in self.TYPES
+
+        with self._lock:
+            self._metrics[name] = (metric_type, help_text)
+            self._values.setdefault(name, {})
+
+    def inc(self, name, amount=1, **labels):
+        """Add the given amount to a counter or a gauge."""
+        key = self._key(labels)
+
+        with self._lock:
+            values = self._values[name]
+            values[key] = values.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        """Set the value of a gauge."""
+        with self._lock:
+            self._values[name][self._key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        """Add the given value to a summary."""
+        key = self._key(labels)
+
+        with self._lock:
+            values = self._values[name]
+            total, count = values.get(key, (0, 0))
+            values[key] = (total + value, count + 1)
+
+    def get(self, name, **labels):
+        """Returns the value of the given metric, zero if it is not set."""
+        with self._lock:
+            return self._values[name].get(self._key(labels), 0)
+
+    def clear(self):
+        """Reset all the values."""
+        with self._lock:
+            for values in self._values.values():
+                values.clear()
+
+    def render(self):
+        """Returns the metrics in the Prometheus text exposition format."""
+        lines = []
+
+        with self._lock:
+            for name, (metric_type, help_text) in self._metrics.items():
+                lines.append("# HELP {0} {1}".format(name, help_text))
+                lines.append("# TYPE {0} {1}".format(name, metric_type))
+
+                for key, value in sorted(self._values[name].items()):
+                    labels = self._format_labels(key)
+
+                    if metric_type == "summary":
+                        lines.append("{0}_sum{1} {2}".format(name, labels, self._format_value(value[0])))
+                        lines.append("{0}_count{1} {2}".format(name, labels, value[1]))
+                    else:
+                        lines.append("{0}{1} {2}".format(name, labels, self._format_value(value)))
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+    @staticmethod
+    def _format_labels(key):
+        if not key:
+            return ""
+
+        labels = []
+
+        for label, value in key:
+            value = unicode(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+            labels.append("{0}=\"{1}\"".format(label, value))
+
+        return "{" + ",".join(labels) + "}"
+
+    @staticmethod
+    def _format_value(value):
+        if isinstance(value, float):
+            return repr(value)
+
+        return unicode(value)
+
+
+METRICS = MetricsRegistry()
+
+METRICS.register("youtubedlg_items", "gauge",
+                 "Number of the download items by stage.")
+METRICS.register("youtubedlg_download_speed_bytes", "gauge",
+                 "Aggregate download speed of the active items in bytes per second.")
+METRICS.register("youtubedlg_downloaded_bytes_total", "counter",
+                 "Size of the files that youtube-dl downloaded in bytes.")
+METRICS.register("youtubedlg_downloads_total", "counter",
+                 "Number of the finished youtube-dl processes by status.")
+METRICS.register("youtubedlg_retries_total", "counter",
+                 "Number of the failed downloads that got queued again.")
+METRICS.register("youtubedlg_segmented_downloads_total", "counter",
+                 "Number of the multi-connection downloads by outcome (ok, fallback).")
+METRICS.register("youtubedlg_worker_busy_seconds_total", "counter",
+                 "Time in seconds each worker spent running youtube-dl.")
+METRICS.register("youtubedlg_process_start_seconds", "summary",
+                 "Time in seconds from spawning youtube-dl until its first output line.")
+METRICS.register("youtubedlg_parsed_lines_total", "counter",
+                 "Number of the youtube-dl output lines parsed.")
+METRICS.register("youtubedlg_event_queue_depth", "gauge",
+                 "Number of the events sent to the GUI thread and not handled yet.")
+
+
+def update_queue_metrics(download_list):
+    """Update the gauges that describe the given downloadmanager.DownloadList.
+
+    The gauges are computed from the items, the caller should update
+    them right before rendering the metrics.
+
+    """
+    from .downloadmanager import DownloadItem
+
+    counts = dict.fromkeys(DownloadItem.STAGES, 0)
+    speed = 0.0
+
+    for item in download_list.get_items():
+        counts[item.stage] += 1
+
+        if item.stage == "Active":
+            speed += parse_speed(item.progress_stats["speed"])
+
+    for stage, count in counts.items():
+        METRICS.set("youtubedlg_items", count, stage=stage)
+
+    METRICS.set("youtubedlg_download_speed_bytes", speed)
+
+
+def parse_speed(speed):
+    """Returns the given youtube-dl speed string (e.g. '1.20MiB/s') in bytes,
+    zero when the speed is unknown."""
+    try:
+        return to_bytes(speed)
+    except ValueError:
+        return 0.0
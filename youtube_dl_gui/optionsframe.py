@@ -110,6 +110,7 @@ class OptionsFrame(wx.Frame):
     def _on_close(self, event):
         """Event handler for wx.EVT_CLOSE event."""
         self.save_all_options()
+        self.opt_manager.request_save()
         #REFACTOR Parent create specific callback
         self.GetParent()._update_videoformat_combobox()
         self.Hide()
@@ -322,6 +323,7 @@ class GeneralTab(TabPanel):
         self.confirm_exit_checkbox = self.crt_checkbox(_("Confirm on exit"))
         self.confirm_deletion_checkbox = self.crt_checkbox(_("Confirm item deletion"))
         self.show_completion_popup_checkbox = self.crt_checkbox(_("Inform me on download completion"))
+        self.skip_downloaded_checkbox = self.crt_checkbox(_("Skip URLs found in the download history"))
 
         self.shutdown_checkbox = self.crt_checkbox(_("Shutdown on download completion"), event_handler=self._on_shutdown)
         self.sudo_textctrl = self.crt_textctrl(wx.TE_PASSWORD)
@@ -360,6 +362,7 @@ class GeneralTab(TabPanel):
         vertical_sizer.Add(self.confirm_exit_checkbox, flag=wx.ALL, border=5)
         vertical_sizer.Add(self.confirm_deletion_checkbox, flag=wx.LEFT | wx.RIGHT | wx.BOTTOM, border=5)
         vertical_sizer.Add(self.show_completion_popup_checkbox, flag=wx.LEFT | wx.RIGHT | wx.BOTTOM, border=5)
+        vertical_sizer.Add(self.skip_downloaded_checkbox, flag=wx.LEFT | wx.RIGHT | wx.BOTTOM, border=5)
 
         shutdown_sizer = wx.BoxSizer(wx.HORIZONTAL)
         shutdown_sizer.Add(self.shutdown_checkbox)
@@ -438,6 +441,7 @@ class GeneralTab(TabPanel):
         self.confirm_exit_checkbox.SetValue(self.opt_manager.options["confirm_exit"])
         self.show_completion_popup_checkbox.SetValue(self.opt_manager.options["show_completion_popup"])
         self.confirm_deletion_checkbox.SetValue(self.opt_manager.options["confirm_deletion"])
+        self.skip_downloaded_checkbox.SetValue(self.opt_manager.options["skip_downloaded"])
 
         #REFACTOR Automatically call on the new methods
         #save_options
@@ -456,6 +460,7 @@ class GeneralTab(TabPanel):
         self.opt_manager.options["confirm_exit"] = self.confirm_exit_checkbox.GetValue()
         self.opt_manager.options["show_completion_popup"] = self.show_completion_popup_checkbox.GetValue()
         self.opt_manager.options["confirm_deletion"] = self.confirm_deletion_checkbox.GetValue()
+        self.opt_manager.options["skip_downloaded"] = self.skip_downloaded_checkbox.GetValue()
 
 
 class FormatsTab(TabPanel):
@@ -852,6 +857,13 @@ class AdvancedTab(TabPanel):
 
 class ExtraTab(TabPanel):
 
+    SCHEDULING_POLICIES = twodict([
+        ("queue", _("Queue order")),
+        ("smallest", _("Smallest first")),
+        ("largest", _("Largest first")),
+        ("host", _("Round-robin by site"))
+    ])
+
     def __init__(self, *args, **kwargs):
         super(ExtraTab, self).__init__(*args, **kwargs)
 
@@ -865,6 +877,28 @@ class ExtraTab(TabPanel):
         self.ignore_config_checkbox = self.crt_checkbox(_("Ignore youtube-dl config"))
         self.no_mtime_checkbox = self.crt_checkbox(_("No mtime"))
         self.native_hls_checkbox = self.crt_checkbox(_("Prefer native HLS"))
+        self.expand_playlists_checkbox = self.crt_checkbox(_("Expand playlists"))
+        self.pause_frees_worker_checkbox = self.crt_checkbox(_("Paused downloads free their worker"))
+        self.preempt_downloads_checkbox = self.crt_checkbox(_("Preempt the lower priority downloads"))
+        self.profiling_checkbox = self.crt_checkbox(_("Profiler (debug, needs restart)"))
+
+        self.download_archive_label = self.crt_statictext(_("Download archive file"))
+        self.download_archive_textctrl = self.crt_textctrl()
+
+        self.prefetch_workers_label = self.crt_statictext(_("Metadata prefetch workers (0 to disable)"))
+        self.prefetch_workers_spinctrl = self.crt_spinctrl((0, 32))
+
+        self.scheduling_policy_label = self.crt_statictext(_("Download order"))
+        self.scheduling_policy_combobox = self.crt_combobox(list(self.SCHEDULING_POLICIES.values()))
+
+        self.retry_attempts_label = self.crt_statictext(_("Retries of the failed downloads (0 to disable)"))
+        self.retry_attempts_spinctrl = self.crt_spinctrl((0, 10))
+
+        self.download_connections_label = self.crt_statictext(_("Connections per download (1 to disable)"))
+        self.download_connections_spinctrl = self.crt_spinctrl((1, 16))
+
+        self.api_port_label = self.crt_statictext(_("Control API port (0 to disable, needs restart)"))
+        self.api_port_spinctrl = self.crt_spinctrl((0, 65535))
 
         self._set_layout()
 
@@ -887,9 +921,55 @@ class ExtraTab(TabPanel):
         extra_opts_sizer.Add(self.no_mtime_checkbox)
         extra_opts_sizer.AddSpacer((5, -1))
         extra_opts_sizer.Add(self.native_hls_checkbox)
+        extra_opts_sizer.AddSpacer((5, -1))
+        extra_opts_sizer.Add(self.expand_playlists_checkbox)
+        extra_opts_sizer.AddSpacer((5, -1))
+        extra_opts_sizer.Add(self.pause_frees_worker_checkbox)
+        extra_opts_sizer.AddSpacer((5, -1))
+        extra_opts_sizer.Add(self.preempt_downloads_checkbox)
+        extra_opts_sizer.AddSpacer((5, -1))
+        extra_opts_sizer.Add(self.profiling_checkbox)
 
         vertical_sizer.Add(extra_opts_sizer, flag=wx.ALL, border=5)
 
+        vertical_sizer.Add(self.download_archive_label, flag=wx.TOP, border=5)
+        vertical_sizer.Add(self.download_archive_textctrl, flag=wx.EXPAND | wx.ALL, border=5)
+
+        prefetch_workers_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        prefetch_workers_sizer.Add(self.prefetch_workers_label, flag=wx.ALIGN_CENTER_VERTICAL)
+        prefetch_workers_sizer.AddSpacer((5, -1))
+        prefetch_workers_sizer.Add(self.prefetch_workers_spinctrl)
+
+        vertical_sizer.Add(prefetch_workers_sizer, flag=wx.ALL, border=5)
+
+        scheduling_policy_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        scheduling_policy_sizer.Add(self.scheduling_policy_label, flag=wx.ALIGN_CENTER_VERTICAL)
+        scheduling_policy_sizer.AddSpacer((5, -1))
+        scheduling_policy_sizer.Add(self.scheduling_policy_combobox)
+
+        vertical_sizer.Add(scheduling_policy_sizer, flag=wx.ALL, border=5)
+
+        retry_attempts_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        retry_attempts_sizer.Add(self.retry_attempts_label, flag=wx.ALIGN_CENTER_VERTICAL)
+        retry_attempts_sizer.AddSpacer((5, -1))
+        retry_attempts_sizer.Add(self.retry_attempts_spinctrl)
+
+        vertical_sizer.Add(retry_attempts_sizer, flag=wx.ALL, border=5)
+
+        download_connections_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        download_connections_sizer.Add(self.download_connections_label, flag=wx.ALIGN_CENTER_VERTICAL)
+        download_connections_sizer.AddSpacer((5, -1))
+        download_connections_sizer.Add(self.download_connections_spinctrl)
+
+        vertical_sizer.Add(download_connections_sizer, flag=wx.ALL, border=5)
+
+        api_port_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        api_port_sizer.Add(self.api_port_label, flag=wx.ALIGN_CENTER_VERTICAL)
+        api_port_sizer.AddSpacer((5, -1))
+        api_port_sizer.Add(self.api_port_spinctrl)
+
+        vertical_sizer.Add(api_port_sizer, flag=wx.ALL, border=5)
+
         main_sizer.Add(vertical_sizer, 1, wx.EXPAND | wx.ALL, border=5)
         self.SetSizer(main_sizer)
 
@@ -900,6 +980,16 @@ class ExtraTab(TabPanel):
         self.ignore_config_checkbox.SetValue(self.opt_manager.options["ignore_config"])
         self.native_hls_checkbox.SetValue(self.opt_manager.options["native_hls"])
         self.no_mtime_checkbox.SetValue(self.opt_manager.options["nomtime"])
+        self.expand_playlists_checkbox.SetValue(self.opt_manager.options["expand_playlists"])
+        self.pause_frees_worker_checkbox.SetValue(self.opt_manager.options["pause_frees_worker"])
+        self.preempt_downloads_checkbox.SetValue(self.opt_manager.options["preempt_downloads"])
+        self.profiling_checkbox.SetValue(self.opt_manager.options["enable_profiling"])
+        self.download_archive_textctrl.SetValue(self.opt_manager.options["download_archive"])
+        self.prefetch_workers_spinctrl.SetValue(self.opt_manager.options["prefetch_workers"])
+        self.scheduling_policy_combobox.SetValue(self.SCHEDULING_POLICIES[self.opt_manager.options["scheduling_policy"]])
+        self.retry_attempts_spinctrl.SetValue(self.opt_manager.options["retry_attempts"])
+        self.download_connections_spinctrl.SetValue(self.opt_manager.options["download_connections"])
+        self.api_port_spinctrl.SetValue(self.opt_manager.options["api_port"])
 
     def save_options(self):
         self.opt_manager.options["cmd_args"] = self.cmdline_args_textctrl.GetValue()
@@ -908,6 +998,16 @@ class ExtraTab(TabPanel):
         self.opt_manager.options["ignore_config"] = self.ignore_config_checkbox.GetValue()
         self.opt_manager.options["native_hls"] = self.native_hls_checkbox.GetValue()
         self.opt_manager.options["nomtime"] = self.no_mtime_checkbox.GetValue()
+        self.opt_manager.options["expand_playlists"] = self.expand_playlists_checkbox.GetValue()
+        self.opt_manager.options["pause_frees_worker"] = self.pause_frees_worker_checkbox.GetValue()
+        self.opt_manager.options["preempt_downloads"] = self.preempt_downloads_checkbox.GetValue()
+        self.opt_manager.options["enable_profiling"] = self.profiling_checkbox.GetValue()
+        self.opt_manager.options["download_archive"] = self.download_archive_textctrl.GetValue()
+        self.opt_manager.options["prefetch_workers"] = self.prefetch_workers_spinctrl.GetValue()
+        self.opt_manager.options["scheduling_policy"] = self.SCHEDULING_POLICIES[self.scheduling_policy_combobox.GetValue()]
+        self.opt_manager.options["retry_attempts"] = self.retry_attempts_spinctrl.GetValue()
+        self.opt_manager.options["download_connections"] = self.download_connections_spinctrl.GetValue()
+        self.opt_manager.options["api_port"] = self.api_port_spinctrl.GetValue()
 
 
 class LogGUI(wx.Frame):
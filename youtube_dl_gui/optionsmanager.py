@@ -7,6 +7,7 @@ from __future__ import unicode_literals
 
 import os
 import json
+from threading import Lock, Timer
 
 from .utils import (
     os_path_expanduser,
@@ -14,6 +15,7 @@ from .utils import (
     encode_tuple,
     decode_tuple,
     check_path,
+    remove_file,
     get_default_lang
 )
 
@@ -22,6 +24,8 @@ from .formats import (
     FORMATS
 )
 
+from .scheduler import SCHEDULING_POLICIES
+
 
 class OptionsManager(object):
 
@@ -33,6 +37,8 @@ class OptionsManager(object):
         SETTINGS_FILENAME (string): Filename of the settings file.
         SENSITIVE_KEYS (tuple): Contains the keys that we don't want
             to store on the settings file. (SECURITY ISSUES).
+        SAVE_DELAY (float): Time in seconds that request_save() waits for
+            more option changes before saving the settings file.
 
     Args:
         config_path (string): Absolute path where OptionsManager
@@ -51,11 +57,18 @@ class OptionsManager(object):
 
     SETTINGS_FILENAME = 'settings.json'
     SENSITIVE_KEYS = ('sudo_password', 'password', 'video_password')
+    SAVE_DELAY = 2.0
 
     def __init__(self, config_path):
         self.config_path = config_path
         self.settings_file = os.path.join(config_path, self.SETTINGS_FILENAME)
         self.options = dict()
+
+        # Content of the settings file as we last read or wrote it
+        self._saved_data = None
+        self._save_lock = Lock()
+        self._save_timer = None
+
         self.load_default()
         self.load_from_file()
 
@@ -234,6 +247,55 @@ class OptionsManager(object):
 
             disable_update (boolean): When True the update process will be disabled.
 
+            skip_downloaded (boolean): When True the urls found in the download
+                history are marked as 'Already Downloaded' without running youtube-dl.
+
+            download_archive (string): Path to the youtube-dl download archive
+                file. Empty string to disable the archive.
+
+            api_port (int): Port of the localhost HTTP/JSON control API
+                (see the apiserver module). Zero disables the API.
+
+            enable_profiling (boolean): When True the GUI handlers & the workers
+                get timed and the settings menu gets the profiler item
+                (see the profiler module).
+
+            expand_playlists (boolean): When True the playlists get flat
+                extracted before the download and their entries are queued
+                as separate items, so all the workers download them in
+                parallel. Costs one extra youtube-dl run per added url.
+
+            prefetch_workers (int): Number of the youtube-dl processes that
+                fetch the metadata of the next queued items while the download
+                workers are busy. The download then skips the extraction.
+                Zero disables the prefetch.
+
+            scheduling_policy (string): Order to dispatch the queued items
+                (see the scheduler module). Available values are 'queue',
+                'smallest', 'largest' & 'host'. The size based policies need
+                the metadata of the prefetch workers.
+
+            retry_attempts (int): Number of the times a download that failed
+                with a network or server error is queued again, with an
+                exponential backoff (see downloadmanager.RetryPolicy). Zero
+                disables the retries.
+
+            pause_frees_worker (boolean): When True a paused active download
+                gives its worker slot to the next queued item, so the other
+                downloads get its bandwidth. Its youtube-dl process stays
+                suspended until it is resumed.
+
+            preempt_downloads (boolean): When True and all the workers are
+                busy, a queued item suspends the running download with the
+                lowest priority below its own. The suspended download
+                continues once a worker slot is free again.
+
+            download_connections (int): Number of the HTTP connections that
+                download the byte ranges of a single file in parallel. Only
+                the formats that are a single file of known size served over
+                HTTP are downloaded that way, youtube-dl post processes them.
+                It needs the info JSON of the prefetch workers. 1 disables it.
+
         """
         #REFACTOR Remove old options & check options validation
         self.options = {
@@ -300,7 +362,18 @@ class OptionsManager(object):
             'nomtime': False,
             'embed_thumbnail': False,
             'add_metadata': False,
-            'disable_update': False
+            'disable_update': False,
+            'skip_downloaded': True,
+            'download_archive': '',
+            'api_port': 0,
+            'enable_profiling': False,
+            'expand_playlists': False,
+            'prefetch_workers': 0,
+            'scheduling_policy': 'queue',
+            'retry_attempts': 3,
+            'pause_frees_worker': False,
+            'preempt_downloads': False,
+            'download_connections': 1
         }
 
         # Set the youtubedl_path again if the disable_update option is set
@@ -320,19 +393,90 @@ class OptionsManager(object):
 
                 if self._settings_are_valid(options):
                     self.options = options
+                    self._saved_data = self._serialize()
             except:
                 self.load_default()
 
-    def save_to_file(self):
-        """Save options to settings file. """
-        check_path(self.config_path)
+    def is_dirty(self):
+        """Returns True if the options differ from the settings file. """
+        return self._serialize() != self._saved_data
+
+    def save_to_file(self, options=None):
+        """Save options to settings file.
+
+        The settings file is only written when the options have changed.
+        The options are written to a temporary file which then gets renamed
+        over the settings file, so a crash during the save never leaves a
+        truncated settings file behind.
+
+        Args:
+            options (dict): Copy of the options to save. Default is None
+                which saves the current options.
+
+        Returns:
+            True if the settings file was written else False.
+
+        """
+        with self._save_lock:
+            # A delayed save must not cancel the save of a later change
+            if options is None and self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+
+            data = self._serialize(options)
 
-        with open(self.settings_file, 'wb') as settings_file:
-            options = self._get_options()
-            json.dump(options,
-                      settings_file,
-                      indent=4,
-                      separators=(',', ': '))
+            if data == self._saved_data:
+                return False
+
+            check_path(self.config_path)
+
+            temp_file = self.settings_file + '.tmp'
+
+            try:
+                with open(temp_file, 'wb') as settings_file:
+                    settings_file.write(data)
+                    settings_file.flush()
+                    os.fsync(settings_file.fileno())
+
+                if os.name == 'nt' and os_path_exists(self.settings_file):
+                    os.remove(self.settings_file)
+
+                os.rename(temp_file, self.settings_file)
+            except (IOError, OSError):
+                remove_file(temp_file)
+                raise
+
+            self._saved_data = data
+
+            return True
+
+    def request_save(self):
+        """Save the options to the settings file after SAVE_DELAY seconds.
+
+        Each call restarts the delay, so a burst of option changes
+        results in a single save. The timer thread saves a copy of the
+        options taken on the calling thread, which may keep changing them.
+
+        """
+        options = dict(self.options)
+
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+
+            self._save_timer = Timer(self.SAVE_DELAY, self._delayed_save, (options,))
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _delayed_save(self, options):
+        try:
+            self.save_to_file(options)
+        except (IOError, OSError):
+            pass  # We will retry on the next save
+
+    def _serialize(self, options=None):
+        """Returns the settings file content of the given or the current options. """
+        return json.dumps(self._get_options(options), indent=4, separators=(',', ': '), sort_keys=True).encode('utf-8')
 
     def _settings_are_valid(self, settings_dictionary):
         """Check settings.json dictionary.
@@ -380,7 +524,8 @@ class OptionsManager(object):
             'output_format': OUTPUT_FORMATS.keys(),
             'min_filesize_unit': VALID_FILESIZE_UNIT,
             'max_filesize_unit': VALID_FILESIZE_UNIT,
-            'subs_lang': VALID_SUB_LANGUAGE
+            'subs_lang': VALID_SUB_LANGUAGE,
+            'scheduling_policy': SCHEDULING_POLICIES.keys()
         }
 
         for key, valid_list in rules_dict.items():
@@ -391,6 +536,15 @@ class OptionsManager(object):
         if settings_dictionary['workers_number'] < 1:
             return False
 
+        if settings_dictionary['prefetch_workers'] < 0:
+            return False
+
+        if settings_dictionary['retry_attempts'] < 0:
+            return False
+
+        if settings_dictionary['download_connections'] < 1:
+            return False
+
         # Check main-options frame size
         for size in settings_dictionary['main_win_size']:
             if size < MIN_FRAME_SIZE:
@@ -402,9 +556,9 @@ class OptionsManager(object):
 
         return True
 
-    def _get_options(self):
+    def _get_options(self, options=None):
         """Return options dictionary without SENSITIVE_KEYS. """
-        temp_options = self.options.copy()
+        temp_options = (self.options if options is None else options).copy()
 
         for key in self.SENSITIVE_KEYS:
             temp_options[key] = ''
@@ -69,8 +69,25 @@ class OptionsParser(object):
     This class is responsible for turning some of the youtube-dlg options
     to youtube-dl command line options.
 
+    Attributes:
+        EXTRA_OPTIONS (tuple): Names of the options that the parse() method
+            reads besides the ones in the self._ydl_options list.
+
+        CACHE_SIZE (int): Maximum number of parsed options tuples to keep.
+
     """
 
+    EXTRA_OPTIONS = (
+        'output_format',
+        'output_template',
+        'second_video_format',
+        'min_filesize_unit',
+        'max_filesize_unit',
+        'cmd_args'
+    )
+
+    CACHE_SIZE = 32
+
     def __init__(self):
         self._ydl_options = [
             OptionHolder('playlist_start', '--playlist-start', 1),
@@ -106,21 +123,48 @@ class OptionsParser(object):
             OptionHolder('native_hls', '--hls-prefer-native', False),
             OptionHolder('nomtime', '--no-mtime', False),
             OptionHolder('embed_thumbnail', '--embed-thumbnail', False),
-            OptionHolder('add_metadata', '--add-metadata', False)
+            OptionHolder('add_metadata', '--add-metadata', False),
+            OptionHolder('download_archive', '--download-archive', '')
         ]
 
+        self._options_names = tuple(sorted(set(
+            [option.name for option in self._ydl_options] + list(self.EXTRA_OPTIONS)
+        )))
+
+        self._cache = {}
+
     def parse(self, options_dictionary):
         """Parse optionsmanager.OptionsManager options.
 
         Parses the given options to youtube-dl command line arguments.
+        The results are memoized by the values of the options that take
+        part in the parsing, so the same tuple is returned (and can be
+        shared between all the download items) as long as those options
+        do not change.
 
         Args:
             options_dictionary (dict): Dictionary with all the options.
 
         Returns:
-            List of strings with all the youtube-dl command line options.
+            Tuple of strings with all the youtube-dl command line options.
 
         """
+        fingerprint = tuple(options_dictionary.get(name) for name in self._options_names)
+
+        try:
+            return self._cache[fingerprint]
+        except KeyError:
+            pass
+
+        if len(self._cache) >= self.CACHE_SIZE:
+            self._cache.clear()
+
+        options = self._cache[fingerprint] = tuple(self._parse(options_dictionary))
+
+        return options
+
+    def _parse(self, options_dictionary):
+        """Returns the youtube-dl command line options list. See parse(). """
         # REFACTOR
         options_list = ['--newline']
 
@@ -0,0 +1,178 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+
+"""Youtubedlg module with the debug profiling hooks.
+
+When the 'enable_profiling' option is set the GUI wraps its event
+handlers & timer with the PROFILER and the workers time every line of
+the youtube-dl output they handle. Each timed spot gets a histogram of
+its durations. On top of that a cProfile run of the GUI thread can be
+started & stopped on demand from the settings menu.
+
+Attributes:
+    PROFILER (Profiler): The profiler of the application.
+
+"""
+
+from __future__ import unicode_literals
+
+import time
+from threading import Lock
+from collections import OrderedDict
+
+
+class Histogram(object):
+
+    """Histogram of durations with fixed buckets.
+
+    Args:
+        buckets (tuple): Upper bounds of the buckets in seconds, in
+            ascending order. Larger values go to an extra overflow bucket.
+
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        index = 0
+
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        """Returns the upper bound of the bucket that holds the given
+        percentile, None when it is the overflow bucket."""
+        rank = self.count * percent / 100.0
+        seen = 0
+
+        for index, count in enumerate(self.counts):
+            seen += count
+
+            if count and seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else None
+
+        return None
+
+
+class Profiler(object):
+
+    """Collects the timing histograms and runs cProfile on demand.
+
+    All the methods are thread safe except start_profile() &
+    stop_profile() which must be called from the profiled thread.
+
+    Attributes:
+        BUCKETS (tuple): Upper bounds of the histogram buckets in seconds.
+        REPORT_LIMIT (int): Number of the functions in the cProfile report.
+
+    """
+
+    BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+    REPORT_LIMIT = 40
+
+    def __init__(self):
+        self.enabled = False
+
+        self._lock = Lock()
+        self._histograms = OrderedDict()
+        self._profile = None
+
+    @property
+    def profiling(self):
+        """True if a cProfile run is active."""
+        return self._profile is not None
+
+    def record(self, name, seconds):
+        """Add the given duration to the histogram with the given name."""
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(self.BUCKETS)
+
+            self._histograms[name].add(seconds)
+
+    def wrap(self, name, func):
+        """Returns a wrapper of the given function that records its duration."""
+        def _wrapper(*args, **kwargs):
+            start_time = time.time()
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, time.time() - start_time)
+
+        return _wrapper
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def start_profile(self):
+        """Start a cProfile run of the calling thread."""
+        import cProfile
+
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop_profile(self, stats_file=None):
+        """Stop the cProfile run of the calling thread.
+
+        Args:
+            stats_file (string): File to dump the raw pstats data, for use
+                with external viewers. None to skip the dump.
+
+        Returns:
+            The top REPORT_LIMIT functions by cumulative time as text.
+
+        """
+        import pstats
+        from StringIO import StringIO
+
+        self._profile.disable()
+
+        if stats_file is not None:
+            self._profile.dump_stats(stats_file)
+
+        output = StringIO()
+
+        stats = pstats.Stats(self._profile, stream=output)
+        stats.sort_stats("cumulative").print_stats(self.REPORT_LIMIT)
+
+        self._profile = None
+
+        return output.getvalue()
+
+    def report(self):
+        """Returns a text table with the histograms."""
+        lines = ["{0:<40} {1:>8} {2:>10} {3:>8} {4:>8} {5:>10}".format(
+            "name", "count", "mean(ms)", "p50(ms)", "p95(ms)", "max(ms)")]
+
+        with self._lock:
+            for name, histogram in self._histograms.items():
+                lines.append("{0:<40} {1:>8} {2:>10.3f} {3:>8} {4:>8} {5:>10.3f}".format(
+                    name,
+                    histogram.count,
+                    histogram.total / histogram.count * 1000,
+                    self._format_bound(histogram.percentile(50)),
+                    self._format_bound(histogram.percentile(95)),
+                    histogram.max * 1000))
+
+        return "\n".join(lines) + "\n"
+
+    def _format_bound(self, bound):
+        if bound is None:
+            return ">{0:g}".format(self.BUCKETS[-1] * 1000)
+
+        return "<={0:g}".format(bound * 1000)
+
+
+PROFILER = Profiler()
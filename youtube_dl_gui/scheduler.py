@@ -0,0 +1,136 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+
+"""Youtubedlg module with the scheduling policies of the download queue.
+
+The DownloadList keeps its queued items in a heap ordered by the key the
+policy gives to each item and the DownloadManager dispatches the item
+on the top of the heap (see DownloadList.fetch_next()). Equal keys keep
+the queue order. The size & the duration of an item are known after the
+Prefetcher has fetched its metadata (see the 'prefetch_workers' option),
+the items without them are dispatched after the ones with them.
+
+Attributes:
+    SCHEDULING_POLICIES (OrderedDict): The policy classes by the values
+        of the 'scheduling_policy' option.
+
+"""
+
+from __future__ import unicode_literals
+
+from urlparse import urlparse
+from collections import OrderedDict
+
+
+class SchedulingPolicy(object):
+
+    """Dispatch the items in the queue order.
+
+    Subclasses override the key() method. The keys of an item must only
+    change through the DownloadList methods, the list then re-schedules
+    the item with its new key.
+
+    """
+
+    def key(self, item):
+        """Returns the sort key of the given item, lower keys go first."""
+        return 0
+
+    def release(self, item):
+        """Called when the given item leaves the 'Queued' stage, it gets
+        a new key if it is queued again."""
+        pass
+
+    def forget(self, object_id):
+        """Drop any state kept for the removed item with the given object_id."""
+        pass
+
+
+class SmallestFirstPolicy(SchedulingPolicy):
+
+    """Dispatch the smallest items first, which maximizes the completed
+    items per hour. The duration stands in for the unknown sizes."""
+
+    def key(self, item):
+        if item.expected_size:
+            return (0, item.expected_size)
+
+        if item.duration:
+            return (1, item.duration)
+
+        return (2, 0)
+
+
+class LargestFirstPolicy(SchedulingPolicy):
+
+    """Dispatch the largest items first, which keeps the bandwidth
+    saturated while the small items fill the gaps at the end."""
+
+    def key(self, item):
+        if item.expected_size:
+            return (0, -item.expected_size)
+
+        if item.duration:
+            return (1, -item.duration)
+
+        return (2, 0)
+
+
+class HostRoundRobinPolicy(SchedulingPolicy):
+
+    """Dispatch the items of each host in turns.
+
+    The n-th queued item of a host gets the n-th turn, so a long queue
+    from one site does not hold back the items of the others. The turns
+    start after the turn of the last dispatched item, so the items a host
+    has already downloaded do not push its new items behind the others.
+
+    """
+
+    def __init__(self):
+        self._turns = {}  # object_id -> (host, turn)
+        self._counters = {}  # host -> next turn
+        self._first_turn = 0  # Turn after the last dispatched item
+
+    def key(self, item):
+        if item.object_id not in self._turns:
+            host = self.get_host(item.url)
+            turn = max(self._counters.get(host, 0), self._first_turn)
+
+            self._counters[host] = turn + 1
+            self._turns[item.object_id] = (host, turn)
+
+        return self._turns[item.object_id][1]
+
+    def release(self, item):
+        host_turn = self._turns.pop(item.object_id, None)
+
+        if host_turn is not None and item.stage == "Active":
+            self._first_turn = max(self._first_turn, host_turn[1] + 1)
+
+    def forget(self, object_id):
+        self._turns.pop(object_id, None)
+
+    @staticmethod
+    def get_host(url):
+        """Returns the host of the given url without the 'www.' prefix."""
+        host = urlparse(url).netloc.lower()
+
+        if host.startswith("www."):
+            host = host[4:]
+
+        return host
+
+
+SCHEDULING_POLICIES = OrderedDict([
+    ("queue", SchedulingPolicy),
+    ("smallest", SmallestFirstPolicy),
+    ("largest", LargestFirstPolicy),
+    ("host", HostRoundRobinPolicy)
+])
+
+
+def get_policy(name):
+    """Returns a new policy for the given option value, the queue order
+    policy for the unknown ones."""
+    return SCHEDULING_POLICIES.get(name, SchedulingPolicy)()
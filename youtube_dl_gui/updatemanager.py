@@ -4,23 +4,24 @@
 """Youtubedlg module to update youtube-dl binary.
 
 Attributes:
-    UPDATE_PUB_TOPIC (string): wxPublisher subscription topic of the
+    UPDATE_PUB_TOPIC (string): Event topic of the
         UpdateThread thread.
 
 """
 
 from __future__ import unicode_literals
 
+import os
+import json
 import os.path
 from threading import Thread
-from urllib2 import urlopen, URLError, HTTPError
 
-from wx import CallAfter
-from wx.lib.pubsub import setuparg1
-from wx.lib.pubsub import pub as Publisher
+from .events import send_event
 
 from .utils import (
     YOUTUBEDL_BIN,
+    os_path_exists,
+    remove_file,
     check_path
 )
 
@@ -31,9 +32,16 @@ class UpdateThread(Thread):
 
     """Python Thread that downloads youtube-dl binary.
 
+    The HTTP validators (ETag, Last-Modified) of the last successful download
+    are stored under the config path and are sent back to the server as a
+    conditional request, so when youtube-dl has not changed the update costs
+    a single '304 Not Modified' round-trip.
+
     Attributes:
         LATEST_YOUTUBE_DL (string): URL with the latest youtube-dl binary.
         DOWNLOAD_TIMEOUT (int): Download timeout in seconds.
+        VALIDATORS_FILENAME (string): Filename of the file that holds the
+            validators of the current youtube-dl binary.
 
     Args:
         download_path (string): Absolute path where UpdateThread will download
@@ -43,18 +51,32 @@ class UpdateThread(Thread):
             back to the caller. Finish signal can be used to make sure that
             the UpdateThread has been completed in an asynchronous way.
 
+        config_path (string): Absolute path where UpdateThread should store
+            the validators file. Default is the download_path.
+
     """
 
     LATEST_YOUTUBE_DL = 'https://yt-dl.org/latest/'
     DOWNLOAD_TIMEOUT = 10
+    VALIDATORS_FILENAME = 'update.json'
 
-    def __init__(self, download_path, quiet=False):
+    def __init__(self, download_path, quiet=False, config_path=None):
         super(UpdateThread, self).__init__()
         self.download_path = download_path
         self.quiet = quiet
+
+        if config_path is None:
+            config_path = download_path
+
+        self.config_path = config_path
+        self.validators_file = os.path.join(config_path, self.VALIDATORS_FILENAME)
         self.start()
 
     def run(self):
+        # urllib2 pulls in the whole network stack (httplib, ssl etc)
+        # import it here so it stays out of the app startup
+        from urllib2 import urlopen, Request, URLError, HTTPError
+
         self._talk_to_gui('download')
 
         source_file = self.LATEST_YOUTUBE_DL + YOUTUBEDL_BIN
@@ -62,21 +84,117 @@ class UpdateThread(Thread):
 
         check_path(self.download_path)
 
+        request = Request(source_file)
+        validators = self._load_validators(destination_file)
+
+        if validators.get('etag'):
+            request.add_header('If-None-Match', validators['etag'])
+
+        if validators.get('last_modified'):
+            request.add_header('If-Modified-Since', validators['last_modified'])
+
         try:
-            stream = urlopen(source_file, timeout=self.DOWNLOAD_TIMEOUT)
+            stream = urlopen(request, timeout=self.DOWNLOAD_TIMEOUT)
 
-            with open(destination_file, 'wb') as dest_file:
-                dest_file.write(stream.read())
+            self._write_binary(stream.read(), destination_file)
+            self._save_validators(stream, destination_file)
 
             self._talk_to_gui('correct')
-        except (HTTPError, URLError, IOError) as error:
+        except HTTPError as error:
+            if error.code == 304:
+                self._talk_to_gui('latest')
+            else:
+                self._talk_to_gui('error', unicode(error))
+        except (URLError, IOError, OSError) as error:
             self._talk_to_gui('error', unicode(error))
 
         if not self.quiet:
             self._talk_to_gui('finish')
 
+    def _write_binary(self, data, destination_file):
+        """Replace the destination_file with the given data.
+
+        The data are first written to a temporary file which then gets
+        renamed over the destination_file, so a youtube-dl process spawned
+        in the meantime always sees either the old or the new binary.
+
+        """
+        temp_file = destination_file + '.tmp'
+        old_file = None
+
+        try:
+            with open(temp_file, 'wb') as dest_file:
+                dest_file.write(data)
+
+            if os.name == 'nt' and os_path_exists(destination_file):
+                # os.rename does not overwrite files on Windows but we are
+                # allowed to rename a binary even if a worker is running it
+                old_file = destination_file + '.old'
+
+                remove_file(old_file)
+                os.rename(destination_file, old_file)
+
+            os.rename(temp_file, destination_file)
+        except (IOError, OSError):
+            # Put the old binary back
+            if old_file is not None and not os_path_exists(destination_file):
+                os.rename(old_file, destination_file)
+
+            remove_file(temp_file)
+            raise
+
+        if old_file is not None:
+            try:
+                os.remove(old_file)
+            except OSError:
+                pass  # Still running, removed on the next update
+
+    def _load_validators(self, destination_file):
+        """Return the stored validators dictionary.
+
+        Validators are ignored (empty dictionary) when the youtube-dl binary
+        they refer to is missing or its size has changed since we stored them.
+
+        """
+        if not os_path_exists(self.validators_file) or not os_path_exists(destination_file):
+            return {}
+
+        try:
+            with open(self.validators_file, 'rb') as input_file:
+                validators = json.load(input_file)
+        except (IOError, ValueError):
+            return {}
+
+        if not isinstance(validators, dict) or validators.get('size') != os.path.getsize(destination_file):
+            return {}
+
+        return validators
+
+    def _save_validators(self, stream, destination_file):
+        """Store the validators of the given response stream."""
+        headers = stream.info()
+
+        # The 'latest' URL redirects to '.../downloads/<version>/youtube-dl'
+        final_url = stream.geturl().rstrip('/').split('/')
+        version = final_url[-2] if len(final_url) > 1 else ''
+
+        validators = {
+            'etag': headers.getheader('ETag', ''),
+            'last_modified': headers.getheader('Last-Modified', ''),
+            'version': version,
+            'size': os.path.getsize(destination_file)
+        }
+
+        check_path(self.config_path)
+
+        try:
+            with open(self.validators_file, 'wb') as output_file:
+                json.dump(validators, output_file)
+        except IOError:
+            pass  # Next update will just download the whole binary
+
     def _talk_to_gui(self, signal, data=None):
-        """Communicate with the GUI using wxCallAfter and wxPublisher.
+        """Communicate with the GUI using the events.send_event() function.
 
         Args:
             signal (string): Unique signal string that informs the GUI for the
@@ -86,11 +204,12 @@ class UpdateThread(Thread):
                 given signal. Default is None.
 
         Note:
-            UpdateThread supports 4 signals.
+            UpdateThread supports 5 signals.
                 1) download: The update process started
                 2) correct: The update process completed successfully
-                3) error: An error occured while downloading youtube-dl binary
-                4) finish: The update thread is ready to join
+                3) latest: The youtube-dl binary is already the latest one
+                4) error: An error occured while downloading youtube-dl binary
+                5) finish: The update thread is ready to join
 
         """
-        CallAfter(Publisher.sendMessage, UPDATE_PUB_TOPIC, (signal, data))
+        send_event(UPDATE_PUB_TOPIC, (signal, data))
@@ -239,7 +239,7 @@ def shutdown_sys(password=None):
 def to_string(data):
     """Convert data to string.
     Works for both Python2 & Python3. """
-    return '%s' % data
+    return '%s' % (data,)
 
 
 def get_time(seconds):
@@ -263,6 +263,20 @@ def get_time(seconds):
     return dtime
 
 
+def format_duration(seconds):
+    """Format the given seconds to a short string (e.g. '4.2s', '3m 05s')."""
+    if seconds < 60:
+        return "{0:.1f}s".format(seconds)
+
+    dtime = get_time(seconds)
+    hours = dtime['days'] * 24 + dtime['hours']
+
+    if hours:
+        return "{0}h {1:02}m {2:02}s".format(hours, dtime['minutes'], dtime['seconds'])
+
+    return "{0}m {1:02}s".format(dtime['minutes'], dtime['seconds'])
+
+
 def get_locale_file():
     """Search for youtube-dlg locale file.
 